@@ -0,0 +1,5 @@
+"""Benchmarks package for JungleQuest game."""
+
+from .runner import benchmark, compare_results, run_benchmarks
+
+__all__ = ["benchmark", "compare_results", "run_benchmarks"]
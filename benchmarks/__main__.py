@@ -0,0 +1,65 @@
+"""
+Benchmark Suite Entry Point
+
+Usage:
+    python -m benchmarks [--output results.json] [--baseline base.json]
+                         [--threshold 0.10] [--filter NAME ...]
+"""
+
+import argparse
+import sys
+
+from . import cases  # noqa: F401  (registers the benchmarks)
+from .runner import (
+    compare_results,
+    load_results,
+    print_comparison,
+    run_benchmarks,
+    save_results,
+)
+
+
+def main() -> int:
+    """
+    Run the benchmark suite.
+
+    Returns:
+        1 if a regression against the baseline was found, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Run the JungleQuest benchmarks."
+    )
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative slowdown flagged as a regression (default: 0.10)",
+    )
+    parser.add_argument(
+        "--filter", nargs="*", help="Only run benchmarks whose name contains these"
+    )
+    parser.add_argument("--repeat", type=int, default=7, help="Samples per benchmark")
+    parser.add_argument(
+        "--min-time", type=float, default=0.05, help="Minimum seconds per sample"
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.repeat, args.min_time)
+    if args.output:
+        save_results(results, args.output)
+        print(f"✓ Results saved to '{args.output}'")
+
+    if args.baseline:
+        comparison = compare_results(
+            results, load_results(args.baseline), args.threshold
+        )
+        print_comparison(comparison, args.threshold)
+        if any(entry["regression"] for entry in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Benchmark Cases Module
+
+Micro benchmarks for the hot paths of the model, controller and view,
+plus macro benchmarks driving the Controller through complete scenarios.
+All console output is sent to a null stream.
+"""
+
+import atexit
+import builtins
+import contextlib
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Callable, List
+
+from controller.controller import Controller
+from controller.move_parser import MoveParser
+from controller.move_validator import MoveValidator
+from model.board import Board
+from model.game import Game
+from model.piece import Piece
+from model.tile import Tile
+from model.variation_tree import VariationTree
+from tools.position_batch import PositionBatch, pack_board, unpack_board
+from view.view import View
+
+from .runner import benchmark
+
+NULL_STREAM = open(os.devnull, "w")
+
+# Lions and Tigers shuffling on the back rows: never captures, never ends
+SHUFFLE_MOVES = ["A1 to B1", "A9 to B9", "B1 to A1", "B9 to A9"]
+
+
+def scripted_moves(count: int) -> List[str]:
+    """Return a repeatable script of count legal, non-terminal moves."""
+    return [SHUFFLE_MOVES[i % len(SHUFFLE_MOVES)] for i in range(count)]
+
+
+def _quiet(func: Callable[[], None]) -> Callable[[], None]:
+    def run() -> None:
+        with contextlib.redirect_stdout(NULL_STREAM):
+            func()
+
+    return run
+
+
+def _new_controller() -> Controller:
+    controller = Controller()
+    controller.game = Game("Player1", "Player2")
+    return controller
+
+
+def _forget_moves(controller: Controller) -> None:
+    """Drop the moves kept so far, so every iteration does the same work."""
+    del controller.move_history[:]
+    del controller.move_record[:]
+    controller.variations = VariationTree()
+    controller._reset_draw_tracker()
+
+
+# ==================== MICRO BENCHMARKS ====================
+
+
+@benchmark("parser.parse_move_input")
+def bench_parse_move_input():
+    parse = MoveParser.parse_move_input
+    return lambda: parse("B4 to C4")
+
+
+@benchmark("parser.parse_move_input_invalid")
+def bench_parse_move_input_invalid():
+    parse = MoveParser.parse_move_input
+    return _quiet(lambda: parse("Z4 to C44"))
+
+
+@benchmark("validator.is_valid_move")
+def bench_is_valid_move():
+    validator = MoveValidator(Board())
+    return lambda: validator.is_valid_move((0, 2), (0, 3), 0)
+
+
+@benchmark("validator.is_valid_move_river_jump")
+def bench_is_valid_move_river_jump():
+    board = Board()
+    board.place_piece(Piece("Lion", Piece.PLAYER_1), (0, 4))
+    validator = MoveValidator(board)
+    return lambda: validator.is_valid_move((0, 4), (3, 4), 0)
+
+
+@benchmark("piece.can_capture")
+def bench_can_capture():
+    rat = Piece("Rat", Piece.PLAYER_1)
+    elephant = Piece("Elephant", Piece.PLAYER_2)
+    rat_tile = Tile(Tile.LAND, rat)
+    elephant_tile = Tile(Tile.LAND, elephant)
+    return lambda: rat.can_capture(rat_tile, elephant, elephant_tile)
+
+
+@benchmark("board.construct")
+def bench_board_construct():
+    return Board
+
+
+@benchmark("view.display_board")
+def bench_display_board():
+    view = View()
+    board = Board()
+    return _quiet(lambda: view.display_board(board))
+
+
+# ==================== CONTROLLER BENCHMARKS ====================
+
+
+@benchmark("controller.take_turn")
+def bench_take_turn():
+    controller = _new_controller()
+    moves = itertools.cycle(SHUFFLE_MOVES)
+
+    def run() -> None:
+        controller.take_turn(next(moves))
+        controller.game.switch_turn()
+        _forget_moves(controller)
+
+    return _quiet(run)
+
+
+@benchmark("controller.take_turn_500_spectators")
+def bench_take_turn_spectators():
+    controller = _new_controller()
+    spectators = [controller.spectators.join() for _ in range(500)]
+    moves = itertools.cycle(SHUFFLE_MOVES)
+
+    def run() -> None:
+        controller.take_turn(next(moves))
+        controller.game.switch_turn()
+        _forget_moves(controller)
+        for spectator in spectators:
+            spectator.poll()
+
+    return _quiet(run)
+
+
+@benchmark("controller.undo_move")
+def bench_undo_move():
+    controller = _new_controller()
+
+    def run() -> None:
+        controller.take_turn("A3 to A4")
+        controller.undo_count = 0
+        controller.undo_move()
+
+    return _quiet(run)
+
+
+@benchmark("controller.save_load_roundtrip")
+def bench_save_load_roundtrip():
+    controller = _new_controller()
+    with contextlib.redirect_stdout(NULL_STREAM):
+        for move in scripted_moves(40):
+            controller.take_turn(move)
+            controller.game.switch_turn()
+    directory = tempfile.mkdtemp(prefix="jungle_bench_")
+    atexit.register(shutil.rmtree, directory, True)
+    filename = os.path.join(directory, "bench.jungle")
+
+    def run() -> None:
+        controller._save_game(filename)
+        controller._load_game(filename)
+
+    return run
+
+
+@benchmark("batch.pack_unpack_board")
+def bench_pack_unpack_board():
+    board = Board()
+
+    def run() -> None:
+        unpack_board(pack_board(board, 0))
+
+    return run
+
+
+@benchmark("batch.shared_memory_roundtrip")
+def bench_shared_memory_roundtrip():
+    board = Board()
+    batch = PositionBatch.create(1)
+
+    def cleanup() -> None:
+        batch.close()
+        batch.unlink()
+
+    atexit.register(cleanup)
+
+    def run() -> None:
+        batch.write(0, board, 0)
+        batch.read(0)
+
+    return run
+
+
+@benchmark("batch.pickle_board_roundtrip")
+def bench_pickle_board_roundtrip():
+    # What a worker pays when a Board is passed to it directly
+    board = Board()
+
+    def run() -> None:
+        pickle.loads(pickle.dumps((board, 0)))
+
+    return run
+
+
+# ==================== MACRO BENCHMARKS ====================
+
+
+@benchmark("game.scripted_500_moves")
+def bench_scripted_game():
+    def run() -> None:
+        controller = _new_controller()
+        script = iter(scripted_moves(500) + ["quit"])
+        controller.view.get_user_input = lambda: next(script)
+        original_input = builtins.input
+        builtins.input = lambda prompt="": "2"  # quit without saving
+        try:
+            controller.play_game()
+        finally:
+            builtins.input = original_input
+
+    return _quiet(run)
@@ -0,0 +1,383 @@
+"""
+Load Test Module
+
+Simulated players driving real Controllers, to find how many games a
+machine can host. Every session plays random legal moves through
+Controller.take_turn, undoes some of them, saves the game to a .jungle
+file now and then and saves a .record file when a game ends; finished
+games are replaced by new ones. Console output goes to a null stream
+and input() is stubbed, so no operation waits for a person.
+
+Sessions are spread over worker processes; each worker takes turns
+between its sessions, as a server hosting many games would. The report
+gives moves per second over the whole run, p50/p95/p99 latency of each
+operation and the peak resident memory of the workers.
+
+Usage:
+    python -m benchmarks.load_test [--sessions 64] [--moves 200]
+                                   [--workers N] [--output report.json]
+"""
+
+import argparse
+import builtins
+import contextlib
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from controller.controller import Controller
+from model import rules
+from model.game import Game
+from model.move import encode_positions, move_notation, move_list
+
+from .runner import _format_ns, save_results
+
+OPERATIONS = ("take_turn", "undo", "save", "record")
+
+PERCENTILES = (50, 95, 99)
+
+DEFAULT_SESSIONS = 64
+DEFAULT_MOVES = 200  # Moves played by each session
+DEFAULT_UNDO_RATE = 0.05  # Chance of an undo instead of a move
+DEFAULT_SAVE_INTERVAL = 25  # Moves between .jungle saves of a session
+DEFAULT_MAX_PLIES = 120  # Moves after which a game is abandoned for a new one
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values: Values in ascending order (not empty)
+        percent: Percentile from 0 to 100
+
+    Returns:
+        The smallest value with at least percent% of the values at or below it
+    """
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[min(len(sorted_values), int(rank)) - 1]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class SimulatedSession:
+    """
+    One simulated pair of players.
+
+    Attributes:
+        controller: The Controller the session plays through
+        moves: Moves played so far
+        games: Games finished (won or abandoned) so far
+    """
+
+    def __init__(
+        self,
+        number: int,
+        directory: str,
+        rng: random.Random,
+        undo_rate: float = DEFAULT_UNDO_RATE,
+        save_interval: int = DEFAULT_SAVE_INTERVAL,
+        max_plies: int = DEFAULT_MAX_PLIES,
+    ) -> None:
+        """
+        Start a session with a new game.
+
+        Args:
+            number: Number of the session, used in its player and file names
+            directory: Directory for the session's .jungle and .record files
+            rng: Random source choosing moves and undos
+            undo_rate: Chance of an undo instead of a move
+            save_interval: Moves between .jungle saves (0 to never save)
+            max_plies: Moves after which a game is abandoned
+        """
+        self.rng = rng
+        self.undo_rate = undo_rate
+        self.save_interval = save_interval
+        self.max_plies = max_plies
+        self.save_path = os.path.join(directory, f"session{number}.jungle")
+        self.record_path = os.path.join(directory, f"session{number}.record")
+        self.names = (f"Load{number}A", f"Load{number}B")
+        self.controller = Controller(hint_budget=0)
+        self.moves = 0
+        self.games = 0
+        self._new_game()
+
+    def _new_game(self) -> None:
+        controller = self.controller
+        controller.game = Game(*self.names)
+        controller.start_fen = None
+        controller.move_record = move_list()
+        controller.move_history = move_list()
+        controller.undo_count = 0
+
+    def step(self, timings: Dict[str, List[int]]) -> None:
+        """
+        Make one move or undo, saving as due.
+
+        Args:
+            timings: Latencies in nanoseconds, appended to by operation
+        """
+        controller = self.controller
+        if (
+            controller.move_history
+            and controller.undo_count < controller.MAX_UNDOS
+            and self.rng.random() < self.undo_rate
+        ):
+            self._timed(timings, "undo", controller.undo_move)
+            return
+
+        board = controller.game.board
+        side = controller.game.current_turn
+        moves = rules.legal_moves(board, side)
+        if not moves:
+            self._end_game(timings)
+            return
+        start = self.rng.choice(sorted(moves))
+        move = encode_positions(start, self.rng.choice(moves[start]))
+        result = self._timed(
+            timings, "take_turn", controller.take_turn, move_notation(move)
+        )
+        self.moves += 1
+        if result:
+            self._end_game(timings)
+            return
+        controller.game.switch_turn()
+        if self.save_interval and self.moves % self.save_interval == 0:
+            self._timed(timings, "save", controller._save_game, self.save_path)
+        if len(controller.move_record) >= self.max_plies:
+            self._end_game(timings)
+
+    def _end_game(self, timings: Dict[str, List[int]]) -> None:
+        self._timed(timings, "record", self.controller._save_record, self.record_path)
+        self.games += 1
+        self._new_game()
+
+    @staticmethod
+    def _timed(timings: Dict[str, List[int]], operation: str, func, *args):
+        start = time.perf_counter_ns()
+        result = func(*args)
+        timings[operation].append(time.perf_counter_ns() - start)
+        return result
+
+
+def run_sessions(job: Dict) -> Dict:
+    """
+    Play a group of sessions in this process (a worker's share of a run).
+
+    Args:
+        job: {"sessions": first and end session numbers, "moves", "seed",
+            "undo_rate", "save_interval", "max_plies"}
+
+    Returns:
+        {"timings": latencies by operation, "moves", "games", "peak_rss_mb"}
+    """
+    rng = random.Random(job["seed"])
+    timings = {operation: [] for operation in OPERATIONS}
+    original_input = builtins.input
+    builtins.input = lambda prompt="": ""  # No console prompts
+    try:
+        with tempfile.TemporaryDirectory(prefix="jungle_load_") as directory:
+            with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+                sessions = [
+                    SimulatedSession(
+                        number,
+                        directory,
+                        rng,
+                        job["undo_rate"],
+                        job["save_interval"],
+                        job["max_plies"],
+                    )
+                    for number in range(*job["sessions"])
+                ]
+                active = list(sessions)
+                while active:
+                    for session in active:
+                        session.step(timings)
+                    active = [s for s in active if s.moves < job["moves"]]
+    finally:
+        builtins.input = original_input
+    return {
+        "timings": timings,
+        "moves": sum(session.moves for session in sessions),
+        "games": sum(session.games for session in sessions),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_load_test(
+    sessions: int = DEFAULT_SESSIONS,
+    moves: int = DEFAULT_MOVES,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    undo_rate: float = DEFAULT_UNDO_RATE,
+    save_interval: int = DEFAULT_SAVE_INTERVAL,
+    max_plies: int = DEFAULT_MAX_PLIES,
+) -> Dict:
+    """
+    Run simulated sessions concurrently and report their performance.
+
+    Args:
+        sessions: Number of simulated sessions
+        moves: Moves played by each session
+        workers: Worker processes (default: CPU count; 1 runs inline)
+        seed: Random seed; a run is repeatable for a given worker count
+        undo_rate: Chance of an undo instead of a move
+        save_interval: Moves between .jungle saves (0 to never save)
+        max_plies: Moves after which a game is abandoned
+
+    Returns:
+        Report with throughput, latency percentiles per operation and
+        peak resident memory
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, sessions))
+    bounds = [sessions * index // workers for index in range(workers + 1)]
+    jobs = [
+        {
+            "sessions": (bounds[index], bounds[index + 1]),
+            "moves": moves,
+            "seed": seed * 1000 + index,
+            "undo_rate": undo_rate,
+            "save_interval": save_interval,
+            "max_plies": max_plies,
+        }
+        for index in range(workers)
+    ]
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [run_sessions(jobs[0])]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(run_sessions, jobs)
+    elapsed = time.perf_counter() - start
+
+    operations = {}
+    for operation in OPERATIONS:
+        samples = sorted(
+            sample for result in results for sample in result["timings"][operation]
+        )
+        if not samples:
+            continue
+        stats = {"count": len(samples), "mean_ns": sum(samples) / len(samples)}
+        for percent in PERCENTILES:
+            stats[f"p{percent}_ns"] = percentile(samples, percent)
+        operations[operation] = stats
+
+    total_moves = sum(result["moves"] for result in results)
+    peaks = [r["peak_rss_mb"] for r in results if r["peak_rss_mb"] is not None]
+    return {
+        "version": "1.0",
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "sessions": sessions,
+        "workers": workers,
+        "moves": total_moves,
+        "games": sum(result["games"] for result in results),
+        "elapsed_seconds": elapsed,
+        "moves_per_second": total_moves / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": max(peaks) if peaks else None,
+        "operations": operations,
+    }
+
+
+def format_report(report: Dict) -> str:
+    """Render a load test report as text."""
+    peak = report["peak_rss_mb"]
+    lines = [
+        "=" * 78,
+        f"LOAD TEST: {report['sessions']} sessions on {report['workers']} workers",
+        "=" * 78,
+        f"Moves:           {report['moves']} in {report['elapsed_seconds']:.2f} s "
+        f"({report['games']} games finished)",
+        f"Throughput:      {report['moves_per_second']:.0f} moves/s",
+        f"Peak RSS:        "
+        + (f"{peak:.1f} MB per worker" if peak is not None else "unknown"),
+        "",
+        f"{'operation':<12} {'count':>8} {'p50':>12} {'p95':>12} {'p99':>12}",
+    ]
+    for operation, stats in report["operations"].items():
+        lines.append(
+            f"{operation:<12} {stats['count']:>8} "
+            + " ".join(f"{_format_ns(stats[f'p{p}_ns']):>12}" for p in PERCENTILES)
+        )
+    lines.append("=" * 78)
+    return "\n".join(lines)
+
+
+def main() -> int:
+    """Run a load test from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load_test",
+        description="Drive simulated sessions through the JungleQuest Controller.",
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=DEFAULT_SESSIONS, help="Simulated sessions"
+    )
+    parser.add_argument(
+        "--moves", type=int, default=DEFAULT_MOVES, help="Moves per session"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--undo-rate",
+        type=float,
+        default=DEFAULT_UNDO_RATE,
+        help=f"Chance of an undo instead of a move (default: {DEFAULT_UNDO_RATE})",
+    )
+    parser.add_argument(
+        "--save-interval",
+        type=int,
+        default=DEFAULT_SAVE_INTERVAL,
+        help=f"Moves between saves, 0 to never save (default: {DEFAULT_SAVE_INTERVAL})",
+    )
+    parser.add_argument(
+        "--max-plies",
+        type=int,
+        default=DEFAULT_MAX_PLIES,
+        help=f"Moves after which a game is abandoned (default: {DEFAULT_MAX_PLIES})",
+    )
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+    if args.sessions <= 0 or args.moves <= 0 or args.max_plies <= 0:
+        print("✗ --sessions, --moves and --max-plies must be positive.")
+        return 1
+
+    report = run_load_test(
+        args.sessions,
+        args.moves,
+        args.workers,
+        args.seed,
+        args.undo_rate,
+        args.save_interval,
+        args.max_plies,
+    )
+    print(format_report(report))
+    if args.output:
+        save_results(report, args.output)
+        print(f"✓ Report saved to '{args.output}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+Benchmark Runner Module
+
+Times registered benchmarks, writes the results to JSON and compares
+them against a saved baseline.
+"""
+
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# A benchmark factory performs its setup and returns the callable to time.
+BenchmarkFactory = Callable[[], Callable[[], None]]
+
+_REGISTRY: Dict[str, BenchmarkFactory] = {}
+
+
+def benchmark(name: str) -> Callable[[BenchmarkFactory], BenchmarkFactory]:
+    """
+    Register a benchmark factory under the given name.
+
+    Args:
+        name: Unique benchmark name (e.g., "parser.parse_move_input")
+
+    Returns:
+        Decorator registering the factory
+    """
+
+    def register(factory: BenchmarkFactory) -> BenchmarkFactory:
+        if name in _REGISTRY:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        _REGISTRY[name] = factory
+        return factory
+
+    return register
+
+
+def registered_benchmarks() -> Dict[str, BenchmarkFactory]:
+    """Return the registered benchmarks in registration order."""
+    return dict(_REGISTRY)
+
+
+def time_benchmark(
+    factory: BenchmarkFactory, repeat: int = 7, min_time: float = 0.05
+) -> Dict:
+    """
+    Time one benchmark.
+
+    The loop count is calibrated so that a single sample runs for at least
+    min_time seconds, then repeat samples are taken with the garbage
+    collector disabled, as timeit does.
+
+    Args:
+        factory: Benchmark factory returning the callable to time
+        repeat: Number of samples
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Dictionary of per-operation timings in nanoseconds
+    """
+    func = factory()
+    func()  # warm-up
+
+    loops = 1
+    while True:
+        elapsed = _time_loops(func, loops)
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+    samples = [_time_loops(func, loops) / loops * 1e9 for _ in range(repeat)]
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_ns": min(samples),
+        "median_ns": statistics.median(samples),
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def _time_loops(func: Callable[[], None], loops: int) -> float:
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None, repeat: int = 7, min_time: float = 0.05
+) -> Dict:
+    """
+    Run benchmarks and collect their results.
+
+    Args:
+        names: Substrings selecting benchmarks to run (default: all)
+        repeat: Number of samples per benchmark
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Results document with environment metadata and per-benchmark timings
+    """
+    results = {}
+    for name, factory in registered_benchmarks().items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        results[name] = time_benchmark(factory, repeat, min_time)
+        print(f"{name:<40} {_format_ns(results[name]['median_ns']):>12}")
+    return {
+        "version": "1.0",
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+
+
+def compare_results(
+    current: Dict, baseline: Dict, threshold: float = 0.10
+) -> List[Dict]:
+    """
+    Compare two results documents benchmark by benchmark.
+
+    Args:
+        current: Results from run_benchmarks()
+        baseline: Previously saved results
+        threshold: Relative slowdown of the median above which a benchmark
+            is flagged as a regression (0.10 = 10%)
+
+    Returns:
+        One entry per benchmark present in both documents
+    """
+    comparison = []
+    for name, result in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["median_ns"] / base["median_ns"]
+        comparison.append(
+            {
+                "name": name,
+                "baseline_ns": base["median_ns"],
+                "current_ns": result["median_ns"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return comparison
+
+
+def print_comparison(comparison: List[Dict], threshold: float) -> None:
+    """Print a comparison table, marking regressions."""
+    print("\n" + "=" * 78)
+    print(f"COMPARISON TO BASELINE (regression threshold: {threshold:.0%})")
+    print("=" * 78)
+    for entry in comparison:
+        marker = "✗ REGRESSION" if entry["regression"] else ""
+        print(
+            f"{entry['name']:<40} {_format_ns(entry['baseline_ns']):>10} -> "
+            f"{_format_ns(entry['current_ns']):>10} {entry['ratio']:>6.2f}x {marker}"
+        )
+    print("=" * 78)
+
+
+def _format_ns(nanoseconds: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if nanoseconds >= scale:
+            return f"{nanoseconds / scale:.2f} {unit}"
+    return f"{nanoseconds:.0f} ns"
+
+
+def save_results(results: Dict, filename: str) -> None:
+    """Write a results document to a JSON file."""
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(filename: str) -> Dict:
+    """Read a results document from a JSON file."""
+    with open(filename, "r") as f:
+        return json.load(f)
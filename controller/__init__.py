@@ -3,6 +3,15 @@
 from .controller import Controller
 from .move_parser import MoveParser
 from .move_validator import MoveValidator
-from .game_state import GameStateManager
+from .session_store import GameStore, SessionCache
+from .record_archive import ArchiveWriter, RecordArchive
 
-__all__ = ["Controller", "MoveParser", "MoveValidator", "GameStateManager"]
+__all__ = [
+    "Controller",
+    "MoveParser",
+    "MoveValidator",
+    "GameStore",
+    "SessionCache",
+    "ArchiveWriter",
+    "RecordArchive",
+]
@@ -1,10 +1,26 @@
 from model.game import Game
 from model.board import Board
-from model.tile import Tile
 from model.piece import Piece
+from model.draw_rules import REPETITION, DrawRules, DrawTracker
+from model.variation_tree import VariationNode, VariationTree
+from model.move import (
+    move_list,
+    move_notation,
+    move_positions,
+    revert_move,
+    with_capture,
+)
+from model import rules
 from view.view import View
+from controller.move_parser import MoveParser
+from controller.move_validator import MoveValidator
+from controller.move_recorder import MoveRecorder, record_entries, record_moves
+from controller.record_archive import ArchiveWriter
+from controller.spectators import SpectatorHub
+from controller.profiler import TurnProfiler
+from engine.ponder import Ponderer
+from engine.protocol import EngineError
 
-import re
 import random
 import json
 import os
@@ -64,14 +80,75 @@ class Controller:
         "Zen",
     ]
 
-    def __init__(self):
+    def __init__(
+        self,
+        profiler: TurnProfiler = None,
+        draw_rules: DrawRules = None,
+        hint_budget: float = 0,
+    ):
         self.view = View()
+        self.profiler = profiler or TurnProfiler()  # Disabled unless --profile
+        self.draw_rules = draw_rules or DrawRules()  # Draw rules for new games
+        # Background search for the hint command; a budget of 0 disables it
+        self.ponderer = Ponderer(hint_budget) if hint_budget > 0 else None
+        self.draw_tracker = None  # Positions reached, for the draw rules
+        self.result = None  # How the game ended: {"winner", "reason"}
+        self.analysis_mode = False  # Unlimited take backs and variations
+        self.show_threats = False  # Mark capturable pieces on the board
+        # Records every move played on the game board (see _on_piece_moved)
+        self.recorder = MoveRecorder(self._on_piece_moved)
+        # Read-only spectators of the game (see the spectators module)
+        self.spectators = SpectatorHub()
+        # Protocol engines playing for each player (None for a human)
+        self.engines = [None, None]
+        self.engine_movetime = 1000  # Thinking time of engine players, in ms
         self.game = None
-        self.move_history = []  # Stack to store move history for undo
+        self.move_history = move_list()  # Packed moves that can be undone
         self.undo_count = 0  # Track number of undos used (max 3 per game)
         self.MAX_UNDOS = 3
-        self.move_record = []  # List to store all moves for recording to .record file
+        self.move_record = move_list()  # Packed moves for the .record file
         self.recording_enabled = True  # Enable recording by default
+        self.start_fen = None  # Starting position notation, None for the standard one
+        self.archive_path = None  # Archive for finished games, None to ask
+        self.archive_writer = None  # Open on archive_path after the first game
+
+    @property
+    def game(self):
+        return self._game
+
+    @game.setter
+    def game(self, game):
+        # A new game starts a new repetition history
+        self._game = game
+        self.recorder.follow(game.board if game is not None else None)
+        # Checks moves against the rules kernel for the game's board
+        self.validator = MoveValidator(game.board) if game is not None else None
+        self.spectators.watch(game)
+        self.result = None
+        self.variations = VariationTree()  # Every line played, as move deltas
+        self._reset_draw_tracker()
+
+    def _reset_draw_tracker(self):
+        """Start tracking positions for the draw rules from the current one."""
+        if self._game is None:
+            self.draw_tracker = None
+            return
+        self.draw_tracker = DrawTracker(
+            self._game.draw_rules,
+            self._game.board.position_key(self._game.current_turn),
+        )
+
+    def _rebuild_draw_tracker(self):
+        """Replay the current line into the draw tracker (after loading)."""
+        if self.start_fen:
+            board, side = Board.from_fen(self.start_fen)
+        else:
+            board, side = Board(), 0
+        tracker = DrawTracker(self.game.draw_rules, board.position_key(side))
+        for node in self.variations.current.path():
+            captured = node.apply(board)
+            tracker.push(board.position_key(1 - node.side), captured is not None)
+        self.draw_tracker = tracker
 
     def start_game(self):
         print(
@@ -116,9 +193,11 @@ class Controller:
         """Start a new game with player name input."""
         player1_name = self._get_valid_player_name("Player 1")
         player2_name = self._get_valid_player_name("Player 2")
-        self.game = Game(player1_name, player2_name)
-        self.move_record = []  # Reset move record for new game
-        self.move_history = []  # Reset undo history
+        self.game = Game(player1_name, player2_name, draw_rules=self.draw_rules)
+        self.start_fen = None
+        self.analysis_mode = False
+        self.move_record = move_list()  # Reset move record for new game
+        self.move_history = move_list()  # Reset undo history
         self.undo_count = 0  # Reset undo count
         self.play_game()
 
@@ -157,11 +236,46 @@ class Controller:
         print("                Syntax: help")
         print("                Effect: Shows all available commands and their usage")
         print()
+        print("  moves         List the legal moves of one of your pieces")
+        print("                Syntax: moves <column><row>")
+        print("                Example: moves A3")
+        print("                Effect: Shows every tile the piece can move to")
+        print()
+        print("  fen           Show the current position in one line of notation")
+        print("                Syntax: fen")
+        print()
+        print("  load-fen      Continue from a position given in notation")
+        print("                Syntax: load-fen <rows> <side to move>")
+        print("                Example: load-fen 3l3/7/7/7/7/7/7/7/3R3 1")
+        print("                Effect: Replaces the board; resets undo and record")
+        print()
+        print("  hint          Suggest a move for the current player")
+        print("                Syntax: hint")
+        print("                Effect: Shows the best move found so far by the")
+        print("                        search that runs while you think")
+        print()
+        print("  threats       Turn threat markers on or off")
+        print("                Syntax: threats")
+        print("                Effect: Marks every piece that can be captured")
+        print("                        on the next move with '!'")
+        print()
         print("  undo          Undo the last move")
         print("                Syntax: undo")
         print("                Effect: Reverts the last move made")
         print(f"                        (Maximum {self.MAX_UNDOS} undos per game)")
         print()
+        print("  analysis      Turn analysis mode on or off")
+        print("                Syntax: analysis")
+        print("                Effect: In analysis mode moves can be taken back")
+        print("                        without limit and every line is kept")
+        print()
+        print("  back          Take back a move (analysis mode)")
+        print("  forward       Replay a move of the lines played (analysis mode)")
+        print("                Syntax: forward [variation number]")
+        print("  lines         List every line played (analysis mode)")
+        print("  line          Switch to another line (analysis mode)")
+        print("                Syntax: line <line number>")
+        print()
         print("  save          Save the current game state")
         print("                Syntax: save")
         print("                Effect: Prompts for a filename and saves the game")
@@ -182,17 +296,52 @@ class Controller:
         print("  • Only Rats can enter water tiles")
         print("  • Capture opponent pieces based on rank")
         print("  • Win by entering opponent's den or capturing all pieces")
+        for line in self.game.draw_rules.describe() if self.game else []:
+            print(f"  • {line}")
         print("=" * 60 + "\n")
 
+    def _stop_pondering(self):
+        """Stop the background search once the position is about to change."""
+        if self.ponderer is not None:
+            self.ponderer.cancel()
+
     def play_game(self):
+        try:
+            self._play_game()
+        finally:
+            self._stop_pondering()
+
+    def _play_game(self):
         game_over = False
         while not game_over:
-            self.view.display_board(self.game.board)
-            self.view.display_turn(self.game.players[self.game.current_turn].name)
+            with self.profiler.phase("render"):
+                self.view.display_board(self.game.board, self._threatened_positions())
+                self.view.display_turn(self.game.players[self.game.current_turn].name)
+                self.view.display_den_threats(self.game.board, self.game.current_turn)
+
+            # An engine player answers instead of the keyboard
+            engine = self.engines[self.game.current_turn]
+            if engine is not None and not self.analysis_mode:
+                move = self._engine_move(engine)
+                result = None if move is None else self.take_turn(move)
+                if result is None:
+                    break  # No move or an illegal one: the engine is out
+                if result is True:
+                    self._auto_save_record()
+                    break
+                self.game.switch_turn()
+                continue
+
+            # Search the position while the player thinks
+            if self.ponderer is not None:
+                self.ponderer.start(self.game.board, self.game.current_turn)
 
             # Display undo info
-            undos_remaining = self.MAX_UNDOS - self.undo_count
-            print(f"Undos remaining: {undos_remaining}/{self.MAX_UNDOS}")
+            if self.analysis_mode:
+                print(f"Analysis mode: move {len(self.variations.current.path())}")
+            else:
+                undos_remaining = self.MAX_UNDOS - self.undo_count
+                print(f"Undos remaining: {undos_remaining}/{self.MAX_UNDOS}")
 
             move = self.view.get_user_input()
             move_lower = move.lower().strip()
@@ -211,17 +360,51 @@ class Controller:
 
             # Handle save command
             if move_lower == "save":
-                self._save_game_menu()
+                with self.profiler.phase("save"):
+                    self._save_game_menu()
                 continue
 
             # Handle record command
             if move_lower == "record":
-                self._save_record_menu()
+                with self.profiler.phase("save"):
+                    self._save_record_menu()
+                continue
+
+            # Handle position notation commands
+            if move_lower == "fen":
+                print(self.game.board.to_fen(self.game.current_turn))
+                continue
+            if move_lower.startswith("load-fen"):
+                self.load_fen(move.strip()[len("load-fen") :].strip())
+                continue
+
+            # Handle threats overlay command
+            if move_lower == "threats":
+                self.show_threats = not self.show_threats
+                state = "on" if self.show_threats else "off"
+                print(f"✓ Threat markers {state}. Pieces marked '!' can be captured.")
+                continue
+
+            # Handle hint command
+            if move_lower == "hint":
+                self.show_hint()
+                continue
+
+            # Handle analysis commands
+            if self._handle_analysis_command(move_lower):
+                continue
+
+            # Handle moves command
+            if move_lower == "moves" or move_lower.startswith("moves "):
+                self.show_legal_moves(move_lower[len("moves") :].strip())
                 continue
 
             # Handle undo command
             if move_lower == "undo":
-                if self.undo_move():
+                if self.analysis_mode:
+                    self.take_back()
+                    continue
+                elif self.undo_move():
                     continue  # Successfully undone, show board again
                 else:
                     continue  # Undo failed, show error and await new input
@@ -230,8 +413,11 @@ class Controller:
             result = self.take_turn(move)
             if result is None:
                 continue  # await new input from the user (invalid move)
+            elif result is True and self.analysis_mode:
+                # Keep analysing; the finished line can be taken back
+                self.game.switch_turn()
             elif result is True:
-                # Game won!
+                # Game won or drawn!
                 game_over = True
                 # Auto-save record on game completion
                 self._auto_save_record()
@@ -240,162 +426,202 @@ class Controller:
                 self.game.switch_turn()
 
     def parse_move_input(self, input: str):
-        pattern = r"^[A-Ga-g][1-9] to [A-Ga-g][1-9]$"  # valid characters include A-G, a-g, 1-9
-
-        if not re.match(pattern, input):
-            print(
-                "Invalid input format. Please enter a valid move (e.g: A1 to A2, B4 to C4)"
-            )
-            return None, None  # means input is invalid.
+        return MoveParser.parse_move_input(input)
 
-        from_part, to_part = input.split(" to ")
+    def is_valid_move(
+        self, from_position: tuple[int, int], to_position: tuple[int, int]
+    ) -> bool:
+        return rules.is_legal_move(
+            self.game.board, self.game.current_turn, from_position, to_position
+        )
 
-        if not self.convert_to_coordinates(
-            from_part
-        ) or not self.convert_to_coordinates(to_part):
-            print(
-                "Input is out of bounds. Please enter a valid move (e.g: A1 to A2, B4 to C4)"
-            )
-            return None, None
-        from_position = self.convert_to_coordinates(from_part)
-        to_position = self.convert_to_coordinates(to_part)
+    def convert_to_coordinates(self, position):
+        return MoveParser.convert_to_coordinates(position)
 
-        return from_position, to_position
+    def show_legal_moves(self, square: str) -> None:
+        """Print the legal moves of the current player's piece on a square."""
+        position = MoveParser.parse_square(square)
+        if position is None:
+            print("Invalid square. Please enter a square like B4 (e.g: moves B4)")
+            return
 
-    def _is_river_jump_clear(self, from_pos, to_pos, is_horizontal):
-        """Check if river jump path is clear of rats."""
-        if is_horizontal:
-            col_range = range(
-                min(from_pos[0], to_pos[0]) + 1, max(from_pos[0], to_pos[0])
-            )
-            return all(
-                self.game.board.get_tile((col, from_pos[1])).tile_type == Tile.WATER
-                and self.game.board.get_tile((col, from_pos[1])).is_empty()
-                for col in col_range
-            )
+        piece = self.game.board.get_piece(position)
+        targets = rules.moves_from(self.game.board, self.game.current_turn, position)
+        square = self._coords_to_notation(position)
+        if piece is None:
+            print(f"There is no piece on {square}.")
+        elif piece.owner != self.game.current_turn:
+            print(f"The {piece.name} on {square} is not your piece.")
+        elif not targets:
+            print(f"Your {piece.name} on {square} has no legal moves.")
         else:
-            row_range = range(
-                min(from_pos[1], to_pos[1]) + 1, max(from_pos[1], to_pos[1])
-            )
-            return all(
-                self.game.board.get_tile((from_pos[0], row)).tile_type == Tile.WATER
-                and self.game.board.get_tile((from_pos[0], row)).is_empty()
-                for row in row_range
-            )
+            notations = ", ".join(self._coords_to_notation(t) for t in targets)
+            print(f"Legal moves for your {piece.name} on {square}: {notations}")
 
-    def is_valid_move(
-        self, from_position: tuple[int, int], to_position: tuple[int, int]
-    ) -> bool:
-        piece: Piece = self.game.board.get_piece(from_position)
-
-        # Lion/Tiger river jumping (3 cols horizontal or 4 rows vertical)
-        if piece.name in ["Lion", "Tiger"]:
-            from_col, from_row = from_position
-            to_col, to_row = to_position
-            if (
-                from_row == to_row
-                and abs(from_col - to_col) == 3
-                and self._is_river_jump_clear(from_position, to_position, True)
-            ):
-                return True
-            if (
-                from_col == to_col
-                and abs(from_row - to_row) == 4
-                and self._is_river_jump_clear(from_position, to_position, False)
-            ):
-                return True
+    def _threatened_positions(self):
+        """Positions of every capturable piece, when the overlay is on."""
+        if not self.show_threats:
+            return None
+        attacks = self.game.board.track_attacks()
+        return {
+            position
+            for side in (0, 1)
+            for _, position in attacks.threatened_pieces(side)
+        }
 
-        # Check piece ownership
-        if self.game.current_turn != piece.owner:
-            return False
+    def show_hint(self) -> None:
+        """Print the best move found so far for the current player."""
+        if self.ponderer is None:
+            print("Hints are disabled.")
+            return
+        board, side = self.game.board, self.game.current_turn
+        if not self.ponderer.is_searching(board, side):
+            self.ponderer.start(board, side)
+        result = self.ponderer.best()
+        if result is None or result.move is None:
+            print("No hint available yet. Try again in a moment.")
+            return
 
-        # Prevent moving into own den
-        own_den = (
-            self.game.board.PLAYER_1_DEN_POSITION
-            if self.game.current_turn == 0
-            else self.game.board.PLAYER_2_DEN_POSITION
+        from_position, to_position = result.move
+        piece = board.get_piece(from_position)
+        outlook = " (winning)" if result.is_win else ""
+        print(
+            f"Hint: move your {piece.name} "
+            f"{self._coords_to_notation(from_position)} to "
+            f"{self._coords_to_notation(to_position)}{outlook} "
+            f"[depth {result.depth}, {result.nodes} positions]"
         )
-        if to_position == own_den:
-            return False
 
-        # Only rats can enter water
-        if (
-            piece.name != "Rat"
-            and self.game.board.get_tile(to_position).tile_type == Tile.WATER
-        ):
+    def attach_engine(self, player: int, engine, movetime: int = None) -> None:
+        """
+        Let a protocol engine play for a player.
+
+        Args:
+            player: Player index (0 or 1)
+            engine: An EngineClient after its handshake, or None for a human
+            movetime: Thinking time per move in milliseconds
+        """
+        self.engines[player] = engine
+        if movetime is not None:
+            self.engine_movetime = movetime
+
+    def _engine_move(self, engine) -> str:
+        """Ask an engine for its move; None if it has none or fails."""
+        name = self.game.players[self.game.current_turn].name
+        moves = [
+            (node.from_position, node.to_position)
+            for node in self.variations.current.path()
+        ]
+        try:
+            engine.set_position(self.start_fen, moves)
+            move = engine.go(movetime=self.engine_movetime)
+        except EngineError as e:
+            print(f"✗ {e}")
+            return None
+        if move is None:
+            print(f"{name} has no legal move.")
+            return None
+        from_position, to_position = move
+        move_str = (
+            f"{self._coords_to_notation(from_position)} to "
+            f"{self._coords_to_notation(to_position)}"
+        )
+        print(f"{name} plays {move_str}")
+        return move_str
+
+    def load_fen(self, fen: str) -> bool:
+        """
+        Replace the current position with one given in position notation.
+
+        Move history, the move record and the undo count are reset, and
+        the game continues from the new position.
+
+        Args:
+            fen: Position notation (see Board.from_fen)
+
+        Returns:
+            True if the position was loaded
+        """
+        try:
+            board, side_to_move = Board.from_fen(fen)
+        except ValueError as e:
+            print(f"✗ Invalid position: {e}")
             return False
 
-        # Must move exactly one tile (orthogonal)
-        return (
-            abs(from_position[0] - to_position[0])
-            + abs(from_position[1] - to_position[1])
-            == 1
+        self.game = Game(
+            self.game.players[0].name,
+            self.game.players[1].name,
+            board,
+            self.game.draw_rules,
         )
+        self.game.current_turn = side_to_move
+        self._reset_draw_tracker()
+        self.spectators.resync()
+        self.start_fen = board.to_fen(side_to_move)
+        self.move_record = move_list()
+        self.move_history = move_list()
+        self.undo_count = 0
+        print("✓ Position loaded.")
+        return True
 
-    def convert_to_coordinates(self, position):
-        column = ord(position[0].upper()) - ord("A")
-        row = int(position[1]) - 1
-        return (column, row) if 0 <= column < 7 and 0 <= row < 9 else None
+    def take_turn(self, move_text):
+        profiler = self.profiler
 
-    def take_turn(self, move):
         # Validate the move string format
-        from_position, to_position = self.parse_move_input(move)
+        with profiler.phase("parse"):
+            move = MoveParser.parse_move(move_text)
 
-        if not from_position or not to_position:
+        if move is None:
             return None  # for invalid inputs
+        from_position, to_position = move_positions(move)
 
         current_player = self.game.current_turn  # 0 for player 1, 1 for player 2
-        piece_to_move: Piece = self.game.board.get_piece(from_position)
+        board = self.game.board
 
-        if piece_to_move is None:
-            print("Invalid move. A tile with no piece was selected. Please try again.")
-            return None
-
-        if not self.is_valid_move(from_position, to_position):
-            print(
-                "Invalid move. You may only move your own piece by one tile horizontally/vertically, and never into its own den or water (except rats)"
-            )
-            return None
-
-        # Check if the target tile is occupied
-        target_tile: Tile = self.game.board.get_tile(to_position)
-        target_piece: Piece = target_tile.get_piece()
-
-        if target_piece is not None:
-            # Check if trying to capture own piece
-            if target_piece.owner == current_player:
+        # Check the move against the legal moves cached for this position
+        with profiler.phase("validate"):
+            if not self.validator.is_legal(move, current_player):
                 print(
-                    "Invalid move: You cannot move to a tile occupied by your own piece."
+                    rules.explain_illegal_move(
+                        board, current_player, from_position, to_position
+                    )
                 )
                 return None
-            # Opponent's piece - check if capture is valid
-            elif not piece_to_move.can_capture(
-                self.game.board.get_tile(from_position), target_piece, target_tile
-            ):
-                print("Invalid move: Your piece cannot capture the opponent's piece.")
-                return None
-            # Valid capture - remove the opponent's piece
-            print(
-                f"{self.game.players[current_player].name} captured {target_piece.name}!"
-            )
-            self.game.board.remove_piece(to_position)
+        self._stop_pondering()
 
-        # Save game state before making the move (for undo functionality)
-        self._save_game_state()
+        target_piece: Piece = board.get_piece(to_position)
+        move = with_capture(move, target_piece)
 
-        # Record the move for .record file
-        if self.recording_enabled:
-            self._record_move(
-                move, from_position, to_position, piece_to_move, target_piece
-            )
+        # Keep the move for undo (it holds the capture, so it can be taken
+        # back alone); analysis mode takes moves back from the variation tree
+        with profiler.phase("history"):
+            if not self.analysis_mode:
+                self.move_history.append(move)
 
-        # Move piece
-        self.game.board.remove_piece(from_position)
-        self.game.board.place_piece(piece_to_move, to_position)
+        # A legal move onto an occupied tile captures the opponent's piece
+        with profiler.phase("capture_check"):
+            if target_piece is not None:
+                print(
+                    f"{self.game.players[current_player].name} captured {target_piece.name}!"
+                )
 
-        # Check for win conditions
-        if self.check_win_condition(to_position):
-            return True
+        # Move piece; it is recorded afterwards, so that the apply and
+        # record phases do not overlap
+        with profiler.phase("apply"), self.recorder.paused():
+            board.move_piece(from_position, to_position)
+            self.variations.play_move(move, current_player)
+        self._on_piece_moved(move)
+
+        # Check for win conditions, then the draw rules
+        with profiler.phase("win_check"):
+            draw_reason = self.draw_tracker.push(
+                board.position_key(1 - current_player), target_piece is not None
+            )
+            if self.check_win_condition(to_position):
+                return True
+            if draw_reason is not None:
+                self._declare_draw(draw_reason)
+                return True
 
         # Valid move, game continues
         return False
@@ -410,6 +636,7 @@ class Controller:
 
         # Win Condition 1: Player entered opponent's den
         if to_position == opponent_den:
+            self.result = {"winner": current_player, "reason": "den"}
             self.view.display_board(self.game.board)
             print(
                 f"\n🎉 {self.game.players[current_player].name} wins by entering the opponent's den! 🎉"
@@ -418,6 +645,7 @@ class Controller:
 
         # Win Condition 2: Opponent has no pieces left
         if self.count_player_pieces(1 - current_player) == 0:
+            self.result = {"winner": current_player, "reason": "capture_all"}
             self.view.display_board(self.game.board)
             print(
                 f"\n🎉 {self.game.players[current_player].name} wins by capturing all opponent pieces! 🎉"
@@ -426,21 +654,16 @@ class Controller:
 
         return False
 
-    def _save_game_state(self):
-        """Save the current game state before a move for potential undo."""
-        # Create a deep copy of the board state
-        board_state = {}
-        for row in range(9):
-            for col in range(7):
-                tile = self.game.board.get_tile((col, row))
-                piece = tile.get_piece()
-                if piece:
-                    # Store piece info: (name, owner, position)
-                    board_state[(col, row)] = {"name": piece.name, "owner": piece.owner}
-
-        # Save state with current player turn
-        state = {"board": board_state, "current_turn": self.game.current_turn}
-        self.move_history.append(state)
+    def _declare_draw(self, reason: str):
+        """End the game in a draw under one of the draw rules."""
+        self.result = {"winner": None, "reason": reason}
+        self.view.display_board(self.game.board)
+        if reason == REPETITION:
+            times = self.game.draw_rules.repetition_limit
+            print(f"\n🤝 Draw: the same position occurred {times} times. 🤝")
+        else:
+            moves = self.game.draw_rules.no_capture_limit
+            print(f"\n🤝 Draw: {moves} moves without a capture. 🤝")
 
     def undo_move(self):
         """Undo the last move if undos are available."""
@@ -454,26 +677,25 @@ class Controller:
             print("Cannot undo: No moves have been made yet.")
             return False
 
-        # Restore the previous state
-        previous_state = self.move_history.pop()
+        self._stop_pondering()
+        move = self.move_history.pop()
 
         # Also remove the last move from the record
         if self.move_record:
             self.move_record.pop()
 
-        # Clear the current board
-        for row in range(9):
-            for col in range(7):
-                self.game.board.remove_piece((col, row))
+        # Take the move back and give the turn to the player who made it;
+        # spectators are sent the resulting position
+        with self.recorder.paused(), self.spectators.paused():
+            self.game.current_turn = revert_move(self.game.board, move)
 
-        # Restore pieces to their previous positions
-        for position, piece_info in previous_state["board"].items():
-            # Recreate the piece
-            piece = Piece(piece_info["name"], piece_info["owner"])
-            self.game.board.place_piece(piece, position)
+        # Forget the undone position for the draw rules; the tree keeps the
+        # undone move as a variation
+        self.draw_tracker.pop()
+        self.variations.back()
 
-        # Restore the turn
-        self.game.current_turn = previous_state["current_turn"]
+        # A finished game goes on from the undone position
+        self.result = None
 
         # Increment undo counter
         self.undo_count += 1
@@ -481,13 +703,123 @@ class Controller:
         print(f"✓ Move undone! ({self.MAX_UNDOS - self.undo_count} undos remaining)")
         return True
 
+    # ==================== ANALYSIS MODE ====================
+
+    def _handle_analysis_command(self, command: str) -> bool:
+        """Run an analysis command; return False if command is not one."""
+        name, _, argument = command.partition(" ")
+        argument = argument.strip()
+        if name not in ("analysis", "back", "forward", "lines", "line"):
+            return False
+        if name == "analysis":
+            self.toggle_analysis_mode()
+        elif not self.analysis_mode:
+            print(f"'{name}' is only available in analysis mode (type 'analysis').")
+        elif name == "back":
+            self.take_back()
+        elif name == "lines":
+            self.show_lines()
+        elif name == "line" and not argument:
+            print("Please enter a line number (e.g: line 2)")
+        elif argument and not argument.isdigit():
+            print("Please enter a number (e.g: forward 2, line 2)")
+        elif name == "forward":
+            self.replay_forward(int(argument or 1))
+        else:
+            self.switch_line(int(argument))
+        return True
+
+    def toggle_analysis_mode(self):
+        """Turn analysis mode on or off."""
+        self.analysis_mode = not self.analysis_mode
+        if self.analysis_mode:
+            print(
+                "✓ Analysis mode on. Use 'back', 'forward [n]', 'lines' and "
+                "'line <n>'; every line played is kept."
+            )
+        else:
+            # Moves for undo were not kept during analysis
+            self.move_history = move_list()
+            print(
+                "✓ Analysis mode off. The game continues from this position; "
+                "earlier moves can no longer be undone."
+            )
+
+    def take_back(self) -> bool:
+        """Take back the last move, keeping it as a variation."""
+        node = self.variations.back()
+        if node is None:
+            print("Cannot take back: this is the starting position.")
+            return False
+        self._stop_pondering()
+        self._revert_node(node)
+        return True
+
+    def replay_forward(self, variation: int = 1) -> bool:
+        """Replay one of the moves played from the current position."""
+        children = self.variations.current.children
+        if not 1 <= variation <= len(children):
+            if children:
+                print(f"Please choose a variation from 1 to {len(children)}.")
+            else:
+                print("No move has been played from this position.")
+            return False
+        self._replay_node(children[variation - 1])
+        self.variations.current = children[variation - 1]
+        return True
+
+    def show_lines(self):
+        """Print every line played, marking those leading to the board."""
+        lines = self.variations.lines()
+        if not lines:
+            print("No moves have been played yet.")
+            return
+        current = self.variations.current
+        for number, leaf in enumerate(lines, start=1):
+            path = leaf.path()
+            marker = "*" if current in path else " "
+            moves = ", ".join(move_notation(node.move) for node in path)
+            print(f"{marker} {number}) {moves}")
+
+    def switch_line(self, number: int) -> bool:
+        """Go to the end of another line listed by 'lines'."""
+        lines = self.variations.lines()
+        if not 1 <= number <= len(lines):
+            print(f"Please choose a line from 1 to {len(lines)}.")
+            return False
+        self._goto_node(lines[number - 1])
+        return True
+
+    def _goto_node(self, target: VariationNode):
+        """Take back and replay moves until the target node is on the board."""
+        back, forward = self.variations.route(target)
+        with self.spectators.paused():
+            for node in back:
+                self._revert_node(node)
+            for node in forward:
+                self._replay_node(node)
+        self.variations.current = target
+
+    def _revert_node(self, node: VariationNode):
+        """Take a move back on the board, record and draw tracker."""
+        with self.recorder.paused(), self.spectators.paused():
+            node.revert(self.game.board)
+            self.game.current_turn = node.side
+        if self.move_record:
+            self.move_record.pop()
+        self.draw_tracker.pop()
+        self.result = None  # The game goes on from the earlier position
+
+    def _replay_node(self, node: VariationNode):
+        """Play a move of the tree on the board, record and draw tracker."""
+        board = self.game.board
+        self.game.current_turn = node.side
+        captured = node.apply(board)
+        self.draw_tracker.push(board.position_key(1 - node.side), captured is not None)
+        self.game.current_turn = 1 - node.side
+
     def count_player_pieces(self, player: int) -> int:
-        return sum(
-            1
-            for column in self.game.board.grid
-            for tile in column
-            if tile.get_piece() and tile.get_piece().owner == player
-        )
+        return self.game.board.count_pieces(player)
 
     def end_turn(self):
         # Switch to the next player
@@ -514,27 +846,17 @@ class Controller:
             print("Continuing game...")
             return False
 
-    def _record_move(
-        self,
-        move_str: str,
-        from_pos: tuple,
-        to_pos: tuple,
-        piece: Piece,
-        captured_piece: Piece = None,
-    ):
-        """Record a move to the move_record list."""
-        move_data = {
-            "move_number": len(self.move_record) + 1,
-            "player": self.game.players[self.game.current_turn].name,
-            "player_index": self.game.current_turn,
-            "move_string": move_str,
-            "piece": piece.name,
-            "from": self._coords_to_notation(from_pos),
-            "to": self._coords_to_notation(to_pos),
-            "captured": captured_piece.name if captured_piece else None,
-            "timestamp": datetime.now().isoformat(),
-        }
-        self.move_record.append(move_data)
+    def _on_piece_moved(self, move: int):
+        """Board event: record a move played on the game board."""
+        if self.recording_enabled:
+            with self.profiler.phase("record"):
+                self.move_record.append(move)
+
+    def record_entries(self) -> list:
+        """Expand the move record into the dicts written to files."""
+        return record_entries(
+            self.move_record, [p.name for p in self.game.players], self.start_fen
+        )
 
     def _coords_to_notation(self, coords: tuple[int, int]) -> str:
         """Convert (col, row) coordinates to chess-like notation (e.g., A1)."""
@@ -567,17 +889,19 @@ class Controller:
 
     def _save_game(self, filename: str):
         """Save the current game state to a .jungle file."""
+        game_data = self._game_data()
+
+        # Write to file
+        with open(filename, "w") as f:
+            json.dump(game_data, f, indent=2)
+
+    def _game_data(self) -> dict:
+        """Serialize the current game state as a .jungle document."""
         # Serialize board state
-        board_state = {}
-        for row in range(9):
-            for col in range(7):
-                tile = self.game.board.get_tile((col, row))
-                piece = tile.get_piece()
-                if piece:
-                    board_state[f"{col},{row}"] = {
-                        "name": piece.name,
-                        "owner": piece.owner,
-                    }
+        board_state = {
+            f"{col},{row}": piece_info
+            for (col, row), piece_info in self.game.board.snapshot().items()
+        }
 
         # Create game data structure
         game_data = {
@@ -587,19 +911,16 @@ class Controller:
             "current_turn": self.game.current_turn,
             "undo_count": self.undo_count,
             "board": board_state,
-            "move_record": self.move_record,
-            "move_history": [
-                {
-                    "board": {f"{k[0]},{k[1]}": v for k, v in state["board"].items()},
-                    "current_turn": state["current_turn"],
-                }
-                for state in self.move_history
-            ],
+            "fen": self.game.board.to_fen(self.game.current_turn),
+            "start_fen": self.start_fen,
+            "draw_rules": self.game.draw_rules.to_dict(),
+            "analysis_mode": self.analysis_mode,
+            "variations": self.variations.to_dict(),
+            "move_record": self.record_entries(),
+            "move_history": self.move_history.tolist(),
+            "result": self.result,
         }
-
-        # Write to file
-        with open(filename, "w") as f:
-            json.dump(game_data, f, indent=2)
+        return game_data
 
     def _load_game_menu(self) -> bool:
         """Prompt user for filename and load game state."""
@@ -628,38 +949,58 @@ class Controller:
         """Load game state from a .jungle file."""
         with open(filename, "r") as f:
             game_data = json.load(f)
+        self._restore_game(game_data)
+
+    def _restore_game(self, game_data: dict):
+        """Restore the game state from a .jungle document."""
+        # Restore pieces (from the one-line notation when the file has it)
+        if game_data.get("fen"):
+            board, _ = Board.from_fen(game_data["fen"])
+        else:
+            board = Board.from_snapshot(
+                {
+                    tuple(map(int, pos_str.split(","))): piece_data
+                    for pos_str, piece_data in game_data["board"].items()
+                }
+            )
 
         # Create new game with saved player names
         player_names = game_data["players"]
-        self.game = Game(player_names[0], player_names[1])
-
-        # Clear the board
-        for row in range(9):
-            for col in range(7):
-                self.game.board.remove_piece((col, row))
-
-        # Restore pieces
-        for pos_str, piece_data in game_data["board"].items():
-            col, row = map(int, pos_str.split(","))
-            piece = Piece(piece_data["name"], piece_data["owner"])
-            self.game.board.place_piece(piece, (col, row))
+        draw_rules = DrawRules.from_dict(game_data.get("draw_rules"))
+        self.game = Game(player_names[0], player_names[1], board, draw_rules)
 
         # Restore game state
         self.game.current_turn = game_data["current_turn"]
         self.undo_count = game_data.get("undo_count", 0)
-        self.move_record = game_data.get("move_record", [])
-
-        # Restore move history for undo
-        self.move_history = []
-        for state_data in game_data.get("move_history", []):
-            board_state = {}
-            for pos_str, piece_data in state_data["board"].items():
-                col, row = map(int, pos_str.split(","))
-                board_state[(col, row)] = piece_data
-
-            self.move_history.append(
-                {"board": board_state, "current_turn": state_data["current_turn"]}
-            )
+        self.start_fen = game_data.get("start_fen")
+        recorded = game_data.get("move_record", [])
+        self.move_record = record_moves(recorded)
+
+        # Restore every line played, or the recorded line for older files
+        self.analysis_mode = game_data.get("analysis_mode", False)
+        if "variations" in game_data:
+            self.variations = VariationTree.from_dict(game_data["variations"])
+        else:
+            for move_data in recorded:
+                self.variations.play(
+                    self._notation_to_coords(move_data["from"]),
+                    self._notation_to_coords(move_data["to"]),
+                    move_data["player_index"],
+                    move_data.get("captured"),
+                )
+
+        # Restore the moves that can be undone; older files kept a board per
+        # move, which are the last moves of the current line
+        history = game_data.get("move_history", [])
+        if history and not isinstance(history[0], int):
+            path = self.variations.current.path()
+            history = [node.move for node in path[max(0, len(path) - len(history)) :]]
+        self.move_history = move_list(history)
+        self.result = game_data.get("result")
+
+        # Recount repeated positions and moves without a capture
+        self._rebuild_draw_tracker()
+        self.spectators.resync()
 
     # ==================== RECORD/REPLAY (.record files) ====================
 
@@ -683,24 +1024,48 @@ class Controller:
         except Exception as e:
             print(f"✗ Error saving record: {e}")
 
-    def _save_record(self, filename: str):
-        """Save game record to a .record file."""
+    def _record_data(self) -> dict:
+        """Describe the game as the contents of a .record file."""
         record_data = {
             "version": "1.0",
             "timestamp": datetime.now().isoformat(),
             "players": [p.name for p in self.game.players],
             "total_moves": len(self.move_record),
-            "moves": self.move_record,
+            "draw_rules": self.game.draw_rules.to_dict(),
+            "moves": self.record_entries(),
         }
+        if self.start_fen is not None:
+            record_data["start_fen"] = self.start_fen
+        if self.result is not None:
+            record_data["result"] = self.result
+        return record_data
 
+    def _save_record(self, filename: str):
+        """Save game record to a .record file."""
         with open(filename, "w") as f:
-            json.dump(record_data, f, indent=2)
+            json.dump(self._record_data(), f, indent=2)
+
+    def close_archive(self):
+        """Write the index of the archive games were added to, if any."""
+        if self.archive_writer is not None:
+            self.archive_writer.close()
+            self.archive_writer = None
 
     def _auto_save_record(self):
         """Automatically save game record when game ends."""
         if not self.move_record:
             return
 
+        if self.archive_path is not None:
+            try:
+                if self.archive_writer is None:
+                    self.archive_writer = ArchiveWriter(self.archive_path)
+                number = self.archive_writer.add(self._record_data())
+                print(f"✓ Game {number} added to archive '{self.archive_path}'")
+            except Exception as e:
+                print(f"✗ Error archiving record: {e}")
+            return
+
         print("\nWould you like to save a record of this game? (y/n): ", end="")
         choice = input().strip().lower()
 
@@ -737,9 +1102,12 @@ class Controller:
         with open(filename, "r") as f:
             record_data = json.load(f)
 
-        # Create new game with recorded player names
+        # Create new game with recorded player names and starting position
         player_names = record_data["players"]
-        self.game = Game(player_names[0], player_names[1])
+        board = None
+        if record_data.get("start_fen"):
+            board, _ = Board.from_fen(record_data["start_fen"])
+        self.game = Game(player_names[0], player_names[1], board)
 
         print("\n" + "=" * 60)
         print("GAME REPLAY MODE")
@@ -7,43 +7,62 @@ Handles parsing and validation of user input for moves.
 import re
 from typing import Optional, Tuple
 
+from model.move import encode_move, move_positions, notation_square
+
 
 class MoveParser:
     """Parses and validates user move input."""
 
+    # valid characters include A-G, a-g, 1-9
+    MOVE_PATTERN = re.compile(r"^[A-Ga-g][1-9] to [A-Ga-g][1-9]$")
+    SQUARE_PATTERN = re.compile(r"^[A-Ga-g][1-9]$")
+
     @staticmethod
-    def parse_move_input(
-        input: str,
-    ) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+    def parse_move(input: str) -> Optional[int]:
         """
-        Parse move input string into board coordinates.
+        Parse move input string into a packed move.
 
         Args:
             input: User input like "A1 to B2"
 
         Returns:
-            Tuple of (from_position, to_position) or (None, None) if invalid
+            The packed move, without its capture (see the move module), or
+            None if invalid
         """
-        pattern = r"^[A-Ga-g][1-9] to [A-Ga-g][1-9]$"  # valid characters include A-G, a-g, 1-9
-
-        if not re.match(pattern, input):
+        if not MoveParser.MOVE_PATTERN.match(input):
             print(
                 "Invalid input format. Please enter a valid move (e.g: A1 to A2, B4 to C4)"
             )
-            return None, None  # means input is invalid.
-
-        from_part, to_part = input.split(" to ")
+            return None  # means input is invalid.
 
-        from_position = MoveParser.convert_to_coordinates(from_part)
-        to_position = MoveParser.convert_to_coordinates(to_part)
+        from_square = notation_square(input[:2])
+        to_square = notation_square(input[-2:])
 
-        if not from_position or not to_position:
+        if from_square is None or to_square is None:
             print(
                 "Input is out of bounds. Please enter a valid move (e.g: A1 to A2, B4 to C4)"
             )
-            return None, None
+            return None
+
+        return encode_move(from_square, to_square)
+
+    @staticmethod
+    def parse_move_input(
+        input: str,
+    ) -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+        Parse move input string into board coordinates.
 
-        return from_position, to_position
+        Args:
+            input: User input like "A1 to B2"
+
+        Returns:
+            Tuple of (from_position, to_position) or (None, None) if invalid
+        """
+        move = MoveParser.parse_move(input)
+        if move is None:
+            return None, None
+        return move_positions(move)
 
     @staticmethod
     def convert_to_coordinates(position: str) -> Optional[Tuple[int, int]]:
@@ -59,3 +78,19 @@ class MoveParser:
         column = ord(position[0].upper()) - ord("A")
         row = int(position[1]) - 1
         return (column, row) if 0 <= column < 7 and 0 <= row < 9 else None
+
+    @staticmethod
+    def parse_square(text: str) -> Optional[Tuple[int, int]]:
+        """
+        Parse a single square like "B4" into coordinates.
+
+        Args:
+            text: Board position like "B4" (case-insensitive)
+
+        Returns:
+            Tuple of (column, row) or None if invalid
+        """
+        text = text.strip()
+        if not MoveParser.SQUARE_PATTERN.match(text):
+            return None
+        return MoveParser.convert_to_coordinates(text)
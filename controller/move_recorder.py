@@ -0,0 +1,155 @@
+"""
+Move Recorder Module
+
+Handles recording moves for .record files. The recorder subscribes to
+the game board's events and hands every move played on it to a callback
+as a packed move (see the move module), so any code path that moves a
+piece is recorded without calling the recorder itself.
+
+Records are kept as packed moves while playing; record_entries() and
+record_moves() convert them to and from the "moves" list of the files.
+"""
+
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from model.board import Board
+from model.board_events import BoardListener
+from model.move import (
+    apply_move,
+    captured_name,
+    encode_move,
+    from_square,
+    move_list,
+    move_notation,
+    notation_square,
+    square_notation,
+    to_square,
+)
+from model.piece import Piece
+
+# Called with the packed move, including its capture
+MoveCallback = Callable[[int], None]
+
+
+def record_entries(
+    moves: Iterable[int], player_names: Sequence[str], start_fen: Optional[str] = None
+) -> List[Dict]:
+    """
+    Expand packed moves into the "moves" list of a .record file.
+
+    The moves are replayed from the starting position to name the piece
+    and player of each one.
+
+    Args:
+        moves: Packed moves from the starting position
+        player_names: Names of Player 1 and Player 2
+        start_fen: Starting position notation (default: standard start)
+
+    Returns:
+        One dict per move
+
+    Raises:
+        ValueError: If a move starts on an empty tile
+    """
+    board = Board.from_fen(start_fen)[0] if start_fen else Board()
+    entries = []
+    for number, move in enumerate(moves, start=1):
+        piece = board.squares[from_square(move)]
+        if piece is None:
+            raise ValueError(f"Move {number} starts on an empty tile")
+        entries.append(
+            {
+                "move_number": number,
+                "player": player_names[piece.owner],
+                "player_index": piece.owner,
+                "move_string": move_notation(move),
+                "piece": piece.name,
+                "from": square_notation(from_square(move)),
+                "to": square_notation(to_square(move)),
+                "captured": captured_name(move),
+            }
+        )
+        apply_move(board, move)
+    return entries
+
+
+def record_moves(entries: Iterable[Dict]) -> array:
+    """
+    Pack the "moves" list of a .record file.
+
+    Args:
+        entries: Dicts with "from", "to" and "captured" keys
+
+    Returns:
+        The packed moves
+    """
+    moves = move_list()
+    for entry in entries:
+        captured = entry.get("captured")
+        moves.append(
+            encode_move(
+                notation_square(entry["from"]),
+                notation_square(entry["to"]),
+                Piece.RANKS[captured] if captured else 0,
+            )
+        )
+    return moves
+
+
+class MoveRecorder(BoardListener):
+    """
+    Reports the moves played on a board.
+
+    Attributes:
+        board: Board followed (None until follow() is called)
+    """
+
+    def __init__(self, on_move: MoveCallback) -> None:
+        """
+        Initialize the recorder.
+
+        Args:
+            on_move: Called for every move played on the followed board
+        """
+        self.on_move = on_move
+        self.board: Optional[Board] = None
+        self._paused = 0
+
+    def follow(self, board: Optional[Board]) -> None:
+        """
+        Record the moves of another board, forgetting the previous one.
+
+        Args:
+            board: The board to follow, or None to stop recording
+        """
+        if self.board is not None:
+            self.board.unsubscribe(self)
+        self.board = board
+        if board is not None:
+            board.subscribe(self)
+
+    @contextmanager
+    def paused(self):
+        """Skip the moves made inside the block (e.g. taking moves back)."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def piece_moved(
+        self,
+        piece: Piece,
+        from_square: int,
+        to_square: int,
+        captured: Optional[Piece],
+    ) -> None:
+        """Report a move unless recording is paused."""
+        if not self._paused:
+            self.on_move(
+                encode_move(
+                    from_square, to_square, captured.rank if captured is not None else 0
+                )
+            )
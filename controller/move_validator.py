@@ -1,12 +1,16 @@
 """
 Move Validator Module
 
-Handles all move validation logic for the JungleQuest game.
+Handles all move validation logic for the JungleQuest game. The rules
+themselves live in the model.rules kernel; the validator answers from the
+legal move set the kernel caches for the current position.
 """
 
-from model.tile import Tile
-from model.piece import Piece
+from typing import Optional, Tuple
+
+from model import rules
 from model.board import Board
+from model.move import move_positions
 
 
 class MoveValidator:
@@ -33,69 +37,55 @@ class MoveValidator:
         Returns:
             True if move is valid, False otherwise
         """
-        piece: Piece = self.board.get_piece(from_position)
-
-        # Lion/Tiger river jumping (3 cols horizontal or 4 rows vertical)
-        if piece.name in ["Lion", "Tiger"]:
-            from_col, from_row = from_position
-            to_col, to_row = to_position
-            if (
-                from_row == to_row
-                and abs(from_col - to_col) == 3
-                and self._is_river_jump_clear(from_position, to_position, True)
-            ):
-                return True
-            if (
-                from_col == to_col
-                and abs(from_row - to_row) == 4
-                and self._is_river_jump_clear(from_position, to_position, False)
-            ):
-                return True
-
-        # Check piece ownership
-        if current_player != piece.owner:
-            return False
-
-        # Prevent moving into own den
-        own_den = (
-            self.board.PLAYER_1_DEN_POSITION
-            if current_player == 0
-            else self.board.PLAYER_2_DEN_POSITION
+        return rules.is_legal_move(
+            self.board, current_player, from_position, to_position
         )
-        if to_position == own_den:
-            return False
-
-        # Only rats can enter water
-        if (
-            piece.name != "Rat"
-            and self.board.get_tile(to_position).tile_type == Tile.WATER
-        ):
-            return False
-
-        # Must move exactly one tile (orthogonal)
-        return (
-            abs(from_position[0] - to_position[0])
-            + abs(from_position[1] - to_position[1])
-            == 1
+
+    def is_legal(self, move: int, current_player: int) -> bool:
+        """
+        Validate a packed move (see the move module).
+
+        Args:
+            move: The packed move
+            current_player: Current player index (0 or 1)
+
+        Returns:
+            True if move is valid, False otherwise
+        """
+        return rules.is_legal_move(self.board, current_player, *move_positions(move))
+
+    def explain_invalid_move(
+        self,
+        from_position: tuple[int, int],
+        to_position: tuple[int, int],
+        current_player: int,
+    ) -> Optional[str]:
+        """
+        Describe why a move is not legal.
+
+        Args:
+            from_position: Starting position (col, row)
+            to_position: Target position (col, row)
+            current_player: Current player index (0 or 1)
+
+        Returns:
+            Error message, or None if the move is valid
+        """
+        return rules.explain_illegal_move(
+            self.board, current_player, from_position, to_position
         )
 
-    def _is_river_jump_clear(self, from_pos, to_pos, is_horizontal):
-        """Check if river jump path is clear of rats."""
-        if is_horizontal:
-            col_range = range(
-                min(from_pos[0], to_pos[0]) + 1, max(from_pos[0], to_pos[0])
-            )
-            return all(
-                self.board.get_tile((col, from_pos[1])).tile_type == Tile.WATER
-                and self.board.get_tile((col, from_pos[1])).is_empty()
-                for col in col_range
-            )
-        else:
-            row_range = range(
-                min(from_pos[1], to_pos[1]) + 1, max(from_pos[1], to_pos[1])
-            )
-            return all(
-                self.board.get_tile((from_pos[0], row)).tile_type == Tile.WATER
-                and self.board.get_tile((from_pos[0], row)).is_empty()
-                for row in row_range
-            )
+    def legal_moves_from(
+        self, position: tuple[int, int], current_player: int
+    ) -> Tuple[tuple[int, int], ...]:
+        """
+        List the legal targets of the piece at a position.
+
+        Args:
+            position: Position of the piece (col, row)
+            current_player: Current player index (0 or 1)
+
+        Returns:
+            Legal target positions (empty if the piece cannot move)
+        """
+        return rules.moves_from(self.board, current_player, position)
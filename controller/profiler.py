@@ -0,0 +1,204 @@
+"""
+Turn Profiler Module
+
+Lightweight per-phase timing for the game loop. Each phase keeps a call
+counter, total/min/max latency and a log2 latency histogram. A disabled
+profiler hands out one shared no-op context manager, so instrumented code
+pays a single method call per phase.
+"""
+
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# Histogram bucket i counts durations in [2**(i-1), 2**i) microseconds
+HISTOGRAM_BUCKETS = 32
+
+_NULL_PHASE = nullcontext()
+
+
+class PhaseStats:
+    """Accumulated timings of one phase."""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "histogram")
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.histogram: List[int] = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed_ns: int) -> None:
+        """Record one duration in nanoseconds."""
+        if self.count == 0 or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+        bucket = min((elapsed_ns // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.histogram[bucket] += 1
+
+    def percentile_us(self, fraction: float) -> float:
+        """
+        Estimate a latency percentile from the histogram.
+
+        Args:
+            fraction: Percentile as a fraction (e.g., 0.95)
+
+        Returns:
+            Upper bound of the bucket holding the percentile, in microseconds
+        """
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= target:
+                return float(2**bucket)
+        return float(2 ** (HISTOGRAM_BUCKETS - 1))
+
+
+class _PhaseTimer:
+    """Context manager timing one phase; reused for every call of that phase."""
+
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats: PhaseStats) -> None:
+        self.stats = stats
+        self.start = 0
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stats.add(time.perf_counter_ns() - self.start)
+
+
+class TurnProfiler:
+    """
+    Collects per-phase counters and latency histograms for the game loop.
+
+    Attributes:
+        PHASES: Phases instrumented by the Controller, in reporting order
+        enabled: Whether timings are being collected
+        stats: Statistics keyed by phase name
+    """
+
+    PHASES = (
+        "parse",
+        "validate",
+        "capture_check",
+        "history",
+        "record",
+        "apply",
+        "win_check",
+        "render",
+        "save",
+    )
+
+    def __init__(self, enabled: bool = False) -> None:
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: Collect timings (default: False, near-zero overhead)
+        """
+        self.enabled = enabled
+        self.stats: Dict[str, PhaseStats] = {}
+        self._timers: Dict[str, _PhaseTimer] = {}
+
+    def phase(self, name: str):
+        """
+        Return a context manager timing the named phase.
+
+        Args:
+            name: Phase name (see PHASES; other names are accepted too)
+
+        Returns:
+            A timing context manager, or a shared no-op one when disabled
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        timer = self._timers.get(name)
+        if timer is None:
+            stats = self.stats[name] = PhaseStats()
+            timer = self._timers[name] = _PhaseTimer(stats)
+        return timer
+
+    def reset(self) -> None:
+        """Discard all collected timings."""
+        self.stats.clear()
+        self._timers.clear()
+
+    def summary(self) -> str:
+        """
+        Format the collected timings as a table.
+
+        Returns:
+            Multi-line summary with one row per phase
+        """
+        lines = [
+            "=" * 78,
+            "TURN PROFILE",
+            "=" * 78,
+            f"{'phase':<14}{'calls':>8}{'total ms':>11}{'mean us':>10}"
+            f"{'p50 us':>9}{'p95 us':>9}{'p99 us':>9}{'max us':>8}",
+        ]
+        ordered = [name for name in self.PHASES if name in self.stats]
+        ordered += sorted(name for name in self.stats if name not in self.PHASES)
+        for name in ordered:
+            stats = self.stats[name]
+            lines.append(
+                f"{name:<14}{stats.count:>8}{stats.total_ns / 1e6:>11.2f}"
+                f"{stats.total_ns / stats.count / 1e3:>10.1f}"
+                f"{stats.percentile_us(0.50):>9.0f}{stats.percentile_us(0.95):>9.0f}"
+                f"{stats.percentile_us(0.99):>9.0f}{stats.max_ns / 1e3:>8.0f}"
+            )
+        if not ordered:
+            lines.append("(no turns were played)")
+        lines.append("=" * 78)
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Return the collected timings as plain data."""
+        return {
+            name: {
+                "count": stats.count,
+                "total_ns": stats.total_ns,
+                "min_ns": stats.min_ns,
+                "max_ns": stats.max_ns,
+                "histogram_us_log2": list(stats.histogram),
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+def start_cprofile(enabled: bool):
+    """
+    Start a cProfile session if requested.
+
+    Args:
+        enabled: Whether to profile
+
+    Returns:
+        The running cProfile.Profile, or None
+    """
+    if not enabled:
+        return None
+    import cProfile
+
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def stop_cprofile(profile, filename: Optional[str]) -> None:
+    """Stop a cProfile session and dump its pstats data to filename."""
+    if profile is None:
+        return
+    profile.disable()
+    profile.dump_stats(filename)
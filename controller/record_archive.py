@@ -0,0 +1,412 @@
+"""
+Record Archive Module
+
+Many game records packed into one append-only file, instead of one
+pretty-printed .record file per game.
+
+Layout of an archive:
+
+- HEADER_MAGIC
+- One block per game: its compressed length (BLOCK_HEADER) followed by
+  the zlib-compressed game (see encode_game)
+- The index: one INDEX_ENTRY per game (offset of its block, compressed
+  length, number of moves, winner or -1)
+- FOOTER: offset of the index, number of games and FOOTER_MAGIC
+
+Games are only ever appended. Appending to a closed archive overwrites
+its index, which is written again, with the new games, on closing; keep
+one ArchiveWriter open for many games rather than reopening it for each.
+An archive that was never closed (e.g. after a crash) has no footer; its
+blocks are scanned instead, so no game is lost.
+
+Inside a block, a game's moves are stored as packed moves (see the move
+module) and the rest of the record as compact JSON. The "moves" list of
+the .record file is rebuilt from the packed moves when read, unless it
+holds more than they can describe (e.g. analysis annotations), in which
+case it is kept verbatim.
+
+RecordArchive reads an archive through mmap: a game is found by number
+from the index without reading the others.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from model.move import MOVE_TYPECODE
+
+from controller.move_recorder import record_entries, record_moves
+
+ARCHIVE_EXTENSION = ".jqa"
+
+HEADER_MAGIC = b"JQARCH1\n"
+FOOTER_MAGIC = b"JQINDEX1"
+
+BLOCK_HEADER = struct.Struct("<I")  # Compressed length
+METADATA_HEADER = struct.Struct("<I")  # Length of the JSON part of a game
+INDEX_ENTRY = struct.Struct("<QIIb")  # Offset, length, moves, winner
+FOOTER = struct.Struct("<QQ8s")  # Index offset, games, FOOTER_MAGIC
+
+COMPRESSION_LEVEL = 6
+
+NO_WINNER = -1
+
+
+class ArchiveEntry(NamedTuple):
+    """Index entry of one archived game."""
+
+    offset: int
+    length: int
+    moves: int
+    winner: int
+
+
+def _to_little_endian(moves: array) -> bytes:
+    if sys.byteorder == "big":
+        moves = array(MOVE_TYPECODE, moves)
+        moves.byteswap()
+    return moves.tobytes()
+
+
+def encode_game(record_data: Dict) -> bytes:
+    """
+    Compress a game into an archive block (without its length).
+
+    Args:
+        record_data: Contents of a .record file
+
+    Returns:
+        The compressed game
+
+    Raises:
+        ValueError: If a move starts on an empty tile
+    """
+    entries = record_data.get("moves", [])
+    moves = record_moves(entries)
+    metadata = dict(record_data)
+    if entries == record_entries(
+        moves, record_data.get("players", ("", "")), record_data.get("start_fen")
+    ):
+        metadata["moves"] = None  # Rebuilt from the packed moves
+    encoded = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    payload = METADATA_HEADER.pack(len(encoded)) + encoded + _to_little_endian(moves)
+    return zlib.compress(payload, COMPRESSION_LEVEL)
+
+
+def _decode_payload(block) -> Tuple[Dict, array]:
+    payload = zlib.decompress(block)
+    (length,) = METADATA_HEADER.unpack_from(payload)
+    start = METADATA_HEADER.size
+    metadata = json.loads(payload[start : start + length].decode("utf-8"))
+    moves = array(MOVE_TYPECODE, payload[start + length :])
+    if sys.byteorder == "big":
+        moves.byteswap()
+    return metadata, moves
+
+
+def decode_game(block) -> Dict:
+    """
+    Decompress an archive block into the contents of a .record file.
+
+    Args:
+        block: The compressed game (without its length)
+
+    Returns:
+        The record, as a .record file holds it
+    """
+    record_data, moves = _decode_payload(block)
+    if record_data.get("moves") is None:
+        record_data["moves"] = record_entries(
+            moves, record_data.get("players", ("", "")), record_data.get("start_fen")
+        )
+    return record_data
+
+
+def _winner(record_data: Dict) -> int:
+    winner = (record_data.get("result") or {}).get("winner")
+    return NO_WINNER if winner is None else winner
+
+
+def _scan_blocks(buffer, start: int, end: int) -> List[ArchiveEntry]:
+    """Rebuild index entries by walking the blocks of an unclosed archive."""
+    entries = []
+    offset = start
+    while offset + BLOCK_HEADER.size <= end:
+        (length,) = BLOCK_HEADER.unpack_from(buffer, offset)
+        block_end = offset + BLOCK_HEADER.size + length
+        if block_end > end:
+            break  # Cut short while being written
+        try:
+            record_data, moves = _decode_payload(
+                buffer[offset + BLOCK_HEADER.size : block_end]
+            )
+        except (zlib.error, ValueError, struct.error):
+            break
+        entries.append(ArchiveEntry(offset, length, len(moves), _winner(record_data)))
+        offset = block_end
+    return entries
+
+
+def _read_index(buffer, size: int) -> Optional[Tuple[int, int]]:
+    """Find the index of a closed archive: (index offset, games) or None."""
+    if size < len(HEADER_MAGIC) + FOOTER.size:
+        return None
+    index_offset, games, magic = FOOTER.unpack_from(buffer, size - FOOTER.size)
+    if magic != FOOTER_MAGIC:
+        return None
+    if index_offset + games * INDEX_ENTRY.size != size - FOOTER.size:
+        return None
+    return index_offset, games
+
+
+class ArchiveWriter:
+    """
+    Appends games to an archive, creating it if needed.
+
+    The index is written when the writer is closed. Until the first game
+    is added, the archive is left untouched.
+
+    Attributes:
+        path: The archive file
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an archive for appending.
+
+        Args:
+            path: The archive file (created if missing)
+
+        Raises:
+            ValueError: If the file exists but is not an archive
+        """
+        self.path = path
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self._file = open(path, "w+b")
+            self._file.write(HEADER_MAGIC)
+            self._index = bytearray()
+            self._append_at: Optional[int] = None
+            return
+
+        self._file = open(path, "r+b")
+        size = os.path.getsize(path)
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            if buffer[: len(HEADER_MAGIC)] != HEADER_MAGIC:
+                self._file.close()
+                raise ValueError(f"'{path}' is not a game archive.")
+            found = _read_index(buffer, size)
+            if found is not None:
+                end, games = found
+                self._index = bytearray(buffer[end : end + games * INDEX_ENTRY.size])
+            else:
+                entries = _scan_blocks(buffer, len(HEADER_MAGIC), size)
+                end = (
+                    entries[-1].offset + BLOCK_HEADER.size + entries[-1].length
+                    if entries
+                    else len(HEADER_MAGIC)
+                )
+                self._index = bytearray(
+                    b"".join(INDEX_ENTRY.pack(*entry) for entry in entries)
+                )
+        # New blocks will replace the old index (or a block cut short)
+        self._append_at = end
+
+    def add(self, record_data: Dict) -> int:
+        """
+        Append a game.
+
+        Args:
+            record_data: Contents of a .record file
+
+        Returns:
+            Number of the game in the archive (from 0)
+
+        Raises:
+            ValueError: If a move starts on an empty tile
+        """
+        block = encode_game(record_data)
+        if self._append_at is not None:
+            self._file.truncate(self._append_at)
+            self._file.seek(self._append_at)
+            self._append_at = None
+        offset = self._file.tell()
+        self._file.write(BLOCK_HEADER.pack(len(block)))
+        self._file.write(block)
+        self._file.flush()  # Found by a scan if the writer is never closed
+        self._index += INDEX_ENTRY.pack(
+            offset, len(block), len(record_data.get("moves", [])), _winner(record_data)
+        )
+        return len(self) - 1
+
+    def __len__(self) -> int:
+        return len(self._index) // INDEX_ENTRY.size
+
+    def close(self) -> None:
+        """Write the index (if games were added) and close the file."""
+        if self._file.closed:
+            return
+        if self._append_at is not None:
+            self._file.close()  # Nothing added: the archive is unchanged
+            return
+        index_offset = self._file.tell()
+        self._file.write(self._index)
+        self._file.write(FOOTER.pack(index_offset, len(self), FOOTER_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RecordArchive:
+    """
+    Read-only, random access to the games of an archive.
+
+    Attributes:
+        path: The archive file
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an archive.
+
+        Args:
+            path: The archive file
+
+        Raises:
+            ValueError: If the file is not an archive
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.path.getsize(path)
+        if size < len(HEADER_MAGIC):
+            self._file.close()
+            raise ValueError(f"'{path}' is not a game archive.")
+        self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buffer[: len(HEADER_MAGIC)] != HEADER_MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a game archive.")
+        found = _read_index(self._buffer, size)
+        if found is not None:
+            self._index_offset, self._games = found
+            self._scanned = None
+        else:
+            # Never closed: index the blocks written so far
+            self._scanned = _scan_blocks(self._buffer, len(HEADER_MAGIC), size)
+            self._games = len(self._scanned)
+
+    def __len__(self) -> int:
+        return self._games
+
+    def entry(self, number: int) -> ArchiveEntry:
+        """
+        Get the index entry of a game.
+
+        Args:
+            number: Number of the game (negative numbers count from the end)
+
+        Returns:
+            The game's ArchiveEntry
+
+        Raises:
+            IndexError: If there is no such game
+        """
+        if number < 0:
+            number += self._games
+        if not 0 <= number < self._games:
+            raise IndexError(f"No game {number} in the archive")
+        if self._scanned is not None:
+            return self._scanned[number]
+        return ArchiveEntry(
+            *INDEX_ENTRY.unpack_from(
+                self._buffer, self._index_offset + number * INDEX_ENTRY.size
+            )
+        )
+
+    def _block(self, entry: ArchiveEntry) -> bytes:
+        start = entry.offset + BLOCK_HEADER.size
+        return self._buffer[start : start + entry.length]
+
+    def __getitem__(self, number: int) -> Dict:
+        """Read a game as the contents of a .record file."""
+        return decode_game(self._block(self.entry(number)))
+
+    def moves(self, number: int) -> array:
+        """Read the packed moves of a game, without rebuilding its record."""
+        return _decode_payload(self._block(self.entry(number)))[1]
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Read every game in order, one at a time."""
+        for number in range(self._games):
+            yield self[number]
+
+    def close(self) -> None:
+        """Release the file."""
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "RecordArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def import_records(paths: Sequence[str], archive_path: str) -> Dict:
+    """
+    Append .record files to an archive.
+
+    Args:
+        paths: The .record files, in the order to archive them
+        archive_path: The archive file (created if missing)
+
+    Returns:
+        {"games": number of games added, "errors": unreadable files}
+    """
+    added = 0
+    errors = []
+    with ArchiveWriter(archive_path) as writer:
+        for path in paths:
+            try:
+                with open(path, "r") as f:
+                    writer.add(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                errors.append(f"{path}: {e}")
+                continue
+            added += 1
+    return {"games": added, "errors": errors}
+
+
+def export_records(
+    archive_path: str, output_dir: str, numbers: Optional[Sequence[int]] = None
+) -> List[str]:
+    """
+    Write games of an archive as .record files.
+
+    Args:
+        archive_path: The archive file
+        output_dir: Directory receiving game_<number>.record files
+        numbers: Games to export (default: all)
+
+    Returns:
+        Paths of the files written
+
+    Raises:
+        IndexError: If a game number is not in the archive
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    with RecordArchive(archive_path) as archive:
+        for number in range(len(archive)) if numbers is None else numbers:
+            path = os.path.join(output_dir, f"game_{number:07d}.record")
+            with open(path, "w") as f:
+                json.dump(archive[number], f, indent=2)
+            written.append(path)
+    return written
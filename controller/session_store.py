@@ -0,0 +1,386 @@
+"""
+Session Store Module
+
+Keeps many games in one SQLite database instead of one .jungle file each.
+
+GameStore saves and loads whole games by ID (the same document a .jungle
+file holds), lists them by player or status, and records single moves
+atomically: a move adds one row and updates the game's position, status
+and move count in the same transaction, without rewriting the document.
+Loading a game replays the moves recorded after its last full save.
+
+SessionCache keeps the most recently used games in memory as Controllers
+in front of a GameStore. Moves played through it are stored immediately;
+the full document is written back when a game is evicted, flushed or the
+cache is closed.
+"""
+
+import contextlib
+import io
+import json
+import sqlite3
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from model.draw_rules import DrawRules
+from model.game import Game
+from model.move import move_notation
+
+from controller.controller import Controller
+
+# Columns listed by GameStore.list_games
+LISTED_COLUMNS = ("id", "player1", "player2", "status", "fen", "move_count", "updated")
+
+ACTIVE = "active"
+FINISHED = "finished"
+
+DEFAULT_CAPACITY = 256  # Games kept in memory by a SessionCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    player1 TEXT NOT NULL,
+    player2 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    fen TEXT NOT NULL,
+    move_count INTEGER NOT NULL,
+    updated TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_player1 ON games (player1);
+CREATE INDEX IF NOT EXISTS games_player2 ON games (player2);
+CREATE INDEX IF NOT EXISTS games_status ON games (status);
+CREATE TABLE IF NOT EXISTS moves (
+    game_id TEXT NOT NULL REFERENCES games (id) ON DELETE CASCADE,
+    ply INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    PRIMARY KEY (game_id, ply)
+) WITHOUT ROWID;
+"""
+
+
+def game_status(controller: Controller) -> str:
+    """Status of a controller's game: ACTIVE or FINISHED."""
+    return FINISHED if controller.result is not None else ACTIVE
+
+
+class GameStore:
+    """
+    Games stored in a SQLite database.
+
+    Attributes:
+        path: Database file (":memory:" for a private in-memory store)
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open a store, creating its tables if needed.
+
+        Args:
+            path: Database file
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(SCHEMA)
+
+    def save(self, game_id: str, controller: Controller) -> None:
+        """
+        Write a whole game, replacing any saved version.
+
+        Args:
+            game_id: ID of the game
+            controller: Controller holding the game
+        """
+        game = controller.game
+        moves = controller.move_record
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    game_id,
+                    game.players[0].name,
+                    game.players[1].name,
+                    game_status(controller),
+                    game.board.to_fen(game.current_turn),
+                    len(moves),
+                    datetime.now().isoformat(),
+                    json.dumps(controller._game_data()),
+                ),
+            )
+            self._connection.execute("DELETE FROM moves WHERE game_id = ?", (game_id,))
+            self._connection.executemany(
+                "INSERT INTO moves VALUES (?, ?, ?)",
+                ((game_id, ply, move) for ply, move in enumerate(moves)),
+            )
+
+    def append_move(self, game_id: str, controller: Controller) -> None:
+        """
+        Record the last move of a game, atomically.
+
+        Moves stored beyond it (moves since undone) are dropped.
+
+        Args:
+            game_id: ID of a saved game
+            controller: Controller holding the game, right after the move
+
+        Raises:
+            KeyError: If the game was never saved
+        """
+        game = controller.game
+        ply = len(controller.move_record) - 1
+        with self._connection:
+            updated = self._connection.execute(
+                "UPDATE games SET status = ?, fen = ?, move_count = ?, updated = ? "
+                "WHERE id = ?",
+                (
+                    game_status(controller),
+                    game.board.to_fen(game.current_turn),
+                    ply + 1,
+                    datetime.now().isoformat(),
+                    game_id,
+                ),
+            )
+            if updated.rowcount == 0:
+                raise KeyError(game_id)
+            self._connection.execute(
+                "DELETE FROM moves WHERE game_id = ? AND ply >= ?", (game_id, ply)
+            )
+            self._connection.execute(
+                "INSERT INTO moves VALUES (?, ?, ?)",
+                (game_id, ply, controller.move_record[ply]),
+            )
+
+    def load(self, game_id: str) -> Controller:
+        """
+        Load a game into a new Controller.
+
+        Args:
+            game_id: ID of the game
+
+        Returns:
+            The Controller, with the moves recorded since the last full
+            save replayed
+
+        Raises:
+            KeyError: If there is no such game
+        """
+        row = self._connection.execute(
+            "SELECT data, move_count FROM games WHERE id = ?", (game_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(game_id)
+        game_data = json.loads(row[0])
+        controller = Controller(hint_budget=0)
+        controller._restore_game(game_data)
+        moves = self._connection.execute(
+            "SELECT move FROM moves WHERE game_id = ? AND ply >= ? AND ply < ? "
+            "ORDER BY ply",
+            (game_id, len(controller.move_record), row[1]),
+        ).fetchall()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for (move,) in moves:
+                if controller.take_turn(move_notation(move)) is False:
+                    controller.game.switch_turn()
+        return controller
+
+    def list_games(
+        self, player: Optional[str] = None, status: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        List saved games, most recently updated first.
+
+        Args:
+            player: Only games this player takes part in
+            status: Only games with this status (ACTIVE or FINISHED)
+
+        Returns:
+            One dict per game with the LISTED_COLUMNS as keys
+        """
+        query = f"SELECT {', '.join(LISTED_COLUMNS)} FROM games"
+        conditions, parameters = [], []
+        if player is not None:
+            conditions.append("(player1 = ? OR player2 = ?)")
+            parameters += [player, player]
+        if status is not None:
+            conditions.append("status = ?")
+            parameters.append(status)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY updated DESC"
+        return [
+            dict(zip(LISTED_COLUMNS, row))
+            for row in self._connection.execute(query, parameters)
+        ]
+
+    def delete(self, game_id: str) -> None:
+        """Remove a game and its moves (unknown IDs are ignored)."""
+        with self._connection:
+            self._connection.execute("DELETE FROM games WHERE id = ?", (game_id,))
+
+    def __contains__(self, game_id: str) -> bool:
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM games WHERE id = ?", (game_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+
+class SessionCache:
+    """
+    Recently used games kept in memory in front of a GameStore.
+
+    Attributes:
+        store: The GameStore games are read from and written back to
+        capacity: Number of games kept in memory
+    """
+
+    def __init__(self, store: GameStore, capacity: int = DEFAULT_CAPACITY) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            store: The GameStore behind the cache
+            capacity: Number of games kept in memory
+        """
+        if capacity <= 0:
+            raise ValueError("Cache capacity must be positive.")
+        self.store = store
+        self.capacity = capacity
+        self._sessions: "OrderedDict[str, Controller]" = OrderedDict()
+        self._dirty = set()  # Games whose stored document is out of date
+
+    def create(
+        self,
+        player1_name: str,
+        player2_name: str,
+        game_id: Optional[str] = None,
+        start_fen: Optional[str] = None,
+        draw_rules: Optional[DrawRules] = None,
+    ) -> str:
+        """
+        Start and store a new game.
+
+        Args:
+            player1_name: Name of Player 1
+            player2_name: Name of Player 2
+            game_id: ID of the game (default: a new random ID)
+            start_fen: Starting position notation (default: standard start)
+            draw_rules: Draw rules of the game (default: none)
+
+        Returns:
+            The game ID
+
+        Raises:
+            ValueError: If the ID is taken or the position is invalid
+        """
+        game_id = game_id or uuid.uuid4().hex
+        if game_id in self._sessions or game_id in self.store:
+            raise ValueError(f"Game '{game_id}' already exists.")
+        controller = Controller(hint_budget=0)
+        controller.game = Game(player1_name, player2_name, draw_rules=draw_rules)
+        if start_fen is not None:
+            with contextlib.redirect_stdout(io.StringIO()) as output:
+                loaded = controller.load_fen(start_fen)
+            if not loaded:
+                raise ValueError(output.getvalue().strip())
+        self.store.save(game_id, controller)
+        self._add(game_id, controller)
+        return game_id
+
+    def get(self, game_id: str) -> Controller:
+        """
+        Get the Controller of a game, loading it if it is not in memory.
+
+        Args:
+            game_id: ID of the game
+
+        Returns:
+            The game's Controller (changes other than play() must be
+            followed by mark_dirty())
+
+        Raises:
+            KeyError: If there is no such game
+        """
+        controller = self._sessions.get(game_id)
+        if controller is not None:
+            self._sessions.move_to_end(game_id)
+            return controller
+        controller = self.store.load(game_id)
+        self._add(game_id, controller)
+        return controller
+
+    def play(self, game_id: str, move_text: str) -> bool:
+        """
+        Play a move and store it.
+
+        Args:
+            game_id: ID of the game
+            move_text: The move, as typed by players (e.g. "A3 to A4")
+
+        Returns:
+            True if the move ended the game
+
+        Raises:
+            KeyError: If there is no such game
+            ValueError: If the game is over or the move is invalid
+        """
+        controller = self.get(game_id)
+        if controller.result is not None:
+            raise ValueError(f"Game '{game_id}' is over.")
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            result = controller.take_turn(move_text)
+        if result is None:
+            raise ValueError(output.getvalue().strip())
+        if result is False:
+            controller.game.switch_turn()
+        self.store.append_move(game_id, controller)
+        self._dirty.add(game_id)
+        return result
+
+    def mark_dirty(self, game_id: str) -> None:
+        """Write a game back when it leaves the cache (after other changes)."""
+        if game_id in self._sessions:
+            self._dirty.add(game_id)
+
+    def flush(self) -> None:
+        """Write back every game changed since it was last written."""
+        for game_id in list(self._dirty):
+            self._write_back(game_id)
+
+    def close(self) -> None:
+        """Write back every changed game and empty the cache."""
+        self.flush()
+        self._sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._sessions
+
+    def __enter__(self) -> "SessionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _add(self, game_id: str, controller: Controller) -> None:
+        self._sessions[game_id] = controller
+        while len(self._sessions) > self.capacity:
+            oldest = next(iter(self._sessions))
+            self._write_back(oldest)
+            del self._sessions[oldest]
+
+    def _write_back(self, game_id: str) -> None:
+        if game_id in self._dirty:
+            self.store.save(game_id, self._sessions[game_id])
+            self._dirty.discard(game_id)
@@ -0,0 +1,325 @@
+"""
+Spectators Module
+
+Read-only spectators of a running game. The SpectatorHub subscribes to
+the game board's events and encodes each move once as a compact delta,
+which is then queued for every spectator; nobody renders or serializes
+the board per viewer.
+
+Messages are bytes, starting with a tag:
+
+- DELTA_TAG: a move, 4 bytes in all (see encode_delta): the packed move
+  (see the move module), the moved piece and the side to move after it
+- SNAPSHOT_TAG: the whole position in position notation (see
+  Board.to_fen); sent on joining, after take backs and to catch up
+
+A hub without spectators does no work per move.
+
+Spectators joining late get the last keyframe snapshot plus the deltas
+since. Every spectator has a bounded queue, so a slow one never stalls
+the game: when its queue is full it is either dropped or has its backlog
+coalesced into one snapshot of the current position.
+"""
+
+import struct
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from model.board import Board
+from model.board_events import BoardListener
+from model.game import Game
+from model.move import captured_name, encode_move, from_square, to_square
+from model.piece import Piece
+from model.terrain import SQUARE_POSITIONS
+
+DELTA_TAG = ord("D")
+SNAPSHOT_TAG = ord("S")
+
+DELTA = struct.Struct(">BHB")
+
+# What to do with a spectator whose queue is full
+COALESCE = "coalesce"
+DROP = "drop"
+
+DEFAULT_QUEUE_LIMIT = 256  # Messages waiting per spectator
+DEFAULT_KEYFRAME_INTERVAL = 32  # Moves between snapshots kept for late joiners
+
+# Piece names by rank (index 0 unused)
+_NAMES = [None] + sorted(Piece.RANKS, key=Piece.RANKS.get)
+
+
+class Delta(NamedTuple):
+    """A decoded move message."""
+
+    piece: str
+    owner: int
+    from_square: int
+    to_square: int
+    captured: Optional[str]
+    side_to_move: int
+
+
+def encode_delta(move: int, piece: Piece, side_to_move: int) -> bytes:
+    """
+    Encode a move message.
+
+    Args:
+        move: The packed move, including its capture
+        piece: The piece that moved
+        side_to_move: Player to move after the move
+
+    Returns:
+        The 4-byte message
+    """
+    code = piece.owner * 8 + piece.rank - 1
+    return DELTA.pack(DELTA_TAG, move, code | side_to_move << 4)
+
+
+def encode_snapshot(fen: str) -> bytes:
+    """Encode a snapshot message from position notation."""
+    return bytes([SNAPSHOT_TAG]) + fen.encode("ascii")
+
+
+def decode_message(message: bytes) -> Union[Delta, str]:
+    """
+    Decode a message.
+
+    Args:
+        message: A delta or snapshot message
+
+    Returns:
+        A Delta, or the position notation of a snapshot
+
+    Raises:
+        ValueError: If the message has an unknown tag
+    """
+    if message[0] == SNAPSHOT_TAG:
+        return message[1:].decode("ascii")
+    if message[0] != DELTA_TAG:
+        raise ValueError(f"Unknown message tag {message[0]}")
+    _, move, code = DELTA.unpack(message)
+    return Delta(
+        _NAMES[(code & 7) + 1],
+        code >> 3 & 1,
+        from_square(move),
+        to_square(move),
+        captured_name(move),
+        code >> 4 & 1,
+    )
+
+
+def replay_messages(
+    messages: Iterable[bytes], board: Optional[Board] = None, side_to_move: int = 0
+) -> Tuple[Optional[Board], int]:
+    """
+    Follow a game from its messages, as a spectator's client would.
+
+    Args:
+        messages: Messages received, oldest first
+        board: Board to update (default: none until a snapshot arrives)
+        side_to_move: Player to move on that board
+
+    Returns:
+        Tuple of (board, side_to_move) after the messages
+    """
+    for message in messages:
+        decoded = decode_message(message)
+        if isinstance(decoded, str):
+            board, side_to_move = Board.from_fen(decoded)
+        else:
+            board.move_piece(
+                SQUARE_POSITIONS[decoded.from_square],
+                SQUARE_POSITIONS[decoded.to_square],
+            )
+            side_to_move = decoded.side_to_move
+    return board, side_to_move
+
+
+class Spectator:
+    """
+    One read-only watcher of a game.
+
+    Attributes:
+        name: Name shown for the spectator
+        dropped: Whether the hub dropped this spectator for falling behind
+    """
+
+    def __init__(self, hub: "SpectatorHub", name: str) -> None:
+        self.name = name
+        self.dropped = False
+        self._hub = hub
+        self._queue = deque()
+
+    def poll(self, limit: Optional[int] = None) -> List[bytes]:
+        """
+        Take the waiting messages, oldest first.
+
+        Args:
+            limit: Most messages to take (default: all)
+
+        Returns:
+            The messages (empty if there are none)
+        """
+        with self._hub._lock:
+            count = len(self._queue) if limit is None else min(limit, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+
+    @property
+    def pending(self) -> int:
+        """Number of messages waiting."""
+        return len(self._queue)
+
+    def leave(self) -> None:
+        """Stop watching."""
+        self._hub.leave(self)
+
+
+class SpectatorHub(BoardListener):
+    """
+    Broadcasts the moves of a game to its spectators.
+
+    Attributes:
+        game: Game watched (None until watch() is called)
+        queue_limit: Messages kept waiting per spectator
+        keyframe_interval: Moves between snapshots kept for late joiners
+        policy: COALESCE or DROP, for spectators whose queue is full
+    """
+
+    def __init__(
+        self,
+        queue_limit: int = DEFAULT_QUEUE_LIMIT,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        policy: str = COALESCE,
+    ) -> None:
+        """
+        Initialize a hub without spectators.
+
+        Args:
+            queue_limit: Messages kept waiting per spectator (at least 2)
+            keyframe_interval: Moves between snapshots kept for late joiners
+            policy: COALESCE or DROP, for spectators whose queue is full
+        """
+        if queue_limit < 2:
+            raise ValueError("Spectator queues must hold at least 2 messages.")
+        if policy not in (COALESCE, DROP):
+            raise ValueError(f"Unknown spectator policy '{policy}'.")
+        self.queue_limit = queue_limit
+        self.keyframe_interval = keyframe_interval
+        self.policy = policy
+        self.game: Optional[Game] = None
+        self.spectators: List[Spectator] = []
+        self._keyframe: Optional[bytes] = None
+        self._recent: List[bytes] = []  # Deltas since the keyframe
+        self._paused = 0
+        self._lock = threading.RLock()
+
+    def watch(self, game: Optional[Game]) -> None:
+        """
+        Broadcast another game, sending its position to every spectator.
+
+        Args:
+            game: The game to watch, or None to stop
+        """
+        if self.game is not None:
+            self.game.board.unsubscribe(self)
+        self.game = game
+        if game is not None:
+            game.board.subscribe(self)
+        self.resync()
+
+    def resync(self) -> None:
+        """Send every spectator the current position, replacing its backlog."""
+        with self._lock:
+            self._recent = []
+            self._keyframe = None  # Made again when someone joins
+            if self.game is None or not self.spectators:
+                return
+            self._keyframe = self._snapshot()
+            for spectator in self.spectators:
+                spectator._queue.clear()
+                spectator._queue.append(self._keyframe)
+
+    @contextmanager
+    def paused(self):
+        """
+        Ignore the moves made inside the block (e.g. taking moves back)
+        and send the resulting position as a snapshot afterwards.
+        """
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+            if not self._paused:
+                self.resync()
+
+    def join(self, name: str = "spectator") -> Spectator:
+        """
+        Add a spectator, queueing the last keyframe and the moves since.
+
+        Args:
+            name: Name shown for the spectator
+
+        Returns:
+            The new Spectator
+        """
+        spectator = Spectator(self, name)
+        with self._lock:
+            if self._keyframe is None and self.game is not None:
+                self._keyframe = self._snapshot()
+                self._recent = []
+            if self._keyframe is not None:
+                spectator._queue.append(self._keyframe)
+                spectator._queue.extend(self._recent)
+            self.spectators.append(spectator)
+        return spectator
+
+    def leave(self, spectator: Spectator) -> None:
+        """Remove a spectator (others are ignored)."""
+        with self._lock:
+            if spectator in self.spectators:
+                self.spectators.remove(spectator)
+
+    def piece_moved(
+        self,
+        piece: Piece,
+        from_square: int,
+        to_square: int,
+        captured: Optional[Piece],
+    ) -> None:
+        """Encode a move once and queue it for every spectator."""
+        if self._paused:
+            return
+        if not self.spectators:
+            self._keyframe = None  # Nobody to catch up; made again on join
+            return
+        move = encode_move(
+            from_square, to_square, captured.rank if captured is not None else 0
+        )
+        delta = encode_delta(move, piece, 1 - piece.owner)
+        with self._lock:
+            if len(self._recent) >= self.keyframe_interval:
+                self._keyframe = self._snapshot(1 - piece.owner)
+                self._recent = []
+            else:
+                self._recent.append(delta)
+            snapshot = None
+            for spectator in list(self.spectators):
+                queue = spectator._queue
+                if len(queue) < self.queue_limit:
+                    queue.append(delta)
+                elif self.policy == DROP:
+                    spectator.dropped = True
+                    self.spectators.remove(spectator)
+                else:
+                    if snapshot is None:
+                        snapshot = self._snapshot(1 - piece.owner)
+                    queue.clear()
+                    queue.append(snapshot)
+
+    def _snapshot(self, side_to_move: Optional[int] = None) -> bytes:
+        if side_to_move is None:
+            side_to_move = self.game.current_turn
+        return encode_snapshot(self.game.board.to_fen(side_to_move))
@@ -0,0 +1,7 @@
+"""Engine package for JungleQuest game."""
+
+from .evaluate import evaluate
+from .ponder import Ponderer
+from .search import Search, SearchResult
+
+__all__ = ["Ponderer", "Search", "SearchResult", "evaluate"]
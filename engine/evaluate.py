@@ -0,0 +1,47 @@
+"""
+Evaluate Module
+
+Static evaluation of a position: material plus a bonus for pieces close
+to the opponent's den, read from the den distance tables.
+"""
+
+from model.board import Board
+from model.den_distance import distance_table, water_mask
+from model.terrain import square_index
+
+# Material value of each piece, in centipawn-like units
+PIECE_VALUES = {
+    "Rat": 350,
+    "Cat": 200,
+    "Dog": 300,
+    "Wolf": 400,
+    "Leopard": 500,
+    "Tiger": 800,
+    "Lion": 900,
+    "Elephant": 1000,
+}
+
+# Bonus per move a piece is closer to the opponent's den than FAR_DISTANCE
+DEN_BONUS = 8
+FAR_DISTANCE = 12
+
+
+def evaluate(board: Board, side: int) -> int:
+    """
+    Score a position from one side's point of view.
+
+    Args:
+        board: The position
+        side: Player index (0 or 1) the score is for
+
+    Returns:
+        Positive if the position favours side, negative otherwise
+    """
+    mask = water_mask(board)
+    score = 0
+    for owner, sign in ((side, 1), (1 - side, -1)):
+        for piece, position in board.piece_locations[owner].items():
+            distance = distance_table(piece.name, owner, mask)[square_index(position)]
+            closeness = max(0, FAR_DISTANCE - distance)
+            score += sign * (PIECE_VALUES[piece.name] + DEN_BONUS * closeness)
+    return score
@@ -0,0 +1,107 @@
+"""
+Ponder Module
+
+Runs a Search in a background thread while the player thinks. The best
+move found so far can be read at any time, and the search is cancelled
+and restarted whenever the position changes.
+"""
+
+import threading
+from typing import Optional
+
+from model.board import Board
+
+from .search import MAX_DEPTH, Search, SearchResult
+
+DEFAULT_CPU_BUDGET = 5.0
+
+
+class Ponderer:
+    """
+    Searches the current position in the background.
+
+    Attributes:
+        cpu_budget: CPU seconds each position may be searched for
+        max_depth: Deepest search, in plies
+    """
+
+    def __init__(
+        self, cpu_budget: float = DEFAULT_CPU_BUDGET, max_depth: int = MAX_DEPTH
+    ) -> None:
+        """
+        Initialize the ponderer (no search runs until start() is called).
+
+        Args:
+            cpu_budget: CPU seconds each position may be searched for
+            max_depth: Deepest search, in plies
+        """
+        self.cpu_budget = cpu_budget
+        self.max_depth = max_depth
+        self._key: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._first_result = threading.Event()
+        self._result: Optional[SearchResult] = None
+
+    def start(self, board: Board, side: int) -> None:
+        """
+        Start searching a position, unless it is already being searched.
+
+        Args:
+            board: The position (copied before this returns)
+            side: Player index (0 or 1) to move
+        """
+        key = board.position_key(side)
+        if key == self._key:
+            return
+        self.cancel()
+        self._key = key
+        self._stop = threading.Event()
+        self._first_result = threading.Event()
+        search = Search(board, side, self._stop, self.cpu_budget)
+        self._thread = threading.Thread(
+            target=self._run, args=(search, self._first_result), daemon=True
+        )
+        self._thread.start()
+
+    def cancel(self) -> None:
+        """Stop the background search and forget its results."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            self._key = None
+            self._result = None
+
+    def is_searching(self, board: Board, side: int) -> bool:
+        """Whether the given position is the one being (or last) searched."""
+        return self._key == board.position_key(side)
+
+    def best(self, wait: float = 1.0) -> Optional[SearchResult]:
+        """
+        Get the best move found so far.
+
+        Args:
+            wait: Seconds to wait for the first depth to complete if no
+                result is available yet
+
+        Returns:
+            The deepest completed SearchResult, or None
+        """
+        self._first_result.wait(wait)
+        with self._lock:
+            return self._result
+
+    def _run(self, search: Search, first_result: threading.Event) -> None:
+        try:
+            for result in search.iterate(self.max_depth):
+                with self._lock:
+                    if search.stop_event.is_set():
+                        return
+                    self._result = result
+                first_result.set()
+        finally:
+            # Never leave best() waiting on a search that produced nothing
+            first_result.set()
@@ -0,0 +1,484 @@
+"""
+Protocol Module
+
+A line-based text protocol, modelled on UCI, that lets any program play
+JungleQuest through its stdin and stdout. Moves are written as the two
+squares joined together in lower case ("a3a4").
+
+GUI or match runner to engine:
+
+    uci                               Identify yourself
+    isready                           Reply readyok when ready
+    position startpos [moves ...]     Set the position from the start
+    position fen <fen> [moves ...]    Set the position from a FEN string
+    go [depth N] [movetime MS]
+       [p1time MS] [p2time MS]
+       [p1inc MS] [p2inc MS]          Search the position
+    stop                              Stop searching and answer now
+    quit                              Exit
+
+Engine to GUI or match runner:
+
+    id name <name>                    Sent in reply to uci, before uciok
+    uciok                             Handshake done
+    readyok                           Reply to isready
+    info depth N score S nodes N      Progress of a search
+    info string <text>                Free text (errors, notes)
+    bestmove <move>                   Answer to go ("bestmove none" when
+                                      the side to move cannot move)
+
+EngineServer is the built-in engine speaking the protocol and
+EngineClient drives an engine running in a subprocess.
+"""
+
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import IO, List, Optional, Sequence, Tuple
+
+from model import rules
+from model.board import Board
+
+from .search import MAX_DEPTH, Search
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+ENGINE_NAME = "JungleQuest"
+
+# Share of the remaining clock spent on one move, and the reserve kept
+MOVES_TO_GO = 30
+CLOCK_RESERVE_MS = 50
+
+
+class EngineError(Exception):
+    """Raised when an engine exits, stops answering or breaks the protocol."""
+
+
+def move_to_text(move: Move) -> str:
+    """
+    Write a move in protocol notation.
+
+    Args:
+        move: (from_position, to_position) as (col, row) pairs
+
+    Returns:
+        The move, e.g. "a3a4"
+    """
+    return "".join(f"{chr(ord('a') + col)}{row + 1}" for col, row in move)
+
+
+def text_to_move(text: str) -> Move:
+    """
+    Read a move in protocol notation.
+
+    Args:
+        text: The move, e.g. "a3a4"
+
+    Returns:
+        (from_position, to_position) as (col, row) pairs
+
+    Raises:
+        ValueError: If text is not a move on the board
+    """
+    if len(text) != 4:
+        raise ValueError(f"Invalid move '{text}'")
+    squares = []
+    for letter, digit in (text[0:2], text[2:4]):
+        col = ord(letter.lower()) - ord("a")
+        row = ord(digit) - ord("1")
+        if not (0 <= col < Board.MAX_COLUMNS and 0 <= row < Board.MAX_ROWS):
+            raise ValueError(f"Invalid move '{text}'")
+        squares.append((col, row))
+    return squares[0], squares[1]
+
+
+def think_time(
+    side: int, movetime: Optional[int], clocks: Sequence[Optional[int]], increments
+) -> Optional[float]:
+    """
+    Decide how long to search from the go command's time fields.
+
+    Args:
+        side: Player index (0 or 1) to move
+        movetime: Fixed time per move in milliseconds, or None
+        clocks: Remaining time of each player in milliseconds, or None
+        increments: Time added to each player's clock per move, in ms
+
+    Returns:
+        Seconds to search, or None for no time limit
+    """
+    if movetime is not None:
+        return movetime / 1000
+    if clocks[side] is None:
+        return None
+    budget = clocks[side] / MOVES_TO_GO + increments[side]
+    budget = min(budget, clocks[side] - CLOCK_RESERVE_MS)
+    return max(budget, 1) / 1000
+
+
+class EngineServer:
+    """
+    The built-in engine: answers protocol commands with an alpha-beta
+    Search run in a background thread, so stop is handled while it thinks.
+    """
+
+    def __init__(
+        self,
+        input_stream: IO[str] = None,
+        output_stream: IO[str] = None,
+        max_depth: int = MAX_DEPTH,
+    ) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            input_stream: Where commands are read (default: sys.stdin)
+            output_stream: Where replies are written (default: sys.stdout)
+            max_depth: Deepest search when go has no depth, in plies
+        """
+        self.input_stream = input_stream or sys.stdin
+        self.output_stream = output_stream or sys.stdout
+        self.max_depth = max_depth
+        self.board = Board()
+        self.side = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._output_lock = threading.Lock()
+
+    def send(self, line: str) -> None:
+        """Write one line of output."""
+        with self._output_lock:
+            self.output_stream.write(line + "\n")
+            self.output_stream.flush()
+
+    def run(self) -> None:
+        """Answer commands until quit or the end of the input."""
+        for line in self.input_stream:
+            if not self.handle(line):
+                self._stop_search()
+                return
+        # End of input: let a running search finish and answer
+        if self._thread is not None:
+            self._thread.join()
+
+    def handle(self, line: str) -> bool:
+        """
+        Handle one command.
+
+        Args:
+            line: The command line
+
+        Returns:
+            False after quit, True otherwise
+        """
+        words = line.split()
+        if not words:
+            return True
+        command, arguments = words[0], words[1:]
+        if command == "quit":
+            return False
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "position":
+            self._stop_search()
+            self._set_position(arguments)
+        elif command == "go":
+            self._go(arguments)
+        elif command == "stop":
+            self._stop_search()
+        else:
+            self.send(f"info string unknown command '{command}'")
+        return True
+
+    def _set_position(self, arguments: List[str]) -> None:
+        if "moves" in arguments:
+            split = arguments.index("moves")
+            arguments, moves = arguments[:split], arguments[split + 1 :]
+        else:
+            moves = []
+        try:
+            if arguments[:1] == ["startpos"]:
+                board, side = Board(), 0
+            elif arguments[:1] == ["fen"]:
+                board, side = Board.from_fen(" ".join(arguments[1:]))
+            else:
+                raise ValueError("expected 'startpos' or 'fen <fen>'")
+            for text in moves:
+                move = text_to_move(text)
+                if not rules.is_legal_move(board, side, *move):
+                    raise ValueError(f"illegal move '{text}'")
+                board.move_piece(*move)
+                side = 1 - side
+        except ValueError as e:
+            self.send(f"info string invalid position: {e}")
+            return
+        self.board, self.side = board, side
+
+    def _go(self, arguments: List[str]) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.send("info string already searching")
+            return
+        fields = dict(zip(arguments[::2], arguments[1::2]))
+        try:
+            values = {name: int(value) for name, value in fields.items()}
+        except ValueError:
+            self.send("info string invalid go command")
+            return
+        budget = think_time(
+            self.side,
+            values.get("movetime"),
+            (values.get("p1time"), values.get("p2time")),
+            (values.get("p1inc", 0), values.get("p2inc", 0)),
+        )
+        self._stop = threading.Event()
+        search = Search(self.board, self.side, self._stop)
+        self._thread = threading.Thread(
+            target=self._search,
+            args=(search, values.get("depth", self.max_depth), budget),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _search(self, search: Search, depth: int, budget: Optional[float]) -> None:
+        # Wall-clock budget: the opponent's clock runs in real time
+        timer = threading.Timer(budget, self._stop.set) if budget else None
+        if timer is not None:
+            timer.start()
+        try:
+            best = None
+            for result in search.iterate(depth):
+                best = result
+                self.send(
+                    f"info depth {result.depth} score {result.score} "
+                    f"nodes {result.nodes}"
+                )
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        if best is not None:
+            move = best.move
+        else:
+            # Stopped before the first depth: any legal move will do
+            moves = rules.generate_legal_moves(search.board, search.side)
+            move = next(
+                ((start, targets[0]) for start, targets in moves.items() if targets),
+                None,
+            )
+        self.send(f"bestmove {move_to_text(move) if move else 'none'}")
+
+    def _stop_search(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+class EngineClient:
+    """
+    Talks to an engine running in a subprocess.
+
+    Attributes:
+        command: Program and arguments that start the engine
+        name: Name the engine reported (the command until the handshake)
+    """
+
+    def __init__(self, command: Sequence[str]) -> None:
+        """
+        Start the engine process.
+
+        Args:
+            command: Program and arguments that start the engine
+
+        Raises:
+            EngineError: If the program cannot be started
+        """
+        self.command = list(command)
+        self.name = " ".join(self.command)
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            raise EngineError(f"Cannot start engine '{self.name}': {e}") from e
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _read(self) -> None:
+        """Reader thread: queue every line the engine writes, then None."""
+        for line in self.process.stdout:
+            self._lines.put(line.strip())
+        self._lines.put(None)
+
+    def send(self, line: str) -> None:
+        """
+        Write one command to the engine.
+
+        Raises:
+            EngineError: If the engine has exited
+        """
+        try:
+            self.process.stdin.write(line + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise EngineError(f"Engine '{self.name}' has exited") from e
+
+    def expect(self, prefix: str, timeout: Optional[float]) -> str:
+        """
+        Wait for a line starting with a word, skipping others.
+
+        Args:
+            prefix: First word of the awaited line
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            The line
+
+        Raises:
+            EngineError: If the engine exits or the timeout expires
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise EngineError(
+                    f"Engine '{self.name}' did not send '{prefix}' in time"
+                ) from None
+            if line is None:
+                raise EngineError(f"Engine '{self.name}' has exited")
+            if line.split(" ", 1)[0] == prefix:
+                return line
+            if line.startswith("id name "):
+                self.name = line[len("id name ") :]
+
+    def handshake(self, timeout: float = 10.0) -> None:
+        """Identify the engine and wait until it is ready."""
+        self.send("uci")
+        self.expect("uciok", timeout)
+        self.send("isready")
+        self.expect("readyok", timeout)
+
+    def set_position(self, start_fen: Optional[str], moves: Sequence[Move]) -> None:
+        """
+        Send the position: a start and the moves played from it.
+
+        Args:
+            start_fen: Starting position in FEN notation, None for the
+                standard start
+            moves: Moves played since, as (from, to) pairs
+        """
+        start = f"fen {start_fen}" if start_fen else "startpos"
+        played = " ".join(move_to_text(move) for move in moves)
+        self.send(f"position {start} moves {played}" if moves else f"position {start}")
+
+    def go(
+        self,
+        movetime: Optional[int] = None,
+        clocks: Sequence[Optional[int]] = (None, None),
+        increments: Sequence[int] = (0, 0),
+        depth: Optional[int] = None,
+        grace: float = 1.0,
+        side: Optional[int] = None,
+    ) -> Optional[Move]:
+        """
+        Ask for a move and wait for it.
+
+        Args:
+            movetime: Fixed time per move in milliseconds
+            clocks: Remaining time of each player in milliseconds
+            increments: Time added to each player's clock per move, in ms
+            depth: Search depth limit, in plies
+            grace: Seconds allowed past the time limit before stop is sent
+            side: Player index (0 or 1) to move, whose clock limits the
+                wait; required with clocks
+
+        Returns:
+            The move, or None if the engine has no legal move
+
+        Raises:
+            ValueError: If clocks are given without the side to move
+            EngineError: If no valid bestmove arrives in time
+        """
+        if None not in clocks and side is None:
+            raise ValueError("The side to move is needed to use the clocks")
+        fields = []
+        if depth is not None:
+            fields += ["depth", depth]
+        if movetime is not None:
+            fields += ["movetime", movetime]
+        if None not in clocks:
+            fields += ["p1time", clocks[0], "p2time", clocks[1]]
+            fields += ["p1inc", increments[0], "p2inc", increments[1]]
+        self.send(" ".join(["go"] + [str(field) for field in fields]))
+
+        clock = None if side is None else clocks[side]
+        limits = [value for value in (movetime, clock) if value is not None]
+        timeout = max(limits) / 1000 + grace if limits else None
+        try:
+            line = self.expect("bestmove", timeout)
+        except EngineError:
+            if timeout is None or self.process.poll() is not None:
+                raise
+            self.send("stop")
+            line = self.expect("bestmove", grace)
+        text = line.split()[1] if len(line.split()) > 1 else "none"
+        if text == "none":
+            return None
+        try:
+            return text_to_move(text)
+        except ValueError as e:
+            raise EngineError(f"Engine '{self.name}' sent {e}") from None
+
+    def quit(self, timeout: float = 2.0) -> None:
+        """Ask the engine to exit, killing it if it does not."""
+        if self.process.poll() is None:
+            try:
+                self.send("quit")
+                self.process.wait(timeout)
+            except (EngineError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def __enter__(self) -> "EngineClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.quit()
+
+
+def builtin_command(depth: Optional[int] = None) -> List[str]:
+    """
+    Get the command that starts the built-in engine in a subprocess.
+
+    Args:
+        depth: Deepest search of the engine, in plies
+
+    Returns:
+        Program and arguments
+    """
+    main = os.path.join(os.path.dirname(os.path.dirname(__file__)), "main.py")
+    command = [sys.executable, main, "engine"]
+    if depth is not None:
+        command += ["--depth", str(depth)]
+    return command
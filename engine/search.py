@@ -0,0 +1,230 @@
+"""
+Search Module
+
+Iterative-deepening alpha-beta search. Each completed depth produces a
+SearchResult, so the best move found so far is always available, and the
+search can be stopped at any time through an Event or a CPU time budget.
+"""
+
+import threading
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from model import rules
+from model.board import Board
+from model.den_distance import distance_table, water_mask
+from model.terrain import square_index
+
+from .evaluate import PIECE_VALUES, evaluate
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+# Score of a won position; wins found sooner score higher
+WIN_SCORE = 1_000_000
+MAX_DEPTH = 64
+
+# Nodes searched between checks of the stop event and CPU budget
+CHECK_INTERVAL = 256
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when it is cancelled or out of budget."""
+
+
+class SearchResult:
+    """
+    The outcome of one completed search depth.
+
+    Attributes:
+        move: Best move found as (from_position, to_position), or None if
+            the side to move has no legal move
+        score: Score of the move for the side to move
+        depth: Depth searched, in plies
+        nodes: Nodes searched so far, over all depths
+        cpu_time: CPU seconds spent so far, over all depths
+    """
+
+    __slots__ = ("move", "score", "depth", "nodes", "cpu_time")
+
+    def __init__(
+        self, move: Optional[Move], score: int, depth: int, nodes: int, cpu_time: float
+    ) -> None:
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.cpu_time = cpu_time
+
+    @property
+    def is_win(self) -> bool:
+        """Whether the side to move has a forced win."""
+        return self.score > WIN_SCORE - MAX_DEPTH
+
+
+class Search:
+    """
+    Searches one position for the best move of the side to move.
+
+    The search works on its own copy of the board, so the caller's board
+    may change while it runs (for example in another thread).
+
+    Attributes:
+        board: Private copy of the position searched
+        side: Player index (0 or 1) to move
+        nodes: Nodes searched so far
+    """
+
+    def __init__(
+        self,
+        board: Board,
+        side: int,
+        stop_event: Optional[threading.Event] = None,
+        cpu_budget: Optional[float] = None,
+    ) -> None:
+        """
+        Initialize a search.
+
+        Args:
+            board: Position to search (copied)
+            side: Player index (0 or 1) to move
+            stop_event: Stops the search as soon as it is set
+            cpu_budget: CPU seconds the search may use (default: unlimited)
+        """
+        self.board = board.clone()
+        self.side = side
+        self.stop_event = stop_event or threading.Event()
+        self.cpu_budget = cpu_budget
+        self.nodes = 0
+        self._started = 0.0
+        self._root_best: Optional[Move] = None
+
+    def iterate(self, max_depth: int = MAX_DEPTH) -> Iterator[SearchResult]:
+        """
+        Search one ply deeper at a time.
+
+        Yields a result after each completed depth and returns when the
+        depth limit is reached, a forced result is found, or the search is
+        stopped. A depth interrupted part-way is discarded.
+
+        Args:
+            max_depth: Deepest search, in plies
+
+        Yields:
+            A SearchResult per completed depth
+        """
+        self._started = time.thread_time()
+        for depth in range(1, max_depth + 1):
+            try:
+                self._check_stop()
+                move, score = self._search_root(depth)
+            except SearchStopped:
+                return
+            self._root_best = move
+            yield SearchResult(
+                move, score, depth, self.nodes, time.thread_time() - self._started
+            )
+            if move is None or abs(score) > WIN_SCORE - MAX_DEPTH:
+                return
+
+    def best_move(self, max_depth: int = MAX_DEPTH) -> Optional[SearchResult]:
+        """
+        Run the search until it ends and return the deepest result.
+
+        Args:
+            max_depth: Deepest search, in plies
+
+        Returns:
+            The last completed SearchResult, or None if none completed
+        """
+        result = None
+        for result in self.iterate(max_depth):
+            pass
+        return result
+
+    def _check_stop(self) -> None:
+        if self.stop_event.is_set():
+            raise SearchStopped()
+        if (
+            self.cpu_budget is not None
+            and time.thread_time() - self._started > self.cpu_budget
+        ):
+            raise SearchStopped()
+
+    def _ordered_moves(self, side: int) -> List[Move]:
+        """
+        List legal moves, most promising first: den entries, then captures
+        of the most valuable pieces, then moves towards the opponent's den.
+        """
+        board = self.board
+        mask = water_mask(board)
+        moves = []
+        for from_position, targets in rules.generate_legal_moves(board, side).items():
+            table = distance_table(board.get_piece(from_position).name, side, mask)
+            distance = table[square_index(from_position)]
+            for to_position in targets:
+                target = board.get_piece(to_position)
+                to_distance = table[square_index(to_position)]
+                order = distance - to_distance
+                if target is not None:
+                    order += 10 * PIECE_VALUES[target.name]
+                if not to_distance:
+                    order += WIN_SCORE
+                moves.append((order, from_position, to_position))
+        moves.sort(key=lambda move: move[0], reverse=True)
+        return [(from_position, to_position) for _, from_position, to_position in moves]
+
+    def _search_root(self, depth: int) -> Tuple[Optional[Move], int]:
+        moves = self._ordered_moves(self.side)
+        if not moves:
+            return None, -WIN_SCORE
+        # Search the previous depth's best move first
+        if self._root_best in moves:
+            moves.remove(self._root_best)
+            moves.insert(0, self._root_best)
+
+        best_move, alpha = moves[0], -WIN_SCORE - 1
+        for move in moves:
+            score = -self._negamax_move(
+                move, self.side, depth, 1, -WIN_SCORE - 1, -alpha
+            )
+            if score > alpha:
+                best_move, alpha = move, score
+        return best_move, alpha
+
+    def _negamax_move(
+        self, move: Move, side: int, depth: int, ply: int, alpha: int, beta: int
+    ) -> int:
+        """Make a move, score the position for the opponent, unmake it."""
+        board = self.board
+        from_position, to_position = move
+        captured = board.move_piece(from_position, to_position)
+        try:
+            if (
+                to_position == rules.opponent_den(side)
+                or not board.piece_counts[1 - side]
+            ):
+                return -(WIN_SCORE - ply)
+            return self._negamax(1 - side, depth - 1, ply, alpha, beta)
+        finally:
+            board.move_piece(to_position, from_position)
+            if captured is not None:
+                board.place_piece(captured, to_position)
+
+    def _negamax(self, side: int, depth: int, ply: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if not self.nodes % CHECK_INTERVAL:
+            self._check_stop()
+        if depth <= 0:
+            return evaluate(self.board, side)
+
+        moves = self._ordered_moves(side)
+        if not moves:
+            return -(WIN_SCORE - ply)  # A side that cannot move loses
+        for move in moves:
+            score = -self._negamax_move(move, side, depth, ply + 1, -beta, -alpha)
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
@@ -0,0 +1,369 @@
+"""
+Solver Module
+
+Depth-first proof-number search (df-pn) for forced wins. Given a position,
+the solver proves that the side to move can force a win (den entry or
+capturing every opponent piece, whatever the defence) or disproves it.
+
+Proof and disproof numbers are kept in a transposition table of bounded
+size, keyed by position key. Mirror images (see the symmetry module) do
+not share entries: mirroring swaps the players, and with them attacker
+and defender. When the table is full, the half of its entries backed by
+the least search work is evicted. Repetitions of a position on the
+current line and lines longer than the depth limit count as failures for
+the attacker. Table entries remember whether their value rests on such a
+failure, and a root that fails only because of them is reported UNKNOWN
+rather than DISPROVEN.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from model import rules
+from model.board import Board
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+INFINITY = 10**9
+
+PROVEN = "proven"
+DISPROVEN = "disproven"
+UNKNOWN = "unknown"
+
+# Approximate size of one table entry: int key, 3-item list, dict slot
+ENTRY_BYTES = 200
+
+
+def load_position(target: str) -> Tuple[Board, int]:
+    """
+    Read the position to solve from a .jungle file or a FEN string.
+
+    Args:
+        target: Path of a saved game, or a position in FEN notation
+
+    Returns:
+        Tuple of (board, player index to move)
+
+    Raises:
+        ValueError: If the target is neither a readable game nor valid FEN
+    """
+    if not os.path.isfile(target):
+        return Board.from_fen(target)
+    with open(target, "r") as f:
+        game_data = json.load(f)
+    if game_data.get("fen"):
+        return Board.from_fen(game_data["fen"])
+    board = Board.from_snapshot(
+        {
+            tuple(map(int, pos_str.split(","))): piece_data
+            for pos_str, piece_data in game_data["board"].items()
+        }
+    )
+    return board, game_data["current_turn"]
+
+
+class SolveAborted(Exception):
+    """Raised inside the search when the node budget is used up."""
+
+
+def _peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class SolveResult:
+    """
+    Outcome of a solve.
+
+    Attributes:
+        status: PROVEN (forced win), DISPROVEN (no forced win) or UNKNOWN
+            (the node budget ran out, or see bounded)
+        line: Main line of the proof as (from, to) moves; for a proof the
+            attacker's moves are forced wins and the defender's moves the
+            longest resistance found
+        nodes: Positions expanded
+        elapsed: Wall-clock seconds
+        table_entries: Entries in the transposition table at the end
+        evictions: Number of times the table was pruned
+        peak_rss_kb: Peak resident memory of the process, in kilobytes
+            (None where the platform does not report it)
+        bounded: No forced win was found, but only because lines were cut
+            at the depth limit or ended in a repetition, so the status is
+            UNKNOWN rather than DISPROVEN
+    """
+
+    def __init__(
+        self,
+        status: str,
+        line: List[Move],
+        nodes: int,
+        elapsed: float,
+        table_entries: int,
+        evictions: int,
+        bounded: bool = False,
+    ) -> None:
+        self.status = status
+        self.line = line
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.table_entries = table_entries
+        self.evictions = evictions
+        self.peak_rss_kb = _peak_rss_kb()
+        self.bounded = bounded
+
+    @property
+    def nodes_per_second(self) -> float:
+        """Positions expanded per second."""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def table_bytes(self) -> int:
+        """Approximate memory held by the transposition table."""
+        return self.table_entries * ENTRY_BYTES
+
+
+class ProofNumberSolver:
+    """
+    Proves or disproves forced wins with df-pn.
+
+    Attributes:
+        max_nodes: Positions the solver may expand before giving up
+        table_size: Most entries kept in the transposition table
+        max_depth: Longest line searched, in plies
+    """
+
+    def __init__(
+        self,
+        max_nodes: int = 1_000_000,
+        table_size: int = 500_000,
+        max_depth: int = 200,
+    ) -> None:
+        """
+        Initialize the solver.
+
+        Args:
+            max_nodes: Positions the solver may expand before giving up
+            table_size: Most entries kept in the transposition table
+            max_depth: Longest line searched, in plies
+        """
+        self.max_nodes = max_nodes
+        self.table_size = table_size
+        self.max_depth = max_depth
+        # {position key: [phi, delta, work, bounded]}, from the side to
+        # move's view; bounded entries rely on a depth cutoff or repetition
+        self.table: Dict[int, List[int]] = {}
+        self.nodes = 0
+        self.evictions = 0
+
+    def solve(self, board: Board, side: int) -> SolveResult:
+        """
+        Try to prove a forced win for the side to move.
+
+        Args:
+            board: The position (not modified)
+            side: Player index (0 or 1) to move, the attacker
+
+        Returns:
+            The SolveResult
+        """
+        self.table = {}
+        self.nodes = 0
+        self.evictions = 0
+        self._board = board.clone()
+        self._attacker = side
+        self._path = set()
+
+        started = time.perf_counter()
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, 4 * self.max_depth + 1000))
+        bounded = False
+        try:
+            self._mid(side, INFINITY, INFINITY, 0)
+            phi, delta, _, bounded = self._lookup(self._board.position_key(side))
+            if phi == 0:
+                status = PROVEN
+            elif delta == 0 and not bounded:
+                status = DISPROVEN
+            else:
+                status = UNKNOWN
+            # Only a failed proof can rest on cutoffs and repetitions
+            bounded = bounded and delta == 0
+        except SolveAborted:
+            status = UNKNOWN
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        elapsed = time.perf_counter() - started
+
+        line = self._main_line(board, side) if status == PROVEN else []
+        return SolveResult(
+            status,
+            line,
+            self.nodes,
+            elapsed,
+            len(self.table),
+            self.evictions,
+            bounded,
+        )
+
+    # ==================== SEARCH ====================
+
+    def _lookup(self, key: int) -> List[int]:
+        return self.table.get(key) or [1, 1, 0, False]
+
+    def _store(
+        self, key: int, phi: int, delta: int, work: int, bounded: bool = False
+    ) -> None:
+        table = self.table
+        if key not in table and len(table) >= self.table_size:
+            self._evict()
+        table[key] = [phi, delta, work, bounded]
+
+    def _evict(self) -> None:
+        """Drop the half of the table backed by the least search work."""
+        entries = sorted(self.table.items(), key=lambda item: item[1][2])
+        for key, _ in entries[: len(entries) // 2]:
+            del self.table[key]
+        self.evictions += 1
+
+    def _children(self, side: int) -> List[Tuple[Move, int, Optional[Tuple]]]:
+        """
+        Expand a position: each move, the key of the position it leads to,
+        and (phi, delta, work, bounded) of that position if it is decided
+        without search.
+        """
+        board = self._board
+        opponent = 1 - side
+        children = []
+        for from_position, targets in rules.generate_legal_moves(board, side).items():
+            for to_position in targets:
+                captured = board.move_piece(from_position, to_position)
+                key = board.position_key(opponent)
+                if (
+                    to_position == rules.opponent_den(side)
+                    or not board.piece_counts[opponent]
+                ):
+                    fixed = (INFINITY, 0, 0, False)  # The opponent has lost
+                elif key in self._path:
+                    fixed = self._draw_value(opponent) + (0, True)
+                else:
+                    fixed = None
+                board.move_piece(to_position, from_position)
+                if captured is not None:
+                    board.place_piece(captured, to_position)
+                children.append(((from_position, to_position), key, fixed))
+        return children
+
+    def _draw_value(self, side: int) -> Tuple[int, int]:
+        """(phi, delta) of a drawn position: a failure for the attacker."""
+        return (INFINITY, 0) if side == self._attacker else (0, INFINITY)
+
+    def _mid(self, side: int, phi_threshold: int, delta_threshold: int, depth: int):
+        """Search the current position until a threshold is reached."""
+        board = self._board
+        key = board.position_key(side)
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SolveAborted()
+
+        children = self._children(side)
+        if not children:
+            self._store(key, INFINITY, 0, 1)  # A side that cannot move loses
+            return
+        if depth >= self.max_depth:
+            phi, delta = self._draw_value(side)
+            self._store(key, phi, delta, 1, True)
+            return
+
+        self._path.add(key)
+        work_before = self.nodes
+        try:
+            while True:
+                # phi = min of the children's deltas, delta = sum of their phis
+                phi, delta = INFINITY, 0
+                best = None
+                best_delta = second_delta = INFINITY
+                best_phi = 0
+                for child in children:
+                    child_phi, child_delta = (child[2] or self._lookup(child[1]))[:2]
+                    # Only a lost child makes the sum infinite; large finite
+                    # sums stay below INFINITY so they are never mistaken for it
+                    if child_phi >= INFINITY:
+                        delta = INFINITY
+                    elif delta < INFINITY:
+                        delta = min(INFINITY - 1, delta + child_phi)
+                    if child_delta < best_delta:
+                        second_delta = best_delta
+                        best, best_delta, best_phi = child, child_delta, child_phi
+                    elif child_delta < second_delta:
+                        second_delta = child_delta
+                phi = best_delta
+                if phi >= phi_threshold or delta >= delta_threshold:
+                    break
+
+                (from_position, to_position), _, _ = best
+                captured = board.move_piece(from_position, to_position)
+                try:
+                    self._mid(
+                        1 - side,
+                        delta_threshold - delta + best_phi,
+                        min(phi_threshold, second_delta + 1 + second_delta // 4),
+                        depth + 1,
+                    )
+                finally:
+                    board.move_piece(to_position, from_position)
+                    if captured is not None:
+                        board.place_piece(captured, to_position)
+        finally:
+            self._path.discard(key)
+        self._store(
+            key, phi, delta, self.nodes - work_before + 1, self._bounded(children, phi)
+        )
+
+    def _bounded(self, children: List, phi: int) -> bool:
+        """Whether the value of a position relies on a cutoff or repetition."""
+        values = [child[2] or self._lookup(child[1]) for child in children]
+        if phi == 0:
+            # Won if any winning move stands on its own
+            return all(value[3] for value in values if value[1] == 0)
+        return any(value[3] for value in values)
+
+    # ==================== PROOF LINE ====================
+
+    def _main_line(self, board: Board, side: int) -> List[Move]:
+        """Follow the table from a proven position to the win."""
+        self._board = board.clone()
+        self._path = set()
+        line = []
+        while len(line) < self.max_depth:
+            children = self._children(side)
+            if not children:
+                break
+            values = [(child, child[2] or self._lookup(child[1])) for child in children]
+            if side == self._attacker:
+                # A move to a position the defender has lost
+                winning = [(child, v) for child, v in values if v[1] == 0]
+            else:
+                # The defence resisting longest (most work to refute)
+                winning = sorted(values, key=lambda item: item[1][2])[-1:]
+            if not winning:
+                break
+            (from_position, to_position), key, fixed = winning[0][0]
+            line.append((from_position, to_position))
+            if fixed is not None:
+                break  # The game ends with this move
+            self._path.add(self._board.position_key(side))
+            self._board.move_piece(from_position, to_position)
+            side = 1 - side
+        return line
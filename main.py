@@ -2,22 +2,559 @@
 JungleQuest Game - Main Entry Point
 
 This module serves as the entry point for the JungleQuest game application.
-It initializes the game controller and starts the game loop.
+Without arguments it initializes the game controller and starts the game
+loop; subcommands run the batch tools instead.
 """
 
+import argparse
+import json
+import shlex
+import sys
+from typing import List, Optional
+
 from controller.controller import Controller
+from controller.profiler import TurnProfiler, start_cprofile, stop_cprofile
+from engine.ponder import DEFAULT_CPU_BUDGET
+from engine.protocol import EngineClient, EngineError
+from model.draw_rules import DrawRules
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line parser.
+
+    Returns:
+        Parser with one subparser per batch tool
+    """
+    parser = argparse.ArgumentParser(
+        prog="junglequest", description="Play JungleQuest or run its batch tools."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each phase of every turn and print a summary at exit",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="Also write cProfile/pstats data to FILE (implies --profile)",
+    )
+    parser.add_argument(
+        "--repetition-limit",
+        type=int,
+        metavar="N",
+        help="Draw new games when a position occurs N times (e.g. 3)",
+    )
+    parser.add_argument(
+        "--no-capture-limit",
+        type=int,
+        metavar="N",
+        help="Draw new games after N moves in a row without a capture",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="FILE",
+        help="Append finished games to this archive instead of asking to "
+        "save a .record file",
+    )
+    parser.add_argument(
+        "--hint-budget",
+        type=float,
+        default=DEFAULT_CPU_BUDGET,
+        metavar="SECONDS",
+        help="CPU seconds the background search for 'hint' may spend per "
+        "position (0 disables it)",
+    )
+    parser.add_argument(
+        "--engine1",
+        metavar="COMMAND",
+        help="Let a protocol engine play Player 1 ('builtin' for the built-in one)",
+    )
+    parser.add_argument(
+        "--engine2",
+        metavar="COMMAND",
+        help="Let a protocol engine play Player 2 ('builtin' for the built-in one)",
+    )
+    parser.add_argument(
+        "--engine-movetime",
+        type=int,
+        default=1000,
+        metavar="MS",
+        help="Thinking time of engine players per move",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    export = subparsers.add_parser(
+        "export-dataset",
+        help="Export training samples from .record files to .npy shards",
+    )
+    export.add_argument("source", help=".record file or directory of .record files")
+    export.add_argument("output", help="Directory for the shards and manifest.json")
+    export.add_argument(
+        "--shard-size", type=int, default=65536, help="Samples per shard"
+    )
+    export.add_argument(
+        "--chunk-size", type=int, default=64, help="Record files per worker task"
+    )
+    export.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+    export.add_argument(
+        "--augment",
+        action="store_true",
+        help="Add left-right mirrored copies of every sample",
+    )
+
+    analyze = subparsers.add_parser(
+        "analyze", help="Annotate the moves of .record files with blunder tags"
+    )
+    analyze.add_argument("source", help=".record file or directory of .record files")
+    analyze.add_argument(
+        "--depth", type=int, default=3, help="Search depth per position, in plies"
+    )
+    analyze.add_argument(
+        "--output", metavar="DIR", help="Write the annotated records to DIR"
+    )
+    analyze.add_argument(
+        "--chunk-size", type=int, default=256, help="Positions per worker task"
+    )
+    analyze.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+
+    engine = subparsers.add_parser(
+        "engine", help="Run the built-in engine over the engine protocol"
+    )
+    engine.add_argument(
+        "--depth", type=int, default=None, help="Deepest search, in plies"
+    )
+
+    match = subparsers.add_parser(
+        "match", help="Play a headless match between two protocol engines"
+    )
+    match.add_argument("engine1", help="Engine command ('builtin' for the built-in)")
+    match.add_argument("engine2", help="Engine command ('builtin' for the built-in)")
+    match.add_argument("--games", type=int, default=2, help="Games to play")
+    time_control = match.add_mutually_exclusive_group()
+    time_control.add_argument(
+        "--movetime", type=int, metavar="MS", help="Fixed time per move"
+    )
+    time_control.add_argument(
+        "--time", type=int, metavar="MS", help="Clock of each engine per game"
+    )
+    match.add_argument(
+        "--increment", type=int, default=0, metavar="MS", help="Time added per move"
+    )
+    match.add_argument(
+        "--max-moves", type=int, default=500, help="Moves after which games are drawn"
+    )
+    match.add_argument("--fen", help="Starting position of every game")
+
+    solve = subparsers.add_parser(
+        "solve", help="Prove or disprove a forced win for the side to move"
+    )
+    solve.add_argument("target", help=".jungle file or position in FEN notation")
+    solve.add_argument(
+        "--nodes", type=int, default=1_000_000, help="Positions to search at most"
+    )
+    solve.add_argument(
+        "--table-size",
+        type=int,
+        default=500_000,
+        help="Most positions kept in the transposition table",
+    )
+    solve.add_argument(
+        "--max-depth", type=int, default=200, help="Longest line searched, in plies"
+    )
+
+    stats = subparsers.add_parser(
+        "stats", help="Aggregate statistics over a directory of .record files"
+    )
+    stats.add_argument(
+        "source", help=".record file, directory of .record files or game archive"
+    )
+    stats.add_argument(
+        "--output", metavar="FILE", help="Also write the statistics as JSON to FILE"
+    )
+    stats.add_argument(
+        "--chunk-size", type=int, default=256, help="Games per worker task"
+    )
+    stats.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+
+    archive_import = subparsers.add_parser(
+        "archive-import", help="Append .record files to a game archive"
+    )
+    archive_import.add_argument(
+        "source", help=".record file or directory of .record files"
+    )
+    archive_import.add_argument("archive", help="Archive file (created if missing)")
+
+    archive_export = subparsers.add_parser(
+        "archive-export", help="Write the games of an archive as .record files"
+    )
+    archive_export.add_argument("archive", help="Archive file")
+    archive_export.add_argument("output", help="Directory for the .record files")
+    archive_export.add_argument(
+        "--games",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="Numbers of the games to export (default: all)",
+    )
+
+    fuzz = subparsers.add_parser(
+        "fuzz-rules",
+        help="Check every rules implementation against the others in random games",
+    )
+    fuzz.add_argument("--games", type=int, default=1000, help="Random games to play")
+    fuzz.add_argument(
+        "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+    )
+    fuzz.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    fuzz.add_argument(
+        "--max-plies", type=int, default=200, help="Moves after which a game ends"
+    )
+    fuzz.add_argument(
+        "--checks",
+        metavar="NAME",
+        nargs="+",
+        help=(
+            "Checks to run (default: kernel, search and incremental; "
+            "validators, attacks, encodings and undo are sampled every 8 plies)"
+        ),
+    )
+
+    return parser
+
+
+def run_export_dataset(args: argparse.Namespace) -> int:
+    """Run the export-dataset subcommand."""
+    from tools.dataset_export import export_dataset
+
+    manifest = export_dataset(
+        args.source,
+        args.output,
+        shard_size=args.shard_size,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        augment=args.augment,
+    )
+    print(
+        f"✓ Exported {manifest['samples']} samples from {manifest['games']} games "
+        f"into {len(manifest['shards'])} shard(s) in '{args.output}'"
+    )
+    for error in manifest["errors"]:
+        print(f"✗ Skipped {error}")
+    return 0
+
+
+def run_analyze(args: argparse.Namespace) -> int:
+    """Run the analyze subcommand."""
+    from tools.analysis import analyze_records, format_report
+
+    try:
+        summary = analyze_records(
+            args.source,
+            depth=args.depth,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            output_dir=args.output,
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    print(format_report(summary))
+    for error in summary["errors"]:
+        print(f"✗ Skipped {error}")
+    if args.output:
+        print(f"✓ Annotated records written to '{args.output}'")
+    return 0
+
+
+def engine_command(command: str) -> List[str]:
+    """Split an engine command line; 'builtin' starts the built-in engine."""
+    from engine.protocol import builtin_command
+
+    return builtin_command() if command == "builtin" else shlex.split(command)
+
+
+def run_engine(args: argparse.Namespace) -> int:
+    """Run the engine subcommand."""
+    from engine.protocol import EngineServer
+    from engine.search import MAX_DEPTH
+
+    EngineServer(max_depth=args.depth or MAX_DEPTH).run()
+    return 0
+
+
+def run_match(args: argparse.Namespace, draw_rules: DrawRules) -> int:
+    """Run the match subcommand."""
+    from engine.protocol import EngineError
+    from tools.match import TimeControl, play_match
+
+    try:
+        if args.time is not None:
+            time_control = TimeControl(args.time, args.increment)
+        else:
+            time_control = TimeControl(movetime_ms=args.movetime or 100)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+
+    def report(number, game):
+        first, second = game["engine_sides"]
+        winner = (
+            "draw"
+            if game["winner"] is None
+            else f"engine {game['engine_sides'][game['winner']] + 1} wins"
+        )
+        print(
+            f"Game {number}: engine {first + 1} vs engine {second + 1}: "
+            f"{winner} ({game['reason']}, {len(game['moves'])} moves)"
+        )
 
+    print(f"Match of {args.games} game(s), {time_control.describe()}")
+    try:
+        match = play_match(
+            [engine_command(args.engine1), engine_command(args.engine2)],
+            args.games,
+            time_control,
+            draw_rules,
+            args.fen,
+            args.max_moves,
+            on_game=report,
+        )
+    except (EngineError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    for index, name in enumerate(match["engines"]):
+        print(
+            f"Engine {index + 1} ({name}): {match['score'][index]:g} points, "
+            f"{match['wins'][index]} win(s)"
+        )
+    print(f"Draws: {match['draws']}")
+    return 0
 
-def main() -> None:
+
+def run_solve(args: argparse.Namespace) -> int:
+    """Run the solve subcommand."""
+    from engine.solver import DISPROVEN, PROVEN, ProofNumberSolver, load_position
+
+    try:
+        board, side = load_position(args.target)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"✗ Cannot read position: {e}")
+        return 2
+
+    solver = ProofNumberSolver(args.nodes, args.table_size, args.max_depth)
+    result = solver.solve(board, side)
+    if result.status == PROVEN:
+        print(f"✓ Player {side + 1} to move has a forced win:")
+        for number, (from_position, to_position) in enumerate(result.line, start=1):
+            mover = (side + number - 1) % 2 + 1
+            print(
+                f"  {number:>3}. Player {mover}: "
+                f"{_notation(from_position)} to {_notation(to_position)}"
+            )
+    elif result.status == DISPROVEN:
+        print(f"✗ Player {side + 1} to move has no forced win.")
+    elif result.bounded:
+        print(
+            f"? No forced win within {args.max_depth} plies without repeating a "
+            "position (raise --max-depth)."
+        )
+    else:
+        print(f"? Unsolved after {result.nodes} positions (raise --nodes).")
+    print(
+        f"Searched {result.nodes} positions in {result.elapsed:.2f}s "
+        f"({result.nodes_per_second:,.0f} positions/s)"
+    )
+    peak = (
+        "unknown"
+        if result.peak_rss_kb is None
+        else f"{result.peak_rss_kb / 1024:.1f} MB"
+    )
+    print(
+        f"Table: {result.table_entries} entries "
+        f"(~{result.table_bytes / 1_000_000:.1f} MB), "
+        f"{result.evictions} eviction(s); peak RSS {peak}"
+    )
+    return 0
+
+
+def run_stats(args: argparse.Namespace) -> int:
+    """Run the stats subcommand."""
+    from tools.corpus_stats import corpus_stats, format_report
+
+    try:
+        stats = corpus_stats(
+            args.source, workers=args.workers, chunk_size=args.chunk_size
+        )
+    except (RuntimeError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+    summary = stats.to_dict()
+    print(format_report(summary))
+    for error in summary["errors"]:
+        print(f"✗ Skipped {error}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"✓ Statistics written to '{args.output}'")
+    return 0
+
+
+def run_archive_import(args: argparse.Namespace) -> int:
+    """Run the archive-import subcommand."""
+    from controller.record_archive import import_records
+    from tools.dataset_export import find_record_files
+
+    try:
+        summary = import_records(find_record_files(args.source), args.archive)
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 2
+    print(f"✓ Added {summary['games']} game(s) to '{args.archive}'")
+    for error in summary["errors"]:
+        print(f"✗ Skipped {error}")
+    return 0
+
+
+def run_archive_export(args: argparse.Namespace) -> int:
+    """Run the archive-export subcommand."""
+    from controller.record_archive import export_records
+
+    try:
+        written = export_records(args.archive, args.output, args.games)
+    except (OSError, ValueError, IndexError) as e:
+        print(f"✗ {e}")
+        return 2
+    print(f"✓ Wrote {len(written)} record(s) to '{args.output}'")
+    return 0
+
+
+def run_fuzz_rules(args: argparse.Namespace) -> int:
+    """Run the fuzz-rules subcommand."""
+    from tools.differential import format_report, run_differential
+
+    try:
+        report = run_differential(
+            args.games,
+            workers=args.workers,
+            seed=args.seed,
+            max_plies=args.max_plies,
+            checks=args.checks,
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    print(format_report(report))
+    return 1 if report["failures"] else 0
+
+
+def _notation(position) -> str:
+    """Convert (col, row) coordinates to chess-like notation (e.g., A1)."""
+    col, row = position
+    return f"{chr(ord('A') + col)}{row + 1}"
+
+
+def attach_engines(controller: Controller, args: argparse.Namespace) -> None:
+    """
+    Start the engines given by --engine1 and --engine2 as players.
+
+    Raises:
+        EngineError: If an engine fails to start; the engines started
+            before it are quit and detached
+    """
+    for player, command in enumerate((args.engine1, args.engine2)):
+        if command is None:
+            continue
+        engine = None
+        try:
+            engine = EngineClient(engine_command(command))
+            engine.handshake()
+        except EngineError:
+            if engine is not None:
+                engine.quit()
+            quit_engines(controller)
+            raise
+        controller.attach_engine(player, engine, args.engine_movetime)
+
+
+def quit_engines(controller: Controller) -> None:
+    """Quit and detach the engines playing in a controller."""
+    for player, engine in enumerate(controller.engines):
+        if engine is not None:
+            engine.quit()
+            controller.engines[player] = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """
-    Initialize and start the JungleQuest game.
+    Initialize and start the JungleQuest game, or run a batch tool.
+
+    Without a subcommand, creates a Controller instance and begins the
+    game session, including player setup and main game loop.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:])
 
-    Creates a Controller instance and begins the game session,
-    including player setup and main game loop.
+    Returns:
+        Process exit status
     """
-    controller = Controller()
-    controller.start_game()
+    args = build_parser().parse_args(argv)
+    if args.profile_output is not None:
+        args.profile = True
+
+    if args.command == "export-dataset":
+        return run_export_dataset(args)
+    if args.command == "engine":
+        return run_engine(args)
+    if args.command == "analyze":
+        return run_analyze(args)
+    if args.command == "solve":
+        return run_solve(args)
+    if args.command == "stats":
+        return run_stats(args)
+    if args.command == "archive-import":
+        return run_archive_import(args)
+    if args.command == "archive-export":
+        return run_archive_export(args)
+    if args.command == "fuzz-rules":
+        return run_fuzz_rules(args)
+
+    try:
+        draw_rules = DrawRules(args.repetition_limit, args.no_capture_limit)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+
+    if args.command == "match":
+        return run_match(args, draw_rules)
+
+    profiler = TurnProfiler(enabled=args.profile)
+    controller = Controller(profiler, draw_rules, args.hint_budget)
+    controller.archive_path = args.archive
+    try:
+        attach_engines(controller, args)
+    except EngineError as e:
+        print(f"✗ {e}")
+        return 1
+    cprofile = start_cprofile(args.profile_output is not None)
+    try:
+        controller.start_game()
+    finally:
+        stop_cprofile(cprofile, args.profile_output)
+        quit_engines(controller)
+        controller.close_archive()
+        if args.profile:
+            print(profiler.summary())
+            if args.profile_output:
+                print(f"✓ cProfile data written to '{args.profile_output}'")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,15 +1,24 @@
 """Model package for JungleQuest game."""
 
+from .attack_map import AttackMap
 from .board import Board
+from .draw_rules import DrawRules, DrawTracker
 from .game import Game
 from .piece import Piece
 from .player import Player
+from .terrain import TerrainTile
 from .tile import Tile
+from .variation_tree import VariationTree
 
 __all__ = [
+    "AttackMap",
     "Board",
+    "DrawRules",
+    "DrawTracker",
     "Game",
     "Piece",
     "Player",
+    "TerrainTile",
     "Tile",
+    "VariationTree",
 ]
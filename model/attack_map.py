@@ -0,0 +1,178 @@
+"""
+Attack Map Module
+
+This module contains the AttackMap class which keeps, for each side, the
+squares its pieces attack and the pieces it could capture. It subscribes
+to a Board's events (see Board.track_attacks) and is updated by every
+placement and removal, so reading it never scans the board.
+
+A piece attacks every square it could move to by the movement rules
+(rules.piece_reach), whatever stands there. Only the moved piece and,
+when water occupancy changes, the Lions and Tigers whose jumps it may
+block need their attacks recomputed.
+"""
+
+from typing import Dict, List, Set, Tuple
+
+from . import rules
+from .board import Board
+from .board_events import BoardListener
+from .piece import Piece
+from .terrain import NUM_SQUARES, SQUARE_POSITIONS, TERRAIN_SQUARES, square_index
+from .tile import Tile
+
+Position = Tuple[int, int]
+
+
+class AttackMap(BoardListener):
+    """
+    Attacked squares and capturable pieces of both sides of a board.
+
+    Attributes:
+        board: The board tracked
+        reach: Squares attacked by each piece on the board
+        attackers: Pieces attacking each square, indexed by square
+    """
+
+    def __init__(self, board: Board) -> None:
+        """
+        Build the map of a board's current position.
+
+        Args:
+            board: The board to track
+        """
+        self.board = board
+        self.reset()
+        for owner in (Piece.PLAYER_1, Piece.PLAYER_2):
+            for piece, position in board.piece_locations[owner].items():
+                self.piece_placed(piece, square_index(position))
+
+    def reset(self) -> None:
+        """Forget every piece."""
+        self.reach: Dict[Piece, Tuple[int, ...]] = {}
+        self.attackers: List[Set[Piece]] = [set() for _ in range(NUM_SQUARES)]
+        self._jumpers: Set[Piece] = set()
+
+    def board_cleared(self) -> None:
+        """Forget every piece (the board was cleared)."""
+        self.reset()
+
+    def piece_placed(self, piece: Piece, square: int) -> None:
+        """Add the attacks of a piece placed on a square."""
+        self._add(piece, SQUARE_POSITIONS[square])
+        if piece.name in rules.JUMPING_PIECES:
+            self._jumpers.add(piece)
+        if TERRAIN_SQUARES[square].tile_type == Tile.WATER:
+            self._update_jumpers()
+
+    def piece_removed(self, piece: Piece, square: int) -> None:
+        """Drop the attacks of a piece removed from a square."""
+        self._discard(piece)
+        self._jumpers.discard(piece)
+        if TERRAIN_SQUARES[square].tile_type == Tile.WATER:
+            self._update_jumpers()
+
+    def _add(self, piece: Piece, position: Position) -> None:
+        squares = tuple(
+            square_index(target)
+            for target in rules.piece_reach(self.board, position, piece)
+        )
+        self.reach[piece] = squares
+        for square in squares:
+            self.attackers[square].add(piece)
+
+    def _discard(self, piece: Piece) -> None:
+        for square in self.reach.pop(piece, ()):
+            self.attackers[square].discard(piece)
+
+    def _update_jumpers(self) -> None:
+        """Recompute river jumps after a rat entered or left the water."""
+        for piece in self._jumpers:
+            self._discard(piece)
+            self._add(piece, self.board.get_piece_position(piece))
+
+    def is_attacked(self, position: Position, side: int) -> bool:
+        """
+        Check whether a side attacks a square.
+
+        Args:
+            position: Square as (col, row)
+            side: Player index (0 or 1) of the attacker
+
+        Returns:
+            True if any of the side's pieces could move to the square
+        """
+        return any(
+            piece.owner == side for piece in self.attackers[square_index(position)]
+        )
+
+    def attackers_of(self, position: Position, side: int) -> List[Piece]:
+        """
+        List the pieces of a side attacking a square.
+
+        Args:
+            position: Square as (col, row)
+            side: Player index (0 or 1) of the attackers
+
+        Returns:
+            The attacking pieces
+        """
+        return [
+            piece
+            for piece in self.attackers[square_index(position)]
+            if piece.owner == side
+        ]
+
+    def attacked_squares(self, side: int) -> Set[Position]:
+        """
+        Get every square a side attacks.
+
+        Args:
+            side: Player index (0 or 1)
+
+        Returns:
+            Attacked squares as (col, row)
+        """
+        return {
+            SQUARE_POSITIONS[square]
+            for piece, squares in self.reach.items()
+            if piece.owner == side
+            for square in squares
+        }
+
+    def capturers_of(self, piece: Piece) -> List[Piece]:
+        """
+        List the opponent pieces that could capture a piece right now.
+
+        Args:
+            piece: A piece on the board
+
+        Returns:
+            The opponent pieces able to capture it (by Piece.can_capture)
+        """
+        board = self.board
+        position = board.get_piece_position(piece)
+        return [
+            attacker
+            for attacker in self.attackers[square_index(position)]
+            if attacker.owner != piece.owner
+            and rules.can_capture_at(
+                board, attacker, board.get_piece_position(attacker), position
+            )
+        ]
+
+    def threatened_pieces(self, side: int) -> List[Tuple[Piece, Position]]:
+        """
+        List a side's pieces that the opponent could capture (en prise).
+
+        Args:
+            side: Player index (0 or 1) whose pieces are checked
+
+        Returns:
+            (piece, position) of each threatened piece
+        """
+        return [
+            (piece, position)
+            for piece, position in self.board.piece_locations[side].items()
+            if self.capturers_of(piece)
+        ]
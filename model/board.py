@@ -2,77 +2,236 @@
 Board Module
 
 This module contains the Board class which represents the game board,
-manages tiles, and handles piece placement and removal.
+tracks piece placement and handles piece placement and removal. Terrain
+is shared by every board (see the terrain module).
 """
 
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from .tile import Tile
 from .piece import Piece
+from .board_events import BoardListener
+from .terrain import (
+    MAX_COLUMNS,
+    MAX_ROWS,
+    NUM_SQUARES,
+    SQUARE_POSITIONS,
+    TERRAIN,
+    TerrainTile,
+    square_index,
+)
+from .zobrist import PIECE_KEYS, ROTATED_PIECE_KEYS, SIDE_TO_MOVE_KEY
+
+# Format: (name, col_p1, row_p1, col_p2, row_p2)
+STARTING_POSITIONS = [
+    ("Elephant", 6, 2, 0, 6),
+    ("Tiger", 6, 0, 0, 8),
+    ("Cat", 5, 1, 1, 7),
+    ("Wolf", 4, 2, 2, 6),
+    ("Leopard", 2, 2, 4, 6),
+    ("Dog", 1, 1, 5, 7),
+    ("Rat", 0, 2, 6, 6),
+    ("Lion", 0, 0, 6, 8),
+]
+
+# Position notation letters; uppercase for Player 1, lowercase for Player 2
+FEN_LETTERS: Dict[str, str] = {
+    "Rat": "R",
+    "Cat": "C",
+    "Dog": "D",
+    "Wolf": "W",
+    "Leopard": "P",
+    "Tiger": "T",
+    "Lion": "L",
+    "Elephant": "E",
+}
+FEN_PIECES: Dict[str, Tuple[str, int]] = {
+    **{letter: (name, Piece.PLAYER_1) for name, letter in FEN_LETTERS.items()},
+    **{letter.lower(): (name, Piece.PLAYER_2) for name, letter in FEN_LETTERS.items()},
+}
+STARTING_FEN = "t5l/1c3d1/e1w1p1r/7/7/7/R1P1W1E/1D3C1/L5T 1"
+
+# Board snapshot: {(col, row): {"name": ..., "owner": ...}} for occupied tiles
+Snapshot = Dict[Tuple[int, int], Dict]
+
+
+class SquareTile(Tile):
+    """
+    A read-only Tile showing one square of a Board: its terrain and the
+    piece on it when the tile was made.
+
+    It is a copy: later changes to the board do not show in it, and any
+    attempt to modify it raises AttributeError. Use Board.place_piece,
+    remove_piece and move_piece to change the board.
+    """
+
+    _frozen = False
+
+    def __init__(self, terrain: TerrainTile, piece: Optional[Piece]) -> None:
+        """
+        Initialize a square tile.
+
+        Args:
+            terrain: The terrain of the square
+            piece: The piece on the square (or None)
+        """
+        super().__init__(terrain.tile_type, piece, terrain.owner)
+        self._frozen = True
+
+    def __setattr__(self, name, value) -> None:
+        if self._frozen:
+            raise AttributeError("Board tiles are read-only copies")
+        super().__setattr__(name, value)
 
 
 class Board:
     """
     Represents the JungleQuest game board.
 
-    The board is a 7x9 grid containing different types of tiles
-    (land, water, dens, traps) and manages piece placement.
+    The board is a 7x9 grid of shared terrain tiles (land, water, dens,
+    traps); a Board only stores which piece occupies each square.
 
     Attributes:
         MAX_COLUMNS: Number of columns (7, labeled A-G)
         MAX_ROWS: Number of rows (9, labeled 1-9)
         PLAYER_1_DEN_POSITION: Position of Player 1's den (D1)
         PLAYER_2_DEN_POSITION: Position of Player 2's den (D9)
-        grid: 2D list of Tile objects representing the board
+        squares: Piece (or None) on each square, indexed row * 7 + col
+        piece_counts: Number of pieces on the board per player
+        piece_locations: Per player, a dict mapping each piece to its position
+        revision: Counter bumped on every change to the board
+        move_cache: Legal moves cached for the current revision (see rules)
+        zobrist_key: Zobrist hash of the pieces on the board (see zobrist)
+        rotated_key: Zobrist hash of the position rotated 180 degrees with
+            owners swapped (see symmetry)
+        attack_map: Attacked squares and threatened pieces, kept up to date
+            once track_attacks() is called (None until then)
+        listeners: Objects told about every change (see board_events)
     """
 
-    MAX_COLUMNS = 7
-    MAX_ROWS = 9
+    MAX_COLUMNS = MAX_COLUMNS
+    MAX_ROWS = MAX_ROWS
 
     PLAYER_1_DEN_POSITION: Tuple[int, int] = (3, 0)
     PLAYER_2_DEN_POSITION: Tuple[int, int] = (3, 8)
 
     def __init__(self) -> None:
-        """Initialize the board with tiles and pieces in starting positions."""
-        self.grid = self.initialize_empty_board()
-        self.initialize_special_tiles()
+        """Initialize the board with pieces in starting positions."""
+        self._clear_occupancy()
         self.initialize_pieces()
 
-    def initialize_empty_board(self) -> list:
+    def _clear_occupancy(self) -> None:
+        self.squares: List[Optional[Piece]] = [None] * NUM_SQUARES
+        # Kept up to date by place_piece/remove_piece
+        self.piece_counts: List[int] = [0, 0]
+        self.piece_locations: List[Dict[Piece, Tuple[int, int]]] = [{}, {}]
+        self.revision = getattr(self, "revision", 0) + 1
+        self.move_cache: List = [None, None, None]
+        self.zobrist_key = 0
+        self.rotated_key = 0
+        self.attack_map = getattr(self, "attack_map", None)
+        self.listeners: List[BoardListener] = getattr(self, "listeners", [])
+        for listener in self.listeners:
+            listener.board_cleared()
+
+    @classmethod
+    def empty(cls) -> "Board":
+        """
+        Create a board without any pieces.
+
+        Returns:
+            An empty Board
         """
-        Create an empty board filled with default land tiles.
+        board = cls.__new__(cls)
+        board._clear_occupancy()
+        return board
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "Board":
+        """
+        Create a board holding the pieces of a snapshot.
+
+        Args:
+            snapshot: Pieces by position, as returned by snapshot()
 
         Returns:
-            2D list of Tile objects (columns x rows)
+            A new Board
         """
-        # Fill the board with empty, land (default) tiles.
-        # The double list is filled with 7 lists, each containing 9 elements.
-        # Each inner list represents a column from top to bottom.
-        return [[Tile() for _ in range(self.MAX_ROWS)] for _ in range(self.MAX_COLUMNS)]
+        board = cls.empty()
+        board._place_snapshot(snapshot)
+        return board
 
-    def initialize_special_tiles(self) -> None:
+    @classmethod
+    def from_fen(cls, fen: str) -> Tuple["Board", int]:
         """
-        Initialize special tiles (dens, traps, water) on the board.
+        Create a board from position notation.
+
+        The notation lists rows 9 down to 1 separated by "/", each row
+        from column A to G. Letters are pieces (see FEN_LETTERS; uppercase
+        for Player 1, lowercase for Player 2) and digits count empty tiles.
+        A space and the side to move ("1" or "2") follow, e.g. the
+        starting position is "t5l/1c3d1/e1w1p1r/7/7/7/R1P1W1E/1D3C1/L5T 1".
+
+        Args:
+            fen: Position notation
 
-        Layout:
-        - Dens: D1 (Player 1) and D9 (Player 2)
-        - Traps: 3 surrounding each den
-        - Water: Two 2x3 river sections in the middle
+        Returns:
+            Tuple of (board, side_to_move) with side_to_move 0 or 1
+
+        Raises:
+            ValueError: If the notation is malformed
+        """
+        fields = fen.split()
+        if len(fields) != 2 or fields[1] not in ("1", "2"):
+            raise ValueError(f"Expected '<rows> <1|2>', got {fen!r}")
+        rows = fields[0].split("/")
+        if len(rows) != MAX_ROWS:
+            raise ValueError(f"Expected {MAX_ROWS} rows, got {len(rows)}")
+
+        board = cls.empty()
+        for index, text in enumerate(rows):
+            row = MAX_ROWS - 1 - index
+            col = 0
+            for char in text:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                if char not in FEN_PIECES or col >= MAX_COLUMNS:
+                    raise ValueError(f"Invalid row {row + 1}: {text!r}")
+                name, owner = FEN_PIECES[char]
+                board.place_piece(Piece(name, owner), (col, row))
+                col += 1
+            if col != MAX_COLUMNS:
+                raise ValueError(f"Row {row + 1} does not have 7 columns: {text!r}")
+        return board, int(fields[1]) - 1
+
+    def to_fen(self, side_to_move: int = 0) -> str:
         """
-        # Dens
-        self.grid[3][0] = Tile(Tile.PLAYER_1_DEN, None)
-        self.grid[3][8] = Tile(Tile.PLAYER_2_DEN, None)
+        Describe the position in one line of notation (see from_fen).
 
-        # Traps (3 surrounding each den)
-        for col in [2, 3, 4]:
-            row = 0 if col != 3 else 1
-            self.grid[col][row] = Tile(Tile.TRAP, None, Tile.PLAYER_1)
-            row = 8 if col != 3 else 7
-            self.grid[col][row] = Tile(Tile.TRAP, None, Tile.PLAYER_2)
+        Args:
+            side_to_move: Player to move (0 or 1)
 
-        # Rivers (two 2x3 sections)
-        for col in [1, 2, 4, 5]:
-            for row in [3, 4, 5]:
-                self.grid[col][row] = Tile(Tile.WATER, None)
+        Returns:
+            Position notation, usable as a dictionary key
+        """
+        squares = self.squares
+        rows = []
+        for row in range(MAX_ROWS - 1, -1, -1):
+            text = ""
+            empty = 0
+            for piece in squares[row * MAX_COLUMNS : (row + 1) * MAX_COLUMNS]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = FEN_LETTERS[piece.name]
+                text += letter if piece.owner == Piece.PLAYER_1 else letter.lower()
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        return f"{'/'.join(rows)} {side_to_move + 1}"
 
     def initialize_pieces(self) -> None:
         """
@@ -81,22 +240,85 @@ class Board:
         Each player starts with 8 pieces:
         Elephant, Tiger, Cat, Wolf, Leopard, Dog, Rat, Lion
         """
-        # Format: (name, col_p1, row_p1, col_p2, row_p2)
-        piece_positions = [
-            ("Elephant", 6, 2, 0, 6),
-            ("Tiger", 6, 0, 0, 8),
-            ("Cat", 5, 1, 1, 7),
-            ("Wolf", 4, 2, 2, 6),
-            ("Leopard", 2, 2, 4, 6),
-            ("Dog", 1, 1, 5, 7),
-            ("Rat", 0, 2, 6, 6),
-            ("Lion", 0, 0, 6, 8),
-        ]
-
-        for name, col_p1, row_p1, col_p2, row_p2 in piece_positions:
+        for name, col_p1, row_p1, col_p2, row_p2 in STARTING_POSITIONS:
             self.place_piece(Piece(name, Piece.PLAYER_1), (col_p1, row_p1))
             self.place_piece(Piece(name, Piece.PLAYER_2), (col_p2, row_p2))
 
+    def reset(self) -> None:
+        """Put all pieces back in their starting positions."""
+        self._clear_occupancy()
+        self.initialize_pieces()
+
+    def clear(self) -> None:
+        """Remove every piece from the board."""
+        self._clear_occupancy()
+
+    def clone(self) -> "Board":
+        """
+        Copy the board.
+
+        The copy shares Piece objects with this board; pieces are never
+        modified once created, only moved between squares.
+
+        Returns:
+            A new Board with the same occupancy
+        """
+        board = self.__class__.__new__(self.__class__)
+        board.squares = list(self.squares)
+        board.piece_counts = list(self.piece_counts)
+        board.piece_locations = [dict(locations) for locations in self.piece_locations]
+        board.revision = self.revision
+        board.move_cache = list(self.move_cache)
+        board.zobrist_key = self.zobrist_key
+        board.rotated_key = self.rotated_key
+        board.attack_map = None  # Call track_attacks() on the copy if needed
+        board.listeners = []  # Copies start without subscribers
+        return board
+
+    def snapshot(self) -> Snapshot:
+        """
+        Describe the pieces on the board.
+
+        Returns:
+            Dictionary mapping (col, row) to {"name", "owner"} for each piece
+        """
+        return {
+            SQUARE_POSITIONS[square]: {"name": piece.name, "owner": piece.owner}
+            for square, piece in enumerate(self.squares)
+            if piece is not None
+        }
+
+    def load_snapshot(self, snapshot: Snapshot) -> None:
+        """
+        Replace the pieces on the board with those of a snapshot.
+
+        Args:
+            snapshot: Pieces by position, as returned by snapshot()
+        """
+        self._clear_occupancy()
+        self._place_snapshot(snapshot)
+
+    def _place_snapshot(self, snapshot: Snapshot) -> None:
+        for position, piece_info in snapshot.items():
+            self.place_piece(Piece(piece_info["name"], piece_info["owner"]), position)
+
+    @property
+    def grid(self) -> List[List[SquareTile]]:
+        """
+        Build a 2D list of Tiles (columns x rows) showing terrain and pieces.
+
+        The tiles are read-only copies (see SquareTile); read squares for
+        the live contents of the board.
+        """
+        squares = self.squares
+        return [
+            [
+                SquareTile(TERRAIN[col][row], squares[row * MAX_COLUMNS + col])
+                for row in range(MAX_ROWS)
+            ]
+            for col in range(MAX_COLUMNS)
+        ]
+
     def place_piece(self, piece: Piece, position: Tuple[int, int]) -> bool:
         """
         Place a piece on the board at the specified position.
@@ -109,11 +331,20 @@ class Board:
             True if piece placed successfully, False if position occupied
         """
         col, row = position
-        tile: Tile = self.grid[col][row]
-        if tile.is_empty():
-            tile.place_piece(piece)
-        else:
+        square = row * MAX_COLUMNS + col
+        if self.squares[square] is not None:
             print("Cannot place piece here.")
+            return False
+        self.squares[square] = piece
+        self.revision += 1
+        self.piece_counts[piece.owner] += 1
+        self.piece_locations[piece.owner][piece] = position
+        self.zobrist_key ^= PIECE_KEYS[piece.owner][piece.rank][square]
+        self.rotated_key ^= ROTATED_PIECE_KEYS[piece.owner][piece.rank][square]
+        if self.listeners:
+            for listener in self.listeners:
+                listener.piece_placed(piece, square)
+        return True
 
     def remove_piece(self, position: Tuple[int, int]) -> None:
         """
@@ -123,8 +354,118 @@ class Board:
             position: Position to clear as (col, row)
         """
         col, row = position
-        tile: Tile = self.grid[col][row]
-        tile.piece = None
+        square = row * MAX_COLUMNS + col
+        piece = self.squares[square]
+        if piece is not None:
+            self.revision += 1
+            self.piece_counts[piece.owner] -= 1
+            del self.piece_locations[piece.owner][piece]
+            self.zobrist_key ^= PIECE_KEYS[piece.owner][piece.rank][square]
+            self.rotated_key ^= ROTATED_PIECE_KEYS[piece.owner][piece.rank][square]
+            self.squares[square] = None
+            if self.listeners:
+                for listener in self.listeners:
+                    listener.piece_removed(piece, square)
+
+    def move_piece(
+        self, from_position: Tuple[int, int], to_position: Tuple[int, int]
+    ) -> Optional[Piece]:
+        """
+        Move the piece at from_position to to_position, capturing any occupant.
+
+        No rule checking is performed; callers validate the move first.
+
+        Args:
+            from_position: Starting position as (col, row)
+            to_position: Target position as (col, row)
+
+        Returns:
+            The captured Piece, or None if the target was empty
+        """
+        piece = self.get_piece(from_position)
+        captured = self.get_piece(to_position)
+        if captured is not None:
+            self.remove_piece(to_position)
+        self.remove_piece(from_position)
+        self.place_piece(piece, to_position)
+        if self.listeners:
+            from_square = square_index(from_position)
+            to_square = square_index(to_position)
+            for listener in list(self.listeners):
+                if captured is not None:
+                    listener.piece_captured(captured, to_square, piece)
+                listener.piece_moved(piece, from_square, to_square, captured)
+        return captured
+
+    def subscribe(self, listener: BoardListener) -> None:
+        """
+        Start telling a listener about every change to the board.
+
+        Args:
+            listener: A BoardListener (subscribing twice has no effect)
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: BoardListener) -> None:
+        """
+        Stop telling a listener about changes.
+
+        Args:
+            listener: A subscribed BoardListener (others are ignored)
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def track_attacks(self):
+        """
+        Start keeping an attack map of this board up to date.
+
+        Until this is called, boards pay nothing for attack tracking.
+
+        Returns:
+            The board's AttackMap (see the attack_map module)
+        """
+        if self.attack_map is None:
+            from .attack_map import AttackMap
+
+            self.attack_map = AttackMap(self)
+            self.subscribe(self.attack_map)
+        return self.attack_map
+
+    def position_key(self, side_to_move: int) -> int:
+        """
+        Get a 64-bit hash of the position, including the side to move.
+
+        Equal positions always have equal keys, so keys can be counted to
+        detect repetitions without comparing boards.
+
+        Args:
+            side_to_move: Player to move (0 or 1)
+
+        Returns:
+            Zobrist hash of the position
+        """
+        if side_to_move:
+            return self.zobrist_key ^ SIDE_TO_MOVE_KEY
+        return self.zobrist_key
+
+    def canonical_key(self, side_to_move: int) -> int:
+        """
+        Get a hash shared by a position and its mirror image.
+
+        A position with Player 2 to move plays exactly like the position
+        rotated 180 degrees, with owners swapped, and Player 1 to move (see
+        the symmetry module). Both get the same key: the position_key() of
+        the one with Player 1 to move.
+
+        Args:
+            side_to_move: Player to move (0 or 1)
+
+        Returns:
+            Zobrist hash of the canonical position
+        """
+        return self.rotated_key if side_to_move else self.zobrist_key
 
     def get_piece(self, position: Tuple[int, int]) -> Optional[Piece]:
         """
@@ -137,17 +478,70 @@ class Board:
             The Piece at the position, or None if empty
         """
         col, row = position
-        return self.grid[col][row].piece
+        return self.squares[row * MAX_COLUMNS + col]
+
+    def count_pieces(self, owner: int) -> int:
+        """
+        Get the number of pieces a player has on the board.
+
+        Args:
+            owner: Player index (0 or 1)
+
+        Returns:
+            Number of that player's pieces on the board
+        """
+        return self.piece_counts[owner]
 
-    def get_tile(self, position: Tuple[int, int]) -> Tile:
+    def get_pieces(self, owner: int) -> List[Piece]:
+        """
+        Get the pieces a player has on the board.
+
+        Args:
+            owner: Player index (0 or 1)
+
+        Returns:
+            List of that player's pieces, in placement order
+        """
+        return list(self.piece_locations[owner])
+
+    def get_piece_position(self, piece: Piece) -> Optional[Tuple[int, int]]:
+        """
+        Get the position of a piece on the board.
+
+        Args:
+            piece: The piece to look up
+
+        Returns:
+            The piece's position as (col, row), or None if it is not on the board
+        """
+        return self.piece_locations[piece.owner].get(piece)
+
+    def get_terrain(self, position: Tuple[int, int]) -> TerrainTile:
+        """
+        Get the shared, read-only terrain tile at the specified position.
+
+        Args:
+            position: Position to check as (col, row)
+
+        Returns:
+            The TerrainTile at the position (never holds a piece)
+        """
+        col, row = position
+        return TERRAIN[col][row]
+
+    def get_tile(self, position: Tuple[int, int]) -> SquareTile:
         """
         Get the tile at the specified position.
 
+        The returned tile combines the terrain with the piece on it and is a
+        read-only copy (see SquareTile); use get_piece or squares for the
+        live contents of the board.
+
         Args:
             position: Position to check as (col, row)
 
         Returns:
-            The Tile at the position
+            The SquareTile at the position
         """
         col, row = position
-        return self.grid[col][row]
+        return SquareTile(TERRAIN[col][row], self.squares[row * MAX_COLUMNS + col])
@@ -0,0 +1,54 @@
+"""
+Board Events Module
+
+This module contains the BoardListener base class. Objects subscribed to
+a Board (see Board.subscribe) are told about every change to it, so views
+derived from the position (attack maps, rendered cells, move records,
+counters) can be updated incrementally instead of rescanning the board.
+
+Events carry square indexes (row * 7 + col, see the terrain module):
+
+- piece_placed / piece_removed: one piece appeared on or left a square.
+  Every change to the board is made of these, so listeners mirroring the
+  position only need them and board_cleared.
+- piece_moved / piece_captured: sent by Board.move_piece after the
+  placements and removals making up the move, for listeners interested
+  in moves rather than occupancy.
+- board_cleared: every piece was removed at once (clear, reset, loading
+  a snapshot); no piece_removed events are sent for them.
+
+A Board without listeners pays a single truth test per change.
+"""
+
+from typing import Optional
+
+from .piece import Piece
+
+
+class BoardListener:
+    """
+    Receives the events of the boards it is subscribed to.
+
+    Every method does nothing; subclasses override the events they need.
+    """
+
+    def piece_placed(self, piece: Piece, square: int) -> None:
+        """A piece was placed on an empty square."""
+
+    def piece_removed(self, piece: Piece, square: int) -> None:
+        """A piece was removed from a square."""
+
+    def piece_moved(
+        self,
+        piece: Piece,
+        from_square: int,
+        to_square: int,
+        captured: Optional[Piece],
+    ) -> None:
+        """A piece moved, capturing the piece on to_square if any."""
+
+    def piece_captured(self, piece: Piece, square: int, capturer: Piece) -> None:
+        """A piece was captured on a square."""
+
+    def board_cleared(self) -> None:
+        """Every piece was removed from the board."""
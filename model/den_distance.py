@@ -0,0 +1,186 @@
+"""
+Den Distance Module
+
+This module contains shortest-path tables giving, for every square, the
+number of moves a piece needs to reach the opponent's den on an otherwise
+empty board. Tables are built once at import by a breadth-first search
+over the movement rules of the rules module, per piece kind and owner:
+
+- Rats may swim through water.
+- Lions and Tigers jump over the river.
+- No piece may enter its own den.
+
+A rat in the river blocks jumps over its square, so Lion and Tiger tables
+also come in variants keyed by a bit mask of occupied water squares.
+Variants for up to two occupied water squares (both rats in the river)
+are precomputed; other masks are built on first use and cached.
+"""
+
+from collections import deque
+from itertools import combinations
+from typing import Dict, List, Tuple
+
+from . import rules
+from .board import Board
+from .piece import Piece
+from .terrain import NUM_SQUARES, SQUARE_POSITIONS, TERRAIN_SQUARES, square_index
+from .tile import Tile
+
+# Distance of a square from which the den cannot be reached
+UNREACHABLE = 255
+
+# Movement classes: pieces of the same class share a table
+WALKER = "walker"
+SWIMMER = "swimmer"
+JUMPER = "jumper"
+MOVEMENT_CLASSES: Dict[str, str] = {
+    name: (
+        SWIMMER if name == "Rat" else JUMPER if name in rules.JUMPING_PIECES else WALKER
+    )
+    for name in Piece.RANKS
+}
+_CLASS_PIECES = {WALKER: "Cat", SWIMMER: "Rat", JUMPER: "Lion"}
+
+# Water squares in index order and the mask bit of each
+WATER_SQUARES: Tuple[int, ...] = tuple(
+    square
+    for square in range(NUM_SQUARES)
+    if TERRAIN_SQUARES[square].tile_type == Tile.WATER
+)
+WATER_BITS: Dict[int, int] = {
+    square: 1 << bit for bit, square in enumerate(WATER_SQUARES)
+}
+
+# Distances by square, keyed by (movement class, owner, water mask)
+_TABLES: Dict[Tuple[str, int, int], bytes] = {}
+
+
+def _build_table(movement_class: str, owner: int, water_mask: int) -> bytes:
+    """Breadth-first search from the opponent's den over reversed moves."""
+    board = Board.empty()
+    for square in WATER_SQUARES:
+        if water_mask & WATER_BITS[square]:
+            board.place_piece(Piece("Rat", 1 - owner), SQUARE_POSITIONS[square])
+
+    piece = Piece(_CLASS_PIECES[movement_class], owner)
+    den = rules.own_den(owner)
+    predecessors: List[List[int]] = [[] for _ in range(NUM_SQUARES)]
+    for square, position in enumerate(SQUARE_POSITIONS):
+        if position == den:
+            continue
+        if (
+            movement_class != SWIMMER
+            and TERRAIN_SQUARES[square].tile_type == Tile.WATER
+        ):
+            continue
+        for target in rules.piece_reach(board, position, piece):
+            predecessors[square_index(target)].append(square)
+
+    distances = bytearray([UNREACHABLE]) * NUM_SQUARES
+    goal = square_index(rules.opponent_den(owner))
+    distances[goal] = 0
+    queue = deque([goal])
+    while queue:
+        square = queue.popleft()
+        for previous in predecessors[square]:
+            if distances[previous] == UNREACHABLE:
+                distances[previous] = distances[square] + 1
+                queue.append(previous)
+    return bytes(distances)
+
+
+def distance_table(piece_name: str, owner: int, water_mask: int = 0) -> bytes:
+    """
+    Get the distance table of a piece kind.
+
+    Args:
+        piece_name: Name of the piece (e.g. "Lion")
+        owner: Player index (0 or 1) owning the piece
+        water_mask: Occupied water squares (see water_mask()); only
+            matters for Lions and Tigers
+
+    Returns:
+        Moves to the opponent's den by square index (UNREACHABLE if none)
+    """
+    movement_class = MOVEMENT_CLASSES[piece_name]
+    if movement_class != JUMPER:
+        water_mask = 0
+    key = (movement_class, owner, water_mask)
+    table = _TABLES.get(key)
+    if table is None:
+        table = _TABLES[key] = _build_table(movement_class, owner, water_mask)
+    return table
+
+
+def water_mask(board: Board) -> int:
+    """
+    Get the mask of occupied water squares of a board.
+
+    Args:
+        board: The board
+
+    Returns:
+        Bit mask with the WATER_BITS of every occupied water square
+    """
+    squares = board.squares
+    mask = 0
+    for square in WATER_SQUARES:
+        if squares[square] is not None:
+            mask |= WATER_BITS[square]
+    return mask
+
+
+def den_distance(board: Board, piece: Piece, position: Tuple[int, int]) -> int:
+    """
+    Get the moves a piece needs to reach the opponent's den.
+
+    Other pieces are ignored, except rats in the river blocking jumps.
+
+    Args:
+        board: The board
+        piece: The piece
+        position: Position of the piece as (col, row)
+
+    Returns:
+        Number of moves, or UNREACHABLE
+    """
+    mask = water_mask(board) if MOVEMENT_CLASSES[piece.name] == JUMPER else 0
+    return distance_table(piece.name, piece.owner, mask)[square_index(position)]
+
+
+def den_threats(
+    board: Board, player: int, max_distance: int = 2
+) -> List[Tuple[Piece, Tuple[int, int], int]]:
+    """
+    List the opponent pieces close to a player's den.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1) whose den is threatened
+        max_distance: Farthest distance reported, in moves
+
+    Returns:
+        (piece, position, distance) of each threatening piece, closest first
+    """
+    mask = water_mask(board)
+    threats = []
+    for piece, position in board.piece_locations[1 - player].items():
+        table = distance_table(piece.name, piece.owner, mask)
+        distance = table[square_index(position)]
+        if distance <= max_distance:
+            threats.append((piece, position, distance))
+    threats.sort(key=lambda threat: threat[2])
+    return threats
+
+
+def _precompute() -> None:
+    for owner in (Piece.PLAYER_1, Piece.PLAYER_2):
+        distance_table("Cat", owner)
+        distance_table("Rat", owner)
+        for count in range(3):
+            for squares in combinations(WATER_SQUARES, count):
+                mask = sum(WATER_BITS[square] for square in squares)
+                distance_table("Lion", owner, mask)
+
+
+_precompute()
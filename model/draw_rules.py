@@ -0,0 +1,163 @@
+"""
+Draw Rules Module
+
+This module contains the optional draw rules of a game and the tracker
+that applies them. The tracker keeps a multiset of position keys (see
+Board.position_key) next to the move history, so each move and each undo
+is checked or reverted in O(1).
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+REPETITION = "repetition"
+NO_CAPTURE = "no_capture"
+
+
+class DrawRules:
+    """
+    Optional draw rules of a game. A limit of None disables that rule.
+
+    Attributes:
+        repetition_limit: Draw when the same position (with the same side to
+            move) has occurred this many times, e.g. 3 for threefold repetition
+        no_capture_limit: Draw after this many consecutive moves, by either
+            player, without a capture
+    """
+
+    def __init__(
+        self,
+        repetition_limit: Optional[int] = None,
+        no_capture_limit: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the draw rules.
+
+        Args:
+            repetition_limit: Occurrences of a position that draw the game
+            no_capture_limit: Moves without a capture that draw the game
+
+        Raises:
+            ValueError: If a limit is too small to be meaningful
+        """
+        if repetition_limit is not None and repetition_limit < 2:
+            raise ValueError("The repetition limit must be at least 2")
+        if no_capture_limit is not None and no_capture_limit < 1:
+            raise ValueError("The no-capture limit must be at least 1")
+        self.repetition_limit = repetition_limit
+        self.no_capture_limit = no_capture_limit
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any draw rule is active."""
+        return self.repetition_limit is not None or self.no_capture_limit is not None
+
+    def to_dict(self) -> Dict[str, Optional[int]]:
+        """Serialize the rules for .jungle and .record files."""
+        return {
+            "repetition_limit": self.repetition_limit,
+            "no_capture_limit": self.no_capture_limit,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Optional[int]]]) -> "DrawRules":
+        """
+        Deserialize rules written by to_dict().
+
+        Args:
+            data: Serialized rules, or None for files without draw rules
+
+        Returns:
+            The rules (all disabled if data is None)
+        """
+        data = data or {}
+        return cls(data.get("repetition_limit"), data.get("no_capture_limit"))
+
+    def describe(self) -> List[str]:
+        """Describe each active rule in one line."""
+        lines = []
+        if self.repetition_limit is not None:
+            lines.append(f"Draw when a position occurs {self.repetition_limit} times")
+        if self.no_capture_limit is not None:
+            lines.append(f"Draw after {self.no_capture_limit} moves without a capture")
+        return lines
+
+
+class DrawTracker:
+    """
+    Applies the draw rules to the positions of one game.
+
+    Holds one entry per position reached, starting with the position the
+    game started from, so it must be pushed on every move and popped on
+    every undo, exactly like the Controller's move history.
+
+    Attributes:
+        rules: The draw rules applied
+        counts: Number of times each position key has occurred
+        keys: Position key after each move
+        clocks: Moves without a capture after each move
+    """
+
+    def __init__(self, rules: DrawRules, start_key: int) -> None:
+        """
+        Start tracking from a position.
+
+        Args:
+            rules: The draw rules to apply
+            start_key: Position key of the starting position
+        """
+        self.rules = rules
+        self.counts: Counter = Counter({start_key: 1})
+        self.keys: List[int] = [start_key]
+        self.clocks: List[int] = [0]
+
+    def push(self, key: int, captured: bool) -> Optional[str]:
+        """
+        Record the position reached by a move.
+
+        Args:
+            key: Position key after the move
+            captured: Whether the move captured a piece
+
+        Returns:
+            The reason the game is drawn (REPETITION or NO_CAPTURE), or None
+        """
+        self.keys.append(key)
+        self.clocks.append(0 if captured else self.clocks[-1] + 1)
+        self.counts[key] += 1
+        return self.draw_reason()
+
+    def pop(self) -> None:
+        """Forget the position reached by the last move (for undo)."""
+        if len(self.keys) == 1:
+            return
+        key = self.keys.pop()
+        self.clocks.pop()
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            del self.counts[key]
+
+    def draw_reason(self) -> Optional[str]:
+        """
+        Check the current position against the draw rules.
+
+        Returns:
+            The reason the game is drawn (REPETITION or NO_CAPTURE), or None
+        """
+        rules = self.rules
+        if (
+            rules.repetition_limit is not None
+            and self.counts[self.keys[-1]] >= rules.repetition_limit
+        ):
+            return REPETITION
+        if (
+            rules.no_capture_limit is not None
+            and self.clocks[-1] >= rules.no_capture_limit
+        ):
+            return NO_CAPTURE
+        return None
+
+    @property
+    def no_capture_moves(self) -> int:
+        """Moves made since the last capture."""
+        return self.clocks[-1]
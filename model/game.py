@@ -5,8 +5,9 @@ This module contains the Game class which manages the overall game state,
 including players, the board, and turn management.
 """
 
-from typing import List
+from typing import List, Optional
 from .board import Board
+from .draw_rules import DrawRules
 from .player import Player
 
 
@@ -18,19 +19,31 @@ class Game:
         board: The game board
         players: List of two Player objects
         current_turn: Index of current player (0 or 1)
+        draw_rules: Optional draw rules of this game
     """
 
-    def __init__(self, player1_name: str, player2_name: str) -> None:
+    def __init__(
+        self,
+        player1_name: str,
+        player2_name: str,
+        board: Optional[Board] = None,
+        draw_rules: Optional[DrawRules] = None,
+    ) -> None:
         """
         Initialize a new game with two players.
 
         Args:
             player1_name: Name of the first player
             player2_name: Name of the second player
+            board: Board to play on (default: a board in the starting position)
+            draw_rules: Draw rules (default: none, games only end in a win)
         """
-        self.board = Board()
+        self.board = board if board is not None else Board()
         self.players: List[Player] = [Player(player1_name), Player(player2_name)]
+        for index, player in enumerate(self.players):
+            player.attach_board(self.board, index)
         self.current_turn = 0  # Player 1 starts
+        self.draw_rules = draw_rules if draw_rules is not None else DrawRules()
 
     def switch_turn(self) -> None:
         """Switch to the next player's turn."""
@@ -0,0 +1,208 @@
+"""
+Move Module
+
+Moves packed into 16-bit integers, so histories and records of long games
+are arrays of small ints rather than strings, tuples or dicts. Notation
+("A1 to B2") is only produced at the edges: user input, display and files.
+
+Bit layout of a move:
+
+- bits 0-5: starting square (row * 7 + col, see the terrain module)
+- bits 6-11: target square
+- bit 12: capture flag
+- bits 13-15: rank of the captured piece minus one (0 without a capture)
+
+Keeping the captured rank makes a move reversible on its own: the piece
+taken belongs to the opponent of whoever moved, so taking a move back
+needs nothing but the move.
+"""
+
+from array import array
+from typing import Iterable, Optional, Tuple
+
+from .board import Board
+from .piece import Piece
+from .terrain import MAX_COLUMNS, MAX_ROWS, SQUARE_POSITIONS, square_index
+
+Position = Tuple[int, int]
+
+TO_SHIFT = 6
+CAPTURED_SHIFT = 13
+SQUARE_MASK = 0x3F
+CAPTURE_FLAG = 1 << 12
+
+# Never a legal move (from and to are both A1); marks "no move"
+NULL_MOVE = 0
+
+# Typecode of move lists: unsigned 16-bit integers
+MOVE_TYPECODE = "H"
+
+# Piece names by rank (index 0 unused)
+_NAMES = [None] + sorted(Piece.RANKS, key=Piece.RANKS.get)
+
+
+def encode_move(from_square: int, to_square: int, captured_rank: int = 0) -> int:
+    """
+    Pack a move.
+
+    Args:
+        from_square: Index of the starting square
+        to_square: Index of the target square
+        captured_rank: Rank of the captured piece (1-8), or 0 for none
+
+    Returns:
+        The packed move
+    """
+    move = from_square | to_square << TO_SHIFT
+    if captured_rank:
+        move |= CAPTURE_FLAG | (captured_rank - 1) << CAPTURED_SHIFT
+    return move
+
+
+def encode_positions(
+    from_position: Position, to_position: Position, captured: Optional[Piece] = None
+) -> int:
+    """
+    Pack a move given as (col, row) positions.
+
+    Args:
+        from_position: Starting position
+        to_position: Target position
+        captured: The piece captured by the move, if any
+
+    Returns:
+        The packed move
+    """
+    return encode_move(
+        square_index(from_position),
+        square_index(to_position),
+        captured.rank if captured is not None else 0,
+    )
+
+
+def from_square(move: int) -> int:
+    """Index of the starting square of a move."""
+    return move & SQUARE_MASK
+
+
+def to_square(move: int) -> int:
+    """Index of the target square of a move."""
+    return move >> TO_SHIFT & SQUARE_MASK
+
+
+def is_capture(move: int) -> bool:
+    """Whether a move captures a piece."""
+    return bool(move & CAPTURE_FLAG)
+
+
+def captured_rank(move: int) -> int:
+    """Rank of the piece a move captures, or 0 for none."""
+    if not move & CAPTURE_FLAG:
+        return 0
+    return (move >> CAPTURED_SHIFT) + 1
+
+
+def captured_name(move: int) -> Optional[str]:
+    """Name of the piece a move captures, or None."""
+    return _NAMES[captured_rank(move)]
+
+
+def with_capture(move: int, captured: Optional[Piece]) -> int:
+    """
+    Set the capture of a move (e.g. once the target square is known).
+
+    Args:
+        move: The packed move
+        captured: The piece captured, or None
+
+    Returns:
+        The move with its capture bits replaced
+    """
+    return encode_move(
+        from_square(move), to_square(move), captured.rank if captured else 0
+    )
+
+
+def move_positions(move: int) -> Tuple[Position, Position]:
+    """
+    Unpack the squares of a move.
+
+    Args:
+        move: The packed move
+
+    Returns:
+        Tuple of (from_position, to_position) as (col, row)
+    """
+    return (
+        SQUARE_POSITIONS[move & SQUARE_MASK],
+        SQUARE_POSITIONS[move >> TO_SHIFT & SQUARE_MASK],
+    )
+
+
+def apply_move(board: Board, move: int) -> Optional[Piece]:
+    """
+    Play a move on a board (no rule checking).
+
+    Args:
+        board: The board
+        move: The packed move
+
+    Returns:
+        The captured Piece, or None
+    """
+    from_position, to_position = move_positions(move)
+    return board.move_piece(from_position, to_position)
+
+
+def revert_move(board: Board, move: int) -> int:
+    """
+    Take a move back on a board in the position right after it.
+
+    Args:
+        board: The board
+        move: The packed move, including its capture
+
+    Returns:
+        Player index (0 or 1) who had made the move
+    """
+    from_position, to_position = move_positions(move)
+    mover = board.squares[to_square(move)].owner
+    board.move_piece(to_position, from_position)
+    rank = captured_rank(move)
+    if rank:
+        board.place_piece(Piece(_NAMES[rank], 1 - mover), to_position)
+    return mover
+
+
+def square_notation(square: int) -> str:
+    """Notation of a square index (e.g. 0 -> "A1")."""
+    col, row = SQUARE_POSITIONS[square]
+    return f"{chr(ord('A') + col)}{row + 1}"
+
+
+def notation_square(text: str) -> Optional[int]:
+    """
+    Index of a square given in notation (e.g. "a1" or "A1" -> 0).
+
+    Args:
+        text: Column letter followed by row digit
+
+    Returns:
+        The square index, or None if it is off the board
+    """
+    col = ord(text[0].upper()) - ord("A")
+    row = ord(text[1]) - ord("1")
+    if 0 <= col < MAX_COLUMNS and 0 <= row < MAX_ROWS:
+        return row * MAX_COLUMNS + col
+    return None
+
+
+def move_notation(move: int) -> str:
+    """Notation of a move as typed by players (e.g. "A3 to A4")."""
+    from_text = square_notation(move & SQUARE_MASK)
+    return f"{from_text} to {square_notation(move >> TO_SHIFT & SQUARE_MASK)}"
+
+
+def move_list(moves: Iterable[int] = ()) -> array:
+    """Create a compact list of packed moves."""
+    return array(MOVE_TYPECODE, moves)
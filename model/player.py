@@ -4,7 +4,7 @@ Player Module
 This module contains the Player class representing a game player.
 """
 
-from typing import List
+from typing import List, Optional
 
 
 class Player:
@@ -13,7 +13,8 @@ class Player:
 
     Attributes:
         name: The player's name
-        pieces: List of pieces owned by this player (currently unused)
+        pieces: List of pieces owned by this player; live data from the
+            board once the player is attached to one
     """
 
     def __init__(self, name: str) -> None:
@@ -24,10 +25,45 @@ class Player:
             name: The player's name
         """
         self.name = name
-        self.pieces: List = []
+        self._pieces: List = []
+        self._board = None
+        self._index: Optional[int] = None
+
+    @property
+    def pieces(self) -> List:
+        """Pieces owned by this player."""
+        if self._board is not None:
+            return self._board.get_pieces(self._index)
+        return self._pieces
+
+    def attach_board(self, board, index: int) -> None:
+        """
+        Read this player's pieces from a board from now on.
+
+        Args:
+            board: The Board the player's pieces are on
+            index: The player's index (0 or 1)
+        """
+        self._board = board
+        self._index = index
 
     def add_piece(self, piece):
-        self.pieces.append(piece)
+        """
+        Give a piece to a player that is not attached to a board.
+
+        Args:
+            piece: The piece to add
+
+        Raises:
+            ValueError: If the player is attached to a board, whose pieces
+                must be placed with Board.place_piece instead
+        """
+        if self._board is not None:
+            raise ValueError(
+                f"{self.name}'s pieces are read from the board; "
+                "place the piece on the board instead."
+            )
+        self._pieces.append(piece)
 
     def get_pieces(self):
         return self.pieces
@@ -0,0 +1,219 @@
+"""
+Rules Module
+
+The single rules kernel of the game: movement, river jumps, dens, water
+and captures. The legal move set of each side is computed once per
+position and cached on the board until the board is next changed, so
+validation, move listings and error reporting all read the same data.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from .board import Board
+from .piece import Piece
+from .terrain import MAX_COLUMNS, MAX_ROWS, TERRAIN
+from .tile import Tile
+
+Position = Tuple[int, int]
+
+# Legal moves of one side: {from_position: (to_position, ...)}
+LegalMoves = Dict[Position, Tuple[Position, ...]]
+
+DIRECTIONS: Tuple[Position, ...] = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+JUMPING_PIECES = ("Lion", "Tiger")
+
+# Reasons reported for an illegal move
+NO_PIECE_MESSAGE = "Invalid move. A tile with no piece was selected. Please try again."
+ILLEGAL_MOVE_MESSAGE = (
+    "Invalid move. You may only move your own piece by one tile "
+    "horizontally/vertically, and never into its own den or water (except rats)"
+)
+OWN_PIECE_MESSAGE = (
+    "Invalid move: You cannot move to a tile occupied by your own piece."
+)
+CANNOT_CAPTURE_MESSAGE = "Invalid move: Your piece cannot capture the opponent's piece."
+
+
+def own_den(player: int) -> Position:
+    """Return the den position of the given player."""
+    return Board.PLAYER_1_DEN_POSITION if player == 0 else Board.PLAYER_2_DEN_POSITION
+
+
+def opponent_den(player: int) -> Position:
+    """Return the den position of the given player's opponent."""
+    return Board.PLAYER_2_DEN_POSITION if player == 0 else Board.PLAYER_1_DEN_POSITION
+
+
+def piece_reach(board: Board, position: Position, piece: Piece) -> List[Position]:
+    """
+    List the squares a piece could move to, ignoring what stands on them.
+
+    Applies the movement rules only: one orthogonal step, water for Rats
+    only, never into the piece's own den, and Lion/Tiger river jumps when
+    every water square jumped over is empty.
+
+    Args:
+        board: The board
+        position: Position of the piece as (col, row)
+        piece: The piece at that position
+
+    Returns:
+        Target positions as (col, row)
+    """
+    col, row = position
+    den = own_den(piece.owner)
+    is_rat = piece.name == "Rat"
+    can_jump = piece.name in JUMPING_PIECES
+    squares = board.squares
+    targets = []
+    for d_col, d_row in DIRECTIONS:
+        to_col, to_row = col + d_col, row + d_row
+        if not (0 <= to_col < MAX_COLUMNS and 0 <= to_row < MAX_ROWS):
+            continue
+        if TERRAIN[to_col][to_row].tile_type == Tile.WATER:
+            if is_rat:
+                targets.append((to_col, to_row))
+            elif can_jump:
+                # Jump over the whole river if no piece (a rat) blocks it
+                while TERRAIN[to_col][to_row].tile_type == Tile.WATER:
+                    if squares[to_row * MAX_COLUMNS + to_col] is not None:
+                        break
+                    to_col, to_row = to_col + d_col, to_row + d_row
+                else:
+                    targets.append((to_col, to_row))
+            continue
+        if (to_col, to_row) != den:
+            targets.append((to_col, to_row))
+    return targets
+
+
+def can_capture_at(
+    board: Board, piece: Piece, from_position: Position, to_position: Position
+) -> bool:
+    """
+    Check whether a piece may end its move on an occupied square.
+
+    Args:
+        board: The board
+        piece: The moving piece
+        from_position: Position of the moving piece
+        to_position: Occupied target position
+
+    Returns:
+        True if the occupant is an opponent piece that can be captured
+    """
+    target = board.get_piece(to_position)
+    if target.owner == piece.owner:
+        return False
+    return piece.can_capture(
+        board.get_terrain(from_position), target, board.get_terrain(to_position)
+    )
+
+
+def generate_legal_moves(board: Board, player: int) -> LegalMoves:
+    """
+    Compute every legal move of a player, bypassing the cache.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1)
+
+    Returns:
+        Legal target positions keyed by the position of each movable piece
+    """
+    moves = {}
+    for piece, position in board.piece_locations[player].items():
+        targets = tuple(
+            target
+            for target in piece_reach(board, position, piece)
+            if board.get_piece(target) is None
+            or can_capture_at(board, piece, position, target)
+        )
+        if targets:
+            moves[position] = targets
+    return moves
+
+
+def legal_moves(board: Board, player: int) -> LegalMoves:
+    """
+    Get every legal move of a player, computed once per position.
+
+    The result is cached on the board and discarded as soon as the board
+    changes. Callers must not modify it.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1)
+
+    Returns:
+        Legal target positions keyed by the position of each movable piece
+    """
+    cache = board.move_cache
+    if cache[0] != board.revision:
+        cache = board.move_cache = [board.revision, None, None]
+    moves = cache[player + 1]
+    if moves is None:
+        moves = cache[player + 1] = generate_legal_moves(board, player)
+    return moves
+
+
+def is_legal_move(
+    board: Board, player: int, from_position: Position, to_position: Position
+) -> bool:
+    """
+    Check a move against the cached legal move set.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1)
+        from_position: Starting position as (col, row)
+        to_position: Target position as (col, row)
+
+    Returns:
+        True if the move is legal
+    """
+    return to_position in legal_moves(board, player).get(from_position, ())
+
+
+def moves_from(board: Board, player: int, position: Position) -> Tuple[Position, ...]:
+    """
+    Get the legal targets of the player's piece at a position.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1)
+        position: Position of the piece as (col, row)
+
+    Returns:
+        Legal target positions (empty if there is no movable piece there)
+    """
+    return legal_moves(board, player).get(position, ())
+
+
+def explain_illegal_move(
+    board: Board, player: int, from_position: Position, to_position: Position
+) -> Optional[str]:
+    """
+    Explain why a move is illegal.
+
+    Args:
+        board: The board
+        player: Player index (0 or 1)
+        from_position: Starting position as (col, row)
+        to_position: Target position as (col, row)
+
+    Returns:
+        A message describing the problem, or None if the move is legal
+    """
+    if is_legal_move(board, player, from_position, to_position):
+        return None
+    piece = board.get_piece(from_position)
+    if piece is None:
+        return NO_PIECE_MESSAGE
+    if piece.owner != player or to_position not in piece_reach(
+        board, from_position, piece
+    ):
+        return ILLEGAL_MOVE_MESSAGE
+    if board.get_piece(to_position).owner == player:
+        return OWN_PIECE_MESSAGE
+    return CANNOT_CAPTURE_MESSAGE
@@ -0,0 +1,141 @@
+"""
+Symmetry Module
+
+The board, its terrain and the starting layout are point-symmetric:
+rotating the board 180 degrees and swapping the owners of every piece
+maps Player 1's side onto Player 2's. A position with Player 2 to move
+therefore plays exactly like its rotated image with Player 1 to move.
+
+Each symmetry class is represented by its member with Player 1 to move,
+the canonical position. Stores keyed by position (caches, books,
+tablebases) keep one entry per class by using Board.canonical_key() and
+translating moves with canonical_move() and restore_move().
+
+Every transform here is a table lookup: ROTATED_SQUARES maps each square
+index to its image.
+"""
+
+from typing import Optional, Tuple
+
+from .board import Board
+from .piece import Piece
+from .terrain import NUM_SQUARES, SQUARE_POSITIONS, square_index
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+# Image of each square index under the 180-degree rotation
+ROTATED_SQUARES: Tuple[int, ...] = tuple(
+    NUM_SQUARES - 1 - square for square in range(NUM_SQUARES)
+)
+
+# Image of each (col, row) position under the 180-degree rotation
+ROTATED_POSITIONS = {
+    SQUARE_POSITIONS[square]: SQUARE_POSITIONS[ROTATED_SQUARES[square]]
+    for square in range(NUM_SQUARES)
+}
+
+
+def is_flipped(side_to_move: int) -> bool:
+    """
+    Check whether a position must be rotated to reach its canonical form.
+
+    Args:
+        side_to_move: Player to move (0 or 1)
+
+    Returns:
+        True when Player 2 is to move
+    """
+    return side_to_move == Piece.PLAYER_2
+
+
+def rotate_move(move: Move) -> Move:
+    """
+    Rotate a move 180 degrees; rotating twice gives the move back.
+
+    Args:
+        move: (from_position, to_position) as (col, row) pairs
+
+    Returns:
+        The rotated move
+    """
+    return ROTATED_POSITIONS[move[0]], ROTATED_POSITIONS[move[1]]
+
+
+def canonical_move(move: Move, side_to_move: int) -> Move:
+    """
+    Translate a move of a position into its canonical position.
+
+    Args:
+        move: The move as (from_position, to_position)
+        side_to_move: Player to move (0 or 1) in the original position
+
+    Returns:
+        The same move played in the canonical position
+    """
+    return rotate_move(move) if side_to_move else move
+
+
+def restore_move(move: Optional[Move], side_to_move: int) -> Optional[Move]:
+    """
+    Translate a move of a canonical position back to the original one.
+
+    Args:
+        move: The move in the canonical position, or None
+        side_to_move: Player to move (0 or 1) in the original position
+
+    Returns:
+        The same move played in the original position (None stays None)
+    """
+    if move is None or not side_to_move:
+        return move
+    return rotate_move(move)
+
+
+def rotate_board(board: Board) -> Board:
+    """
+    Build the image of a board rotated 180 degrees with owners swapped.
+
+    Args:
+        board: The board (not modified)
+
+    Returns:
+        A new Board
+    """
+    rotated = Board.empty()
+    for owner in (Piece.PLAYER_1, Piece.PLAYER_2):
+        for piece, position in board.piece_locations[owner].items():
+            rotated.place_piece(
+                Piece(piece.name, 1 - owner),
+                SQUARE_POSITIONS[ROTATED_SQUARES[square_index(position)]],
+            )
+    return rotated
+
+
+def canonical_board(board: Board, side_to_move: int) -> Board:
+    """
+    Get the canonical position of a board, always with Player 1 to move.
+
+    Args:
+        board: The board (not modified)
+        side_to_move: Player to move (0 or 1)
+
+    Returns:
+        A copy of the board, rotated when Player 2 is to move; its
+        position_key(0) equals board.canonical_key(side_to_move)
+    """
+    return rotate_board(board) if side_to_move else board.clone()
+
+
+def canonical_fen(board: Board, side_to_move: int) -> str:
+    """
+    Write the canonical position of a board in FEN notation.
+
+    Args:
+        board: The board
+        side_to_move: Player to move (0 or 1)
+
+    Returns:
+        FEN of the canonical position, always with Player 1 to move
+    """
+    return canonical_board(board, side_to_move).to_fen(Piece.PLAYER_1)
@@ -0,0 +1,107 @@
+"""
+Terrain Module
+
+This module contains the shared, read-only terrain layout of the board.
+Terrain never changes during a game, so it is built once at import and
+shared by every Board, which only stores which piece stands where.
+"""
+
+from typing import Tuple
+from .tile import Tile
+
+MAX_COLUMNS = 7
+MAX_ROWS = 9
+NUM_SQUARES = MAX_COLUMNS * MAX_ROWS
+
+
+class TerrainTile(Tile):
+    """
+    A read-only Tile describing terrain only.
+
+    Terrain tiles never hold a piece; any attempt to modify one raises
+    AttributeError.
+    """
+
+    _frozen = False
+
+    def __init__(self, tile_type: str = Tile.LAND, owner: int = Tile.NEUTRAL) -> None:
+        """
+        Initialize a terrain tile.
+
+        Args:
+            tile_type: Type of tile (default: LAND)
+            owner: Owner of this tile for traps (default: NEUTRAL)
+        """
+        super().__init__(tile_type, None, owner)
+        self._frozen = True
+
+    def __setattr__(self, name, value) -> None:
+        if self._frozen:
+            raise AttributeError("Terrain tiles are read-only")
+        super().__setattr__(name, value)
+
+
+def square_index(position: Tuple[int, int]) -> int:
+    """
+    Convert a (col, row) position to its square index.
+
+    Squares are numbered row by row: A1 is 0, G1 is 6, A2 is 7, G9 is 62.
+
+    Args:
+        position: Position as (col, row)
+
+    Returns:
+        Square index in range(NUM_SQUARES)
+    """
+    col, row = position
+    return row * MAX_COLUMNS + col
+
+
+# Position of every square index
+SQUARE_POSITIONS: Tuple[Tuple[int, int], ...] = tuple(
+    (square % MAX_COLUMNS, square // MAX_COLUMNS) for square in range(NUM_SQUARES)
+)
+
+
+def _build_terrain() -> Tuple[Tuple[TerrainTile, ...], ...]:
+    """
+    Lay out dens, traps and water.
+
+    Layout:
+    - Dens: D1 (Player 1) and D9 (Player 2)
+    - Traps: 3 surrounding each den
+    - Water: Two 2x3 river sections in the middle
+
+    Returns:
+        Terrain tiles indexed [col][row]
+    """
+    land = TerrainTile(Tile.LAND)
+    water = TerrainTile(Tile.WATER)
+    layout = [[land] * MAX_ROWS for _ in range(MAX_COLUMNS)]
+
+    # Dens
+    layout[3][0] = TerrainTile(Tile.PLAYER_1_DEN)
+    layout[3][8] = TerrainTile(Tile.PLAYER_2_DEN)
+
+    # Traps (3 surrounding each den)
+    trap_1 = TerrainTile(Tile.TRAP, Tile.PLAYER_1)
+    trap_2 = TerrainTile(Tile.TRAP, Tile.PLAYER_2)
+    for col in [2, 3, 4]:
+        layout[col][0 if col != 3 else 1] = trap_1
+        layout[col][8 if col != 3 else 7] = trap_2
+
+    # Rivers (two 2x3 sections)
+    for col in [1, 2, 4, 5]:
+        for row in [3, 4, 5]:
+            layout[col][row] = water
+
+    return tuple(tuple(column) for column in layout)
+
+
+# Terrain tiles indexed [col][row], shared by every board
+TERRAIN: Tuple[Tuple[TerrainTile, ...], ...] = _build_terrain()
+
+# Terrain tiles indexed by square index
+TERRAIN_SQUARES: Tuple[TerrainTile, ...] = tuple(
+    TERRAIN[col][row] for col, row in SQUARE_POSITIONS
+)
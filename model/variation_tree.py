@@ -0,0 +1,269 @@
+"""
+Variation Tree Module
+
+This module contains the VariationTree class which keeps every line played
+in a game, including moves that were undone or taken back. Each node
+stores only the packed move that leads to it from its parent, so the tree
+grows with the number of moves played rather than with the size of the
+board.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from .board import Board
+from .move import (
+    NULL_MOVE,
+    apply_move,
+    captured_name,
+    encode_positions,
+    move_positions,
+    revert_move,
+    with_capture,
+)
+from .piece import Piece
+
+Position = Tuple[int, int]
+
+
+class VariationNode:
+    """
+    One move in the variation tree.
+
+    Attributes:
+        parent: Node of the position before the move (None for the root)
+        children: Moves played from the position after this move
+        move: The packed move (see the move module; NULL_MOVE for the root)
+        side: Player index (0 or 1) who made the move
+    """
+
+    __slots__ = ("parent", "children", "move", "side")
+
+    def __init__(
+        self,
+        parent: Optional["VariationNode"],
+        move: int = NULL_MOVE,
+        side: int = 0,
+    ) -> None:
+        self.parent = parent
+        self.children: List["VariationNode"] = []
+        self.move = move
+        self.side = side
+
+    @property
+    def from_position(self) -> Position:
+        """Starting position of the move."""
+        return move_positions(self.move)[0]
+
+    @property
+    def to_position(self) -> Position:
+        """Target position of the move."""
+        return move_positions(self.move)[1]
+
+    @property
+    def captured(self) -> Optional[str]:
+        """Name of the captured piece, or None."""
+        return captured_name(self.move)
+
+    @property
+    def is_root(self) -> bool:
+        """Whether this node is the starting position (no move)."""
+        return self.parent is None
+
+    def apply(self, board: Board) -> Optional[Piece]:
+        """Play this node's move on a board in the parent's position."""
+        return apply_move(board, self.move)
+
+    def revert(self, board: Board) -> None:
+        """Take this node's move back on a board in this node's position."""
+        revert_move(board, self.move)
+
+    def path(self) -> List["VariationNode"]:
+        """List the moves from the root to this node, excluding the root."""
+        nodes = []
+        node = self
+        while node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+
+class VariationTree:
+    """
+    Every line played from a starting position.
+
+    The tree does not hold a board; the Controller applies and reverts the
+    moves of the nodes it walks through on its own board.
+
+    Attributes:
+        root: Node of the starting position
+        current: Node of the position currently on the board
+    """
+
+    def __init__(self) -> None:
+        """Initialize a tree holding only the starting position."""
+        self.root = VariationNode(None)
+        self.current = self.root
+
+    def play(
+        self,
+        from_position: Position,
+        to_position: Position,
+        side: int,
+        captured: Optional[str] = None,
+    ) -> VariationNode:
+        """
+        Record a move given as positions (see play_move).
+
+        Args:
+            from_position: Starting position of the move
+            to_position: Target position of the move
+            side: Player index (0 or 1) making the move
+            captured: Name of the captured piece, or None
+
+        Returns:
+            The node of the new current position
+        """
+        piece = Piece(captured, 1 - side) if captured is not None else None
+        return self.play_move(encode_positions(from_position, to_position, piece), side)
+
+    def play_move(self, move: int, side: int) -> VariationNode:
+        """
+        Record a move from the current position and make it current.
+
+        A move already played from this position is reused, so replaying
+        a line does not duplicate it.
+
+        Args:
+            move: The packed move, including its capture
+            side: Player index (0 or 1) making the move
+
+        Returns:
+            The node of the new current position
+        """
+        squares = with_capture(move, None)
+        for child in self.current.children:
+            if with_capture(child.move, None) == squares:
+                self.current = child
+                return child
+        child = VariationNode(self.current, move, side)
+        self.current.children.append(child)
+        self.current = child
+        return child
+
+    def back(self) -> Optional[VariationNode]:
+        """
+        Step back to the parent position, keeping the move as a variation.
+
+        Returns:
+            The node stepped back from, or None at the starting position
+        """
+        node = self.current
+        if node.is_root:
+            return None
+        self.current = node.parent
+        return node
+
+    def route(
+        self, target: VariationNode
+    ) -> Tuple[List[VariationNode], List[VariationNode]]:
+        """
+        Find the moves leading from the current position to another node.
+
+        Args:
+            target: Node to reach
+
+        Returns:
+            Tuple of (nodes to take back, newest first; nodes to play, in order)
+        """
+        ancestors = set()
+        node = target
+        while node is not None:
+            ancestors.add(node)
+            node = node.parent
+
+        back = []
+        node = self.current
+        while node not in ancestors:
+            back.append(node)
+            node = node.parent
+
+        forward = []
+        step = target
+        while step is not node:
+            forward.append(step)
+            step = step.parent
+        forward.reverse()
+        return back, forward
+
+    def lines(self) -> List[VariationNode]:
+        """List the last node of every line, in the order they were played."""
+        leaves = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not node.children and not node.is_root:
+                leaves.append(node)
+            stack.extend(reversed(node.children))
+        return leaves
+
+    def __len__(self) -> int:
+        """Number of moves in the tree."""
+        count = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            count += len(node.children)
+            stack.extend(node.children)
+        return count
+
+    def to_dict(self) -> Dict:
+        """
+        Serialize the tree for .jungle files.
+
+        Nodes are listed parents first as [parent_index, from, to, side,
+        captured], with positions as [col, row] and the root at index 0.
+
+        Returns:
+            {"nodes": [...], "current": index of the current node}
+        """
+        indexes = {self.root: 0}
+        nodes = []
+        stack = list(reversed(self.root.children))
+        while stack:
+            node = stack.pop()
+            indexes[node] = len(nodes) + 1
+            nodes.append(
+                [
+                    indexes[node.parent],
+                    list(node.from_position),
+                    list(node.to_position),
+                    node.side,
+                    node.captured,
+                ]
+            )
+            stack.extend(reversed(node.children))
+        return {"nodes": nodes, "current": indexes[self.current]}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VariationTree":
+        """
+        Deserialize a tree written by to_dict().
+
+        Args:
+            data: Serialized tree
+
+        Returns:
+            The tree, positioned on its saved current node
+        """
+        tree = cls()
+        nodes = [tree.root]
+        for parent_index, from_position, to_position, side, captured in data["nodes"]:
+            parent = nodes[parent_index]
+            piece = Piece(captured, 1 - side) if captured is not None else None
+            node = VariationNode(
+                parent, encode_positions(from_position, to_position, piece), side
+            )
+            parent.children.append(node)
+            nodes.append(node)
+        tree.current = nodes[data.get("current", 0)]
+        return tree
@@ -0,0 +1,58 @@
+"""
+Zobrist Module
+
+This module contains the Zobrist keys used to hash positions. Every
+(owner, rank, square) combination has a fixed random 64-bit key and a
+position's hash is the XOR of the keys of its pieces, so a Board can
+update its hash in O(1) on every placement or removal. The keys come from
+a fixed seed and are identical in every process and run.
+
+ROTATED_PIECE_KEYS hashes a piece as its image under the board symmetry
+(see the symmetry module), so a Board can keep the key of its rotated
+position up to date the same way.
+"""
+
+import random
+from typing import List, Tuple
+
+from .piece import Piece
+from .terrain import NUM_SQUARES, square_index
+
+_SEED = 0x4A554E474C45  # "JUNGLE"
+_RANKS = 8
+
+
+def _generate_keys() -> Tuple[List[List[List[int]]], int]:
+    rng = random.Random(_SEED)
+    keys = [
+        [[rng.getrandbits(64) for _ in range(NUM_SQUARES)] for _ in range(_RANKS + 1)]
+        for _ in range(2)
+    ]
+    return keys, rng.getrandbits(64)
+
+
+# PIECE_KEYS[owner][rank][square]; rank 0 is unused
+PIECE_KEYS, SIDE_TO_MOVE_KEY = _generate_keys()
+
+# Key of the piece rotated 180 degrees and handed to the other player
+ROTATED_PIECE_KEYS: List[List[List[int]]] = [
+    [list(reversed(keys)) for keys in PIECE_KEYS[1 - owner]] for owner in range(2)
+]
+
+
+def hash_snapshot(snapshot: dict, side_to_move: int) -> int:
+    """
+    Hash a board snapshot without building a Board.
+
+    Args:
+        snapshot: Pieces by position, as returned by Board.snapshot()
+        side_to_move: Player to move (0 or 1)
+
+    Returns:
+        The same key Board.position_key() returns for that position
+    """
+    value = SIDE_TO_MOVE_KEY if side_to_move else 0
+    for position, piece_info in snapshot.items():
+        rank = Piece.RANKS[piece_info["name"]]
+        value ^= PIECE_KEYS[piece_info["owner"]][rank][square_index(position)]
+    return value
@@ -1,18 +1,63 @@
+import contextlib
 import unittest
 import sys
 import os
+import io
+import json
+import random
+import threading
+import tempfile
+import multiprocessing
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from model.board import Board
+from model.board import STARTING_FEN, Board
 from model.piece import Piece
 from model.tile import Tile
 from model.player import Player
 from model.game import Game
+from model.terrain import TERRAIN
+from model import rules
+from model.draw_rules import NO_CAPTURE, REPETITION, DrawRules
+from model.zobrist import hash_snapshot
+from model.variation_tree import VariationTree
+from model import den_distance
+from model.attack_map import AttackMap
+from model import symmetry
+from model import move as packed_move
+from model.board_events import BoardListener
 from controller.controller import Controller
 from controller.move_parser import MoveParser
 from controller.move_validator import MoveValidator
+from controller.profiler import TurnProfiler
+from controller.session_store import ACTIVE, FINISHED, GameStore, SessionCache
+from controller import record_archive
+from controller.spectators import (
+    DROP,
+    Delta,
+    SpectatorHub,
+    decode_message,
+    replay_messages,
+)
+from view.view import View
+from view.board_renderer import BoardRenderer
+from engine.ponder import Ponderer
+from engine.search import Search
+from engine.protocol import (
+    EngineClient,
+    EngineServer,
+    builtin_command,
+    move_to_text,
+    text_to_move,
+)
+from engine.solver import DISPROVEN, PROVEN, UNKNOWN, ProofNumberSolver
+from tools import analysis, corpus_stats, dataset_export
+from tools.match import TimeControl, play_match
+from tools.position_batch import PositionBatch, pack_board, unpack_board
+from tools import differential
+from benchmarks.runner import compare_results
+from benchmarks import load_test
 
 
 class TestTile(unittest.TestCase):
@@ -273,6 +318,14 @@ class TestPlayer(unittest.TestCase):
         player.add_piece(piece2)
         self.assertEqual(len(player.get_pieces()), 2)
 
+    def test_add_piece_attached_to_board(self):
+        """Pieces of a player attached to a board come from the board only"""
+        player = Player("Dana")
+        player.attach_board(Board(), 0)
+        with self.assertRaises(ValueError):
+            player.add_piece(Piece("Rat", Piece.PLAYER_1))
+        self.assertEqual(len(player.pieces), 8)
+
 
 class TestGame(unittest.TestCase):
     """Test cases for Game class"""
@@ -556,5 +609,1700 @@ class TestIntegration(unittest.TestCase):
         self.assertEqual(piece_at_dest.name, "Cat")
 
 
+class TestSessionStore(unittest.TestCase):
+    """Test games kept in SQLite behind an LRU of active sessions"""
+
+    def setUp(self):
+        """Open a store in a temporary directory"""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games.db")
+        self.store = GameStore(self.path)
+
+    def tearDown(self):
+        """Close and remove the store"""
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_list_by_player_and_status(self):
+        """Test games are listed by player and move to finished when won"""
+        cache = SessionCache(self.store)
+        first = cache.create("Ann", "Bob")
+        second = cache.create("Ann", "Cid", start_fen="3l3/7/7/7/7/7/7/r6/R6 1")
+        cache.play(second, "A1 to A2")
+        self.assertIs(cache.play(second, "D9 to D8"), False)
+        listed = {game["id"] for game in self.store.list_games(player="Ann")}
+        self.assertEqual(listed, {first, second})
+        self.assertEqual(len(self.store.list_games(player="Bob")), 1)
+        self.assertEqual(self.store.list_games(status=FINISHED), [])
+        self.assertEqual(len(self.store.list_games(player="Cid", status=ACTIVE)), 1)
+        with self.assertRaises(ValueError):
+            cache.play(first, "A3 to A5")
+        with self.assertRaises(ValueError):
+            cache.create("Ann", "Bob", game_id=first)
+
+    def test_moves_survive_without_write_back(self):
+        """Test every move is stored at once, even if the cache is lost"""
+        cache = SessionCache(self.store)
+        game_id = cache.create("Ann", "Bob")
+        for move in ("A3 to A4", "G7 to G6", "A4 to A5"):
+            cache.play(game_id, move)
+        expected = cache.get(game_id).game.board.to_fen(1)
+
+        reopened = GameStore(self.path)
+        controller = reopened.load(game_id)
+        reopened.close()
+        self.assertEqual(controller.game.current_turn, 1)
+        self.assertEqual(controller.game.board.to_fen(1), expected)
+        self.assertEqual(len(controller.move_record), 3)
+        with self.assertRaises(KeyError):
+            self.store.load("missing")
+
+    def test_undone_moves_are_not_replayed(self):
+        """Test a move after undos replaces the undone moves in the store"""
+        controller = Controller()
+        controller.game = Game("Ann", "Bob")
+        self.store.save("game", controller)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for move in ("A3 to A4", "G7 to G6", "A4 to A5", "G6 to G5"):
+                controller.take_turn(move)
+                controller.game.switch_turn()
+                self.store.append_move("game", controller)
+            controller.undo_move()
+            controller.undo_move()
+            controller.take_turn("A4 to B4")
+            controller.game.switch_turn()
+        self.store.append_move("game", controller)
+
+        loaded = self.store.load("game")
+        self.assertEqual(len(loaded.move_record), 3)
+        self.assertEqual(loaded.game.current_turn, 1)
+        self.assertEqual(loaded.game.board.to_fen(1), controller.game.board.to_fen(1))
+
+    def test_eviction_writes_back(self):
+        """Test the least recently used game is written back when evicted"""
+        cache = SessionCache(self.store, capacity=1)
+        first = cache.create("Ann", "Bob")
+        cache.play(first, "A3 to A4")
+        second = cache.create("Cid", "Dan")
+        self.assertNotIn(first, cache)
+        self.assertIn(second, cache)
+        row = self.store._connection.execute(
+            "SELECT data FROM games WHERE id = ?", (first,)
+        ).fetchone()
+        self.assertEqual(len(json.loads(row[0])["move_record"]), 1)
+        self.assertEqual(len(cache.get(first).move_record), 1)
+        self.assertNotIn(second, cache)
+
+
+class TestSpectators(unittest.TestCase):
+    """Test moves broadcast to spectators as compact deltas"""
+
+    MOVES = ["A3 to A4", "G7 to G6", "A4 to A5", "G6 to G5", "A5 to A6", "G5 to G4"]
+
+    def make_controller(self, hub=None):
+        """Create a quiet controller, optionally with its own spectator hub"""
+        controller = Controller(hint_budget=0)
+        if hub is not None:
+            controller.spectators = hub
+        controller.game = Game("Player1", "Player2")
+        return controller
+
+    def play(self, controller, *moves):
+        """Play moves, switching turns"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            for move in moves:
+                controller.take_turn(move)
+                controller.game.switch_turn()
+
+    def position(self, controller):
+        """Position notation of the controller's game"""
+        return controller.game.board.to_fen(controller.game.current_turn)
+
+    def test_moves_sent_as_deltas(self):
+        """Test a spectator gets the start position and one delta per move"""
+        controller = self.make_controller()
+        spectator = controller.spectators.join()
+        self.play(controller, "A3 to A4")
+        messages = spectator.poll()
+        self.assertEqual(decode_message(messages[0]), STARTING_FEN)
+        self.assertEqual(len(messages[1]), 4)
+        self.assertEqual(decode_message(messages[1]), Delta("Rat", 0, 14, 21, None, 1))
+        board, side = replay_messages(messages)
+        self.assertEqual(board.to_fen(side), self.position(controller))
+        self.assertEqual(spectator.poll(), [])
+
+    def test_late_joiner_and_undo(self):
+        """Test late joiners catch up from a keyframe and undo resyncs"""
+        controller = self.make_controller(SpectatorHub(keyframe_interval=2))
+        early = controller.spectators.join()
+        self.play(controller, *self.MOVES[:5])
+        late = controller.spectators.join()
+        self.assertLess(late.pending, 5)
+        board, side = replay_messages(late.poll())
+        self.assertEqual(board.to_fen(side), self.position(controller))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.undo_move()
+        board, side = replay_messages(early.poll())
+        self.assertEqual(board.to_fen(side), self.position(controller))
+        board, side = replay_messages(late.poll(), board, side)
+        self.assertEqual(board.to_fen(side), self.position(controller))
+
+    def test_slow_spectators_coalesced_or_dropped(self):
+        """Test full queues are replaced by a snapshot, or dropped"""
+        coalescing = self.make_controller(SpectatorHub(queue_limit=3))
+        slow = coalescing.spectators.join()
+        self.play(coalescing, *self.MOVES)
+        self.assertLessEqual(slow.pending, 3)
+        board, side = replay_messages(slow.poll())
+        self.assertEqual(board.to_fen(side), self.position(coalescing))
+
+        dropping = self.make_controller(SpectatorHub(queue_limit=3, policy=DROP))
+        slow = dropping.spectators.join()
+        self.play(dropping, *self.MOVES)
+        self.assertTrue(slow.dropped)
+        self.assertEqual(dropping.spectators.spectators, [])
+
+
+@unittest.skipIf(dataset_export.np is None, "NumPy is not installed")
+class TestDatasetExport(unittest.TestCase):
+    """Test cases for exporting .record files as training shards"""
+
+    def setUp(self):
+        """Record a short game to a temporary directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.controller = Controller()
+        self.controller.game = Game("Player1", "Player2")
+        for move in ["A3 to A4", "G7 to G6", "A4 to A5"]:
+            self.assertFalse(self.controller.take_turn(move))
+            self.controller.game.switch_turn()
+        self.record_path = os.path.join(self.tmpdir.name, "game.record")
+        self.controller._save_record(self.record_path)
+
+    def test_encode_game(self):
+        """Test one sample is produced per move with the position before it"""
+        with open(self.record_path) as f:
+            moves = json.load(f)["moves"]
+        samples = dataset_export.encode_game(moves)
+
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(list(samples["side"]), [0, 1, 0])
+        # A3 (col 0, row 2) to A4 (col 0, row 3)
+        self.assertEqual(list(samples["move"][0]), [14, 21])
+        # 8 pieces per side in the starting position
+        self.assertEqual(samples["position"][0].sum(), 16)
+        # P1 Rat plane is the first plane
+        self.assertEqual(samples["position"][0][0, 2, 0], 1)
+        self.assertEqual(samples["position"][1][0, 3, 0], 1)
+        # Unfinished game has no result
+        self.assertTrue((samples["result"] == 0).all())
+
+    def test_mirror_augmentation(self):
+        """Test augmented samples are left-right mirrored copies"""
+        with open(self.record_path) as f:
+            moves = json.load(f)["moves"]
+        samples = dataset_export.encode_game(moves, augment=True)
+
+        self.assertEqual(len(samples), 6)
+        self.assertEqual(list(samples["move"][3]), [20, 27])
+        self.assertEqual(samples["position"][3][0, 2, 6], 1)
+
+    def test_export_to_shards(self):
+        """Test samples are split into fixed-size shards with a manifest"""
+        output = os.path.join(self.tmpdir.name, "dataset")
+        manifest = dataset_export.export_dataset(
+            self.tmpdir.name, output, shard_size=2, workers=1
+        )
+
+        self.assertEqual(manifest["games"], 1)
+        self.assertEqual(manifest["samples"], 3)
+        self.assertEqual([s["samples"] for s in manifest["shards"]], [2, 1])
+        shard = dataset_export.np.load(
+            os.path.join(output, manifest["shards"][1]["file"]), mmap_mode="r"
+        )
+        self.assertEqual(len(shard), 2)
+        self.assertEqual(shard["side"][0], 0)
+        self.assertTrue(
+            os.path.exists(os.path.join(output, dataset_export.MANIFEST_NAME))
+        )
+
+    def test_game_winner_den_entry(self):
+        """Test the last mover wins when the record ends in the opponent's den"""
+        board = Board()
+        self.assertEqual(
+            dataset_export.game_winner(board, 0, Board.PLAYER_2_DEN_POSITION), 0
+        )
+        self.assertIsNone(dataset_export.game_winner(board, 0, (0, 3)))
+
+
+class TestRecordAnalysis(unittest.TestCase):
+    """Test the post-game analysis of .record files"""
+
+    def setUp(self):
+        """Write two copies of a game where Player 1 hangs a Dog"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        record = {
+            "start_fen": "7/7/3l3/7/3D3/7/7/7/6E 1",
+            "moves": [
+                {"move_number": 1, "player_index": 0, "from": "D5", "to": "D6"},
+                {"move_number": 2, "player_index": 1, "from": "D7", "to": "D6"},
+            ],
+        }
+        for name in ("first.record", "second.record"):
+            with open(os.path.join(self.tmpdir.name, name), "w") as f:
+                json.dump(record, f)
+
+    def test_blunder_is_tagged(self):
+        """Test a move giving away a piece is a blunder and the capture is not"""
+        summary = analysis.analyze_records(self.tmpdir.name, workers=1)
+        first, second = summary["games"][0]["moves"]
+        self.assertEqual(first["analysis"]["tag"], analysis.BLUNDER)
+        self.assertNotEqual(first["analysis"]["best"], "D5 to D6")
+        self.assertIsNone(second["analysis"]["tag"])
+        self.assertEqual(second["analysis"]["best"], "D7 to D6")
+        self.assertIn("1 blunder(s)", analysis.format_report(summary))
+
+    def test_positions_are_deduplicated(self):
+        """Test positions shared by games are searched once, in a process pool"""
+        output = os.path.join(self.tmpdir.name, "annotated")
+        summary = analysis.analyze_records(
+            self.tmpdir.name, workers=2, chunk_size=1, output_dir=output
+        )
+        self.assertEqual(summary["positions"], 6)
+        self.assertEqual(summary["unique_positions"], 3)
+        games = summary["games"]
+        self.assertEqual(games[0]["moves"], games[1]["moves"])
+        with open(os.path.join(output, "second.record")) as f:
+            self.assertEqual(json.load(f)["moves"], games[1]["moves"])
+
+    def test_won_game_ends_without_search(self):
+        """Test the move entering the den is scored as decisive"""
+        with open(os.path.join(self.tmpdir.name, "first.record"), "w") as f:
+            json.dump(
+                {
+                    "start_fen": "7/3R3/7/7/7/7/7/7/3l3 1",
+                    "moves": [
+                        {"move_number": 1, "player_index": 0, "from": "D8", "to": "D9"}
+                    ],
+                },
+                f,
+            )
+        summary = analysis.analyze_records(
+            os.path.join(self.tmpdir.name, "first.record"), workers=1
+        )
+        self.assertEqual(summary["positions"], 1)
+        move = summary["games"][0]["moves"][0]
+        self.assertEqual(move["analysis"]["swing"], 0)
+        self.assertEqual(move["analysis"]["best"], "D8 to D9")
+
+
+class TestBenchmarkComparison(unittest.TestCase):
+    """Test cases for comparing benchmark results against a baseline"""
+
+    def test_regression_flagged_above_threshold(self):
+        """Test only slowdowns beyond the threshold are flagged"""
+        baseline = {"benchmarks": {"a": {"median_ns": 100}, "b": {"median_ns": 100}}}
+        current = {
+            "benchmarks": {
+                "a": {"median_ns": 105},
+                "b": {"median_ns": 130},
+                "new": {"median_ns": 1},
+            }
+        }
+        comparison = compare_results(current, baseline, threshold=0.10)
+
+        self.assertEqual([entry["name"] for entry in comparison], ["a", "b"])
+        self.assertFalse(comparison[0]["regression"])
+        self.assertTrue(comparison[1]["regression"])
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test the load-testing harness driving simulated sessions"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        self.assertEqual(load_test.percentile(values, 50), 50)
+        self.assertEqual(load_test.percentile(values, 99), 99)
+        self.assertEqual(load_test.percentile([7], 95), 7)
+
+    def test_sessions_report_every_operation(self):
+        """Test a small run plays every move and times each operation"""
+        report = load_test.run_load_test(
+            sessions=2,
+            moves=30,
+            workers=1,
+            seed=3,
+            undo_rate=0.3,
+            save_interval=5,
+            max_plies=12,
+        )
+        self.assertEqual(report["moves"], 60)
+        self.assertGreater(report["moves_per_second"], 0)
+        self.assertEqual(set(report["operations"]), set(load_test.OPERATIONS))
+        for stats in report["operations"].values():
+            self.assertLessEqual(stats["p50_ns"], stats["p95_ns"])
+            self.assertLessEqual(stats["p95_ns"], stats["p99_ns"])
+        self.assertIn("take_turn", load_test.format_report(report))
+
+
+@unittest.skipIf(corpus_stats.np is None, "NumPy is not installed")
+class TestCorpusStats(unittest.TestCase):
+    """Test aggregate statistics over .record files"""
+
+    def setUp(self):
+        """Record a game won by capturing the last piece, twice"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        controller = Controller()
+        controller.game = Game("Player1", "Player2")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("7/7/7/7/7/7/7/r6/L6 1")
+            self.assertTrue(controller.take_turn("A1 to A2"))
+        self.paths = [os.path.join(self.tmpdir.name, f"{n}.record") for n in "ab"]
+        for path in self.paths:
+            controller._save_record(path)
+        # The second record is in the older format, without a result
+        with open(self.paths[1]) as f:
+            record_data = json.load(f)
+        del record_data["result"]
+        with open(self.paths[1], "w") as f:
+            json.dump(record_data, f)
+
+    def test_counts_games(self):
+        """Test results, lengths, captures and occupancy of each game"""
+        summary = corpus_stats.corpus_stats(self.tmpdir.name, workers=1).to_dict()
+        self.assertEqual(summary["games"], 2)
+        self.assertEqual(summary["results"]["player1_win_rate"], 1.0)
+        self.assertEqual(summary["outcomes"]["player1"][corpus_stats.CAPTURE_ALL], 2)
+        self.assertEqual(summary["lengths"]["histogram"], {"1": 2})
+        self.assertEqual(
+            summary["captures"], [{"attacker": "Lion", "victim": "Rat", "count": 2}]
+        )
+        self.assertEqual(summary["positions"], 4)
+        self.assertEqual(summary["occupancy"]["player1"][0][0], 2)  # A1
+        self.assertEqual(summary["occupancy"]["player1"][1][0], 2)  # A2
+        self.assertEqual(summary["occupancy"]["player2"][1][0], 2)
+        self.assertIn("Lion     takes Rat", corpus_stats.format_report(summary))
+
+    def test_outcome_from_final_position(self):
+        """Test records without a result are judged from the final position"""
+        board, _ = Board.from_fen("3R3/7/7/7/7/7/7/7/3l3 2")
+        self.assertEqual(
+            corpus_stats.game_outcome({}, board, 0, 59), (0, corpus_stats.DEN)
+        )
+        self.assertEqual(
+            corpus_stats.game_outcome({}, board, 1, 10),
+            (None, corpus_stats.UNFINISHED),
+        )
+
+    def test_parallel_merge_matches_inline(self):
+        """Test counts merged from worker processes equal an inline run"""
+        inline = corpus_stats.corpus_stats(self.tmpdir.name, workers=1)
+        merged = corpus_stats.corpus_stats(self.tmpdir.name, workers=2, chunk_size=1)
+        self.assertEqual(merged.to_dict(), inline.to_dict())
+        self.assertEqual(merged.length_percentile(50), 1)
+
+    def test_archive_matches_files(self):
+        """Test an archive of the records gives the same statistics"""
+        archive = os.path.join(self.tmpdir.name, "games.jqa")
+        record_archive.import_records(self.paths, archive)
+        self.assertEqual(
+            corpus_stats.corpus_stats(archive, workers=1).to_dict(),
+            corpus_stats.corpus_stats(self.tmpdir.name, workers=1).to_dict(),
+        )
+
+
+class TestRecordArchive(unittest.TestCase):
+    """Test many game records packed into one indexed archive"""
+
+    def setUp(self):
+        """Record a won game and an unfinished, annotated one"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "games.jqa")
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Ann", "Bob")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("7/7/7/7/7/7/7/r6/L6 1")
+            controller.take_turn("A1 to A2")
+        self.won = controller._record_data()
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Cid", "Dee")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for move in ("A3 to A4", "G7 to G6"):
+                controller.take_turn(move)
+                controller.game.switch_turn()
+        self.annotated = controller._record_data()
+        self.annotated["moves"][0]["analysis"] = {"tag": "blunder"}
+
+    def test_round_trip_and_random_access(self):
+        """Test games read back by number and in order equal the records"""
+        with record_archive.ArchiveWriter(self.path) as writer:
+            self.assertEqual(writer.add(self.won), 0)
+            self.assertEqual(writer.add(self.annotated), 1)
+        with record_archive.RecordArchive(self.path) as archive:
+            self.assertEqual(len(archive), 2)
+            self.assertEqual(archive[1], self.annotated)
+            self.assertEqual(archive[-2], self.won)
+            self.assertEqual(list(archive), [self.won, self.annotated])
+            self.assertEqual(archive.entry(0).winner, 0)
+            self.assertEqual(archive.entry(1).winner, record_archive.NO_WINNER)
+            self.assertEqual(archive.entry(1).moves, 2)
+            self.assertEqual(
+                [packed_move.move_notation(m) for m in archive.moves(1)],
+                ["A3 to A4", "G7 to G6"],
+            )
+            with self.assertRaises(IndexError):
+                archive[2]
+
+    def test_append_after_crash(self):
+        """Test an archive cut short keeps its whole games and takes more"""
+        with record_archive.ArchiveWriter(self.path) as writer:
+            writer.add(self.won)
+            writer.add(self.annotated)
+        with record_archive.RecordArchive(self.path) as archive:
+            second = archive.entry(1)
+        # Lose the index and half of the last block
+        with open(self.path, "r+b") as f:
+            f.truncate(second.offset + second.length // 2)
+        with record_archive.RecordArchive(self.path) as archive:
+            self.assertEqual(list(archive), [self.won])
+        with record_archive.ArchiveWriter(self.path) as writer:
+            self.assertEqual(writer.add(self.annotated), 1)
+        with record_archive.RecordArchive(self.path) as archive:
+            self.assertEqual(list(archive), [self.won, self.annotated])
+
+    def test_import_export_and_auto_save(self):
+        """Test .record files go in and out, and finished games are archived"""
+        record_path = os.path.join(self.tmpdir.name, "won.record")
+        with open(record_path, "w") as f:
+            json.dump(self.won, f)
+        summary = record_archive.import_records([record_path], self.path)
+        self.assertEqual(summary, {"games": 1, "errors": []})
+        output = os.path.join(self.tmpdir.name, "out")
+        [exported] = record_archive.export_records(self.path, output)
+        with open(exported) as f:
+            self.assertEqual(json.load(f), self.won)
+
+        controller = Controller(hint_budget=0)
+        controller.archive_path = self.path
+        controller.game = Game("Ann", "Bob")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("7/7/7/7/7/7/7/r6/L6 1")
+            controller.take_turn("A1 to A2")
+            controller._auto_save_record()
+        writer = controller.archive_writer
+        with record_archive.RecordArchive(self.path) as archive:
+            self.assertEqual(len(archive), 2)  # Readable before the close
+            self.assertEqual(
+                archive[1]["result"], {"winner": 0, "reason": "capture_all"}
+            )
+
+        # The next game goes through the same writer, indexed on close
+        controller.game = Game("Ann", "Bob")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("7/7/7/7/7/7/7/r6/L6 1")
+            controller.take_turn("A1 to A2")
+            controller._auto_save_record()
+        self.assertIs(controller.archive_writer, writer)
+        controller.close_archive()
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertTrue(data.endswith(record_archive.FOOTER_MAGIC))
+        with record_archive.ArchiveWriter(self.path):
+            pass  # Opened without adding games: left as it was
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        with record_archive.RecordArchive(self.path) as archive:
+            self.assertEqual(len(archive), 3)
+
+
+class TestTurnProfiler(unittest.TestCase):
+    """Test cases for per-phase turn timing"""
+
+    def test_disabled_profiler_collects_nothing(self):
+        """Test a disabled profiler hands out one shared no-op phase"""
+        profiler = TurnProfiler()
+        self.assertIs(profiler.phase("parse"), profiler.phase("render"))
+        with profiler.phase("parse"):
+            pass
+        self.assertEqual(profiler.stats, {})
+
+    def test_take_turn_phases_are_timed(self):
+        """Test take_turn records each phase once per valid move"""
+        profiler = TurnProfiler(enabled=True)
+        controller = Controller(profiler)
+        controller.game = Game("Player1", "Player2")
+        controller.take_turn("A3 to A4")
+
+        for phase in [
+            "parse",
+            "validate",
+            "capture_check",
+            "history",
+            "apply",
+            "record",
+            "win_check",
+        ]:
+            self.assertEqual(profiler.stats[phase].count, 1)
+        self.assertGreater(profiler.stats["parse"].total_ns, 0)
+        self.assertEqual(sum(profiler.stats["parse"].histogram), 1)
+        self.assertIn("history", profiler.summary())
+
+
+class TestBoardPieceIndex(unittest.TestCase):
+    """Test cases for the incremental piece counts and location index"""
+
+    def test_initial_counts_and_locations(self):
+        """Test the starting position is indexed"""
+        board = Board()
+        self.assertEqual(board.count_pieces(0), 8)
+        self.assertEqual(board.count_pieces(1), 8)
+        elephant = board.get_piece((6, 2))
+        self.assertEqual(board.get_piece_position(elephant), (6, 2))
+
+    def test_index_follows_moves_and_captures(self):
+        """Test moving and capturing keep counts and locations in sync"""
+        board = Board()
+        rat = board.get_piece((0, 2))
+        board.move_piece((0, 2), (0, 3))
+        self.assertEqual(board.get_piece_position(rat), (0, 3))
+
+        cat = Piece("Cat", Piece.PLAYER_2)
+        board.place_piece(cat, (0, 4))
+        self.assertEqual(board.count_pieces(1), 9)
+        board.move_piece((0, 3), (0, 4))
+        self.assertEqual(board.count_pieces(1), 8)
+        self.assertIsNone(board.get_piece_position(cat))
+
+    def test_removing_empty_tile_keeps_counts(self):
+        """Test clearing an empty tile does not change the counts"""
+        board = Board()
+        board.remove_piece((3, 4))
+        self.assertEqual(board.count_pieces(0), 8)
+
+    def test_player_pieces_are_live(self):
+        """Test a game's players see their pieces on the board"""
+        game = Game("Player1", "Player2")
+        self.assertEqual(len(game.players[0].get_pieces()), 8)
+        game.board.remove_piece((0, 2))
+        self.assertEqual(len(game.players[0].get_pieces()), 7)
+        self.assertTrue(all(p.owner == 1 for p in game.players[1].pieces))
+
+
+class TestBoardTerrainAndCopies(unittest.TestCase):
+    """Test cases for shared terrain and board reset/clone/snapshots"""
+
+    def test_terrain_is_shared_and_read_only(self):
+        """Test boards share one terrain table that cannot be modified"""
+        board_a, board_b = Board(), Board()
+        self.assertIs(board_a.get_terrain((1, 3)), board_b.get_terrain((1, 3)))
+        self.assertIs(board_a.get_terrain((1, 3)), TERRAIN[1][3])
+        with self.assertRaises(AttributeError):
+            board_a.get_terrain((1, 3)).place_piece(Piece("Rat", Piece.PLAYER_1))
+
+    def test_clone_is_independent(self):
+        """Test changes to a clone do not affect the original"""
+        board = Board()
+        copy = board.clone()
+        copy.move_piece((0, 2), (0, 3))
+
+        self.assertIsNotNone(board.get_piece((0, 2)))
+        self.assertIsNone(copy.get_piece((0, 2)))
+        self.assertEqual(copy.get_piece_position(copy.get_piece((0, 3))), (0, 3))
+        self.assertEqual(board.count_pieces(0), copy.count_pieces(0))
+
+    def test_reset_restores_starting_position(self):
+        """Test reset puts every piece back"""
+        board = Board()
+        board.clear()
+        self.assertEqual(board.count_pieces(0), 0)
+        board.reset()
+        self.assertEqual(board.snapshot(), Board().snapshot())
+
+    def test_snapshot_round_trip(self):
+        """Test a board rebuilt from a snapshot matches the original"""
+        board = Board()
+        board.move_piece((0, 2), (0, 3))
+        rebuilt = Board.from_snapshot(board.snapshot())
+        self.assertEqual(rebuilt.snapshot(), board.snapshot())
+        self.assertEqual(rebuilt.count_pieces(1), 8)
+
+    def test_get_tile_combines_terrain_and_piece(self):
+        """Test get_tile shows both the terrain and the occupant"""
+        board = Board()
+        tile = board.get_tile((2, 0))
+        self.assertEqual(tile.tile_type, Tile.TRAP)
+        self.assertEqual(tile.owner, Tile.PLAYER_1)
+        self.assertIsNone(tile.piece)
+        self.assertEqual(board.get_tile((0, 0)).piece.name, "Lion")
+
+    def test_tiles_are_read_only_copies(self):
+        """Test tiles from get_tile and grid cannot be changed"""
+        board = Board()
+        tile = board.get_tile((0, 0))
+        with self.assertRaises(AttributeError):
+            tile.place_piece(None)
+        with self.assertRaises(AttributeError):
+            board.grid[0][0].piece = None
+        board.remove_piece((0, 0))
+        self.assertEqual(tile.piece.name, "Lion")
+        self.assertTrue(board.get_tile((0, 0)).is_empty())
+
+
+class TestRulesKernel(unittest.TestCase):
+    """Test cases for the cached legal move set"""
+
+    def setUp(self):
+        """Set up an empty board"""
+        self.board = Board.empty()
+
+    def test_cache_reused_until_board_changes(self):
+        """Test the legal move set is computed once per position"""
+        board = Board()
+        moves = rules.legal_moves(board, 0)
+        self.assertIs(rules.legal_moves(board, 0), moves)
+        board.move_piece((0, 2), (0, 3))
+        self.assertIsNot(rules.legal_moves(board, 0), moves)
+        self.assertIn((0, 4), rules.moves_from(board, 0, (0, 3)))
+
+    def test_cannot_jump_opponent_lion(self):
+        """Test a player cannot river-jump the opponent's Lion"""
+        self.board.place_piece(Piece("Lion", Piece.PLAYER_2), (0, 4))
+        self.assertFalse(rules.is_legal_move(self.board, 0, (0, 4), (3, 4)))
+        self.assertTrue(rules.is_legal_move(self.board, 1, (0, 4), (3, 4)))
+
+    def test_river_jump_capture(self):
+        """Test a Lion can jump the river onto a lower-ranked piece"""
+        self.board.place_piece(Piece("Lion", Piece.PLAYER_1), (1, 2))
+        self.board.place_piece(Piece("Wolf", Piece.PLAYER_2), (1, 6))
+        self.assertTrue(rules.is_legal_move(self.board, 0, (1, 2), (1, 6)))
+
+    def test_explain_illegal_move(self):
+        """Test the reason given for each kind of illegal move"""
+        board = Board()
+        self.assertEqual(
+            rules.explain_illegal_move(board, 0, (3, 3), (3, 4)),
+            rules.NO_PIECE_MESSAGE,
+        )
+        self.assertEqual(
+            rules.explain_illegal_move(board, 0, (0, 2), (1, 3)),
+            rules.ILLEGAL_MOVE_MESSAGE,
+        )
+        self.assertEqual(
+            rules.explain_illegal_move(board, 0, (4, 2), (4, 3)),
+            rules.ILLEGAL_MOVE_MESSAGE,
+        )
+        self.assertEqual(
+            rules.explain_illegal_move(board, 0, (0, 6), (0, 5)),
+            rules.ILLEGAL_MOVE_MESSAGE,
+        )
+        board.move_piece((0, 0), (0, 1))
+        self.assertEqual(
+            rules.explain_illegal_move(board, 0, (0, 1), (0, 2)),
+            rules.OWN_PIECE_MESSAGE,
+        )
+        self.assertIsNone(rules.explain_illegal_move(board, 0, (0, 2), (0, 3)))
+
+    def test_cannot_enter_own_den(self):
+        """Test a piece may not move into its own den"""
+        self.board.place_piece(Piece("Dog", Piece.PLAYER_1), (2, 0))
+        self.assertNotIn((3, 0), rules.moves_from(self.board, 0, (2, 0)))
+        self.assertEqual(
+            rules.explain_illegal_move(self.board, 0, (2, 0), (3, 0)),
+            rules.ILLEGAL_MOVE_MESSAGE,
+        )
+
+    def test_explain_cannot_capture(self):
+        """Test a capture of a higher-ranked piece is explained"""
+        self.board.place_piece(Piece("Cat", Piece.PLAYER_1), (3, 3))
+        self.board.place_piece(Piece("Dog", Piece.PLAYER_2), (3, 4))
+        self.assertEqual(
+            rules.explain_illegal_move(self.board, 0, (3, 3), (3, 4)),
+            rules.CANNOT_CAPTURE_MESSAGE,
+        )
+
+    def test_undo_after_capture_restores_captured_piece(self):
+        """Test undoing a capture puts the captured piece back"""
+        controller = Controller()
+        controller.game = Game("Player1", "Player2", Board.empty())
+        board = controller.game.board
+        board.place_piece(Piece("Cat", Piece.PLAYER_1), (3, 3))
+        board.place_piece(Piece("Rat", Piece.PLAYER_2), (3, 4))
+        board.place_piece(Piece("Dog", Piece.PLAYER_2), (6, 8))
+
+        self.assertFalse(controller.take_turn("D4 to D5"))
+        self.assertTrue(controller.undo_move())
+        self.assertEqual(board.get_piece((3, 4)).name, "Rat")
+        self.assertEqual(board.count_pieces(1), 2)
+
+
+class TestPositionNotation(unittest.TestCase):
+    """Test cases for the one-line position notation"""
+
+    def test_starting_position(self):
+        """Test the starting position notation"""
+        self.assertEqual(
+            Board().to_fen(), "t5l/1c3d1/e1w1p1r/7/7/7/R1P1W1E/1D3C1/L5T 1"
+        )
+
+    def test_round_trip(self):
+        """Test a position survives a round trip with the side to move"""
+        board = Board()
+        board.move_piece((0, 2), (0, 3))
+        fen = board.to_fen(1)
+        rebuilt, side = Board.from_fen(fen)
+        self.assertEqual(side, 1)
+        self.assertEqual(rebuilt.snapshot(), board.snapshot())
+        self.assertEqual(rebuilt.to_fen(side), fen)
+
+    def test_fen_as_fixture_and_key(self):
+        """Test building a sparse position and using it as a dict key"""
+        board, side = Board.from_fen("3l3/7/7/7/7/7/7/7/3R3 2")
+        self.assertEqual(side, 1)
+        self.assertEqual(board.get_piece((3, 8)).name, "Lion")
+        self.assertEqual(board.get_piece((3, 8)).owner, Piece.PLAYER_2)
+        self.assertEqual(board.get_piece((3, 0)).name, "Rat")
+        cache = {board.to_fen(side): "seen"}
+        self.assertIn(Board.from_fen(board.to_fen(side))[0].to_fen(side), cache)
+
+    def test_malformed_notation(self):
+        """Test malformed notation is rejected"""
+        for fen in ["", "7/7/7 1", "8/7/7/7/7/7/7/7/7 1", "x6/7/7/7/7/7/7/7/7 1"]:
+            with self.assertRaises(ValueError):
+                Board.from_fen(fen)
+        with self.assertRaises(ValueError):
+            Board.from_fen("7/7/7/7/7/7/7/7/7 3")
+
+    def test_controller_load_fen(self):
+        """Test the load-fen command replaces the position and resets history"""
+        controller = Controller()
+        controller.game = Game("Player1", "Player2")
+        controller.take_turn("A3 to A4")
+        self.assertTrue(controller.load_fen("3l3/7/7/7/7/7/7/7/3R3 2"))
+        self.assertEqual(controller.game.current_turn, 1)
+        self.assertEqual(controller.game.board.count_pieces(0), 1)
+        self.assertEqual(len(controller.move_history), 0)
+        self.assertFalse(controller.load_fen("not a position"))
+
+    def test_save_load_keeps_start_position(self):
+        """Test saves and records carry a custom starting position"""
+        controller = Controller()
+        controller.game = Game("Player1", "Player2")
+        controller.load_fen("3l3/7/7/7/7/7/7/3R3/7 1")
+        controller.take_turn("D2 to D3")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "game.jungle")
+            controller._save_game(path)
+            loaded = Controller()
+            loaded._load_game(path)
+            record_path = os.path.join(tmpdir, "game.record")
+            loaded._save_record(record_path)
+            with open(record_path) as f:
+                record = json.load(f)
+        self.assertEqual(loaded.game.board.get_piece((3, 2)).name, "Rat")
+        self.assertEqual(record["start_fen"], "3l3/7/7/7/7/7/7/3R3/7 1")
+
+
+class TestPackedMoves(unittest.TestCase):
+    """Test 16-bit moves used by the parser, undo history and record"""
+
+    def test_encoding_round_trip(self):
+        """Test squares and the captured piece survive packing"""
+        move = packed_move.encode_positions((6, 8), (5, 8), Piece("Elephant", 0))
+        self.assertLess(move, 1 << 16)
+        self.assertEqual(packed_move.move_positions(move), ((6, 8), (5, 8)))
+        self.assertTrue(packed_move.is_capture(move))
+        self.assertEqual(packed_move.captured_name(move), "Elephant")
+        self.assertEqual(packed_move.move_notation(move), "G9 to F9")
+        quiet = packed_move.with_capture(move, None)
+        self.assertFalse(packed_move.is_capture(quiet))
+        self.assertIsNone(packed_move.captured_name(quiet))
+        self.assertEqual(MoveParser.parse_move("g9 to f9"), quiet)
+
+    def test_revert_restores_capture(self):
+        """Test a packed capture is taken back with nothing but the move"""
+        board, _ = Board.from_fen("3l3/7/7/7/7/7/7/r6/R6 1")
+        fen = board.to_fen(0)
+        move = packed_move.encode_positions((0, 0), (0, 1), board.get_piece((0, 1)))
+        packed_move.apply_move(board, move)
+        self.assertEqual(packed_move.revert_move(board, move), 0)
+        self.assertEqual(board.to_fen(0), fen)
+
+    def test_undo_and_save_use_packed_moves(self):
+        """Test undo takes back a capture and files keep the packed history"""
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Player1", "Player2")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("3l3/7/7/7/7/7/7/r6/R6 1")
+            controller.take_turn("A1 to A2")
+            self.assertEqual(controller.move_history.typecode, "H")
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "packed.jungle")
+                controller._save_game(filename)
+                with open(filename) as f:
+                    data = json.load(f)
+                self.assertNotIn("timestamp", data["move_record"][0])
+                controller._load_game(filename)
+            self.assertEqual(list(controller.move_history), [data["move_history"][0]])
+            self.assertTrue(controller.undo_move())
+        self.assertEqual(controller.game.board.count_pieces(1), 2)
+        self.assertEqual(controller.game.current_turn, 0)
+        self.assertEqual(len(controller.move_record), 0)
+
+
+class TestDrawRules(unittest.TestCase):
+    """Test position keys and the optional draw rules"""
+
+    SHUFFLE = ["A1 to B1", "A9 to B9", "B1 to A1", "B9 to A9"]
+
+    def make_controller(self, **limits):
+        controller = Controller(draw_rules=DrawRules(**limits))
+        controller.game = Game("Player1", "Player2", draw_rules=controller.draw_rules)
+        return controller
+
+    def test_position_key_is_incremental(self):
+        """Test the board hash matches a fresh board after moves and undo"""
+        board = Board()
+        start = board.position_key(0)
+        self.assertNotEqual(start, board.position_key(1))
+        board.move_piece((0, 0), (1, 0))
+        self.assertNotEqual(board.position_key(0), start)
+        self.assertEqual(board.clone().position_key(1), board.position_key(1))
+        self.assertEqual(hash_snapshot(board.snapshot(), 1), board.position_key(1))
+        board.move_piece((1, 0), (0, 0))
+        self.assertEqual(board.position_key(0), start)
+        self.assertEqual(Board.from_fen(STARTING_FEN)[0].position_key(0), start)
+
+    def test_rules_are_off_by_default(self):
+        """Test games without draw rules never end in a draw"""
+        controller = Controller()
+        controller.game = Game("Player1", "Player2")
+        for move in self.SHUFFLE * 3:
+            self.assertFalse(controller.take_turn(move))
+            controller.game.switch_turn()
+        self.assertIsNone(controller.result)
+
+    def test_threefold_repetition(self):
+        """Test the third occurrence of a position draws the game"""
+        controller = self.make_controller(repetition_limit=3)
+        moves = self.SHUFFLE * 2
+        for move in moves[:-1]:
+            self.assertFalse(controller.take_turn(move))
+            controller.game.switch_turn()
+        self.assertTrue(controller.take_turn(moves[-1]))
+        self.assertEqual(controller.result, {"winner": None, "reason": REPETITION})
+
+    def test_undo_reverts_repetition_count(self):
+        """Test undone positions are no longer counted"""
+        controller = self.make_controller(repetition_limit=3)
+        moves = self.SHUFFLE * 2
+        for move in moves[:-1]:
+            controller.take_turn(move)
+            controller.game.switch_turn()
+        controller.undo_move()
+        controller.undo_move()
+        for move in moves[-2:]:
+            self.assertFalse(controller.take_turn(move))
+            controller.game.switch_turn()
+        self.assertEqual(
+            controller.draw_tracker.counts[controller.draw_tracker.keys[0]], 2
+        )
+
+    def test_no_capture_limit(self):
+        """Test the no-capture clock ends the game and resets on captures"""
+        controller = self.make_controller(no_capture_limit=2)
+        controller.load_fen("3l3/7/7/7/7/7/7/r6/R6 1")
+        self.assertFalse(controller.take_turn("A1 to A2"))  # Rat takes rat
+        controller.game.switch_turn()
+        self.assertEqual(controller.draw_tracker.no_capture_moves, 0)
+        self.assertFalse(controller.take_turn("D9 to C9"))
+        controller.game.switch_turn()
+        self.assertTrue(controller.take_turn("A2 to A3"))
+        self.assertEqual(controller.result["reason"], NO_CAPTURE)
+
+    def test_rules_survive_save_and_load(self):
+        """Test saves and records carry the draw rules and position counts"""
+        controller = self.make_controller(repetition_limit=3, no_capture_limit=50)
+        for move in self.SHUFFLE * 2 + self.SHUFFLE[:3]:
+            controller.take_turn(move)
+            controller.game.switch_turn()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "game.jungle")
+            controller._save_game(path)
+            loaded = Controller()
+            loaded._load_game(path)
+            record_path = os.path.join(tmpdir, "game.record")
+            loaded._save_record(record_path)
+            with open(record_path) as f:
+                record = json.load(f)
+        self.assertEqual(loaded.game.draw_rules.to_dict(), record["draw_rules"])
+        self.assertEqual(record["draw_rules"]["repetition_limit"], 3)
+        self.assertEqual(loaded.draw_tracker.counts, controller.draw_tracker.counts)
+        self.assertEqual(loaded.draw_tracker.no_capture_moves, 11)
+        self.assertTrue(loaded.take_turn(self.SHUFFLE[3]))
+
+    def test_invalid_limits(self):
+        """Test meaningless limits are rejected"""
+        with self.assertRaises(ValueError):
+            DrawRules(repetition_limit=1)
+        with self.assertRaises(ValueError):
+            DrawRules(no_capture_limit=0)
+
+
+class TestSearchAndHint(unittest.TestCase):
+    """Test the anytime search behind the hint command"""
+
+    def test_search_finds_den_entry(self):
+        """Test a move into the opponent's den is found as a win"""
+        board, side = Board.from_fen("7/3R3/7/7/7/7/7/7/3l3 1")
+        result = Search(board, side).best_move()
+        self.assertEqual(result.move, ((3, 7), (3, 8)))
+        self.assertTrue(result.is_win)
+
+    def test_search_does_not_change_board(self):
+        """Test the search works on its own copy of the board"""
+        board = Board()
+        fen = board.to_fen(0)
+        result = Search(board, 0).best_move(max_depth=3)
+        self.assertEqual(result.depth, 3)
+        self.assertTrue(rules.is_legal_move(board, 0, *result.move))
+        self.assertEqual(board.to_fen(0), fen)
+
+    def test_stopped_search_has_no_result(self):
+        """Test a cancelled search stops without reporting a partial depth"""
+        stop = threading.Event()
+        stop.set()
+        search = Search(Board(), 0, stop_event=stop)
+        self.assertIsNone(search.best_move(max_depth=8))
+
+    def test_ponderer_restarts_on_new_position(self):
+        """Test the background search follows the position and can be cancelled"""
+        ponderer = Ponderer(cpu_budget=0.5, max_depth=2)
+        board = Board()
+        ponderer.start(board, 0)
+        self.assertTrue(ponderer.is_searching(board, 0))
+        self.assertEqual(ponderer.best(wait=5).depth, 2)
+        board.move_piece((0, 2), (0, 3))
+        self.assertFalse(ponderer.is_searching(board, 1))
+        ponderer.start(board, 1)
+        result = ponderer.best(wait=5)
+        self.assertTrue(rules.is_legal_move(board, 1, *result.move))
+        ponderer.cancel()
+        self.assertIsNone(ponderer.best(wait=0))
+
+    def test_hint_command(self):
+        """Test hint prints a move, or explains that hints are disabled"""
+        controller = Controller(hint_budget=0.5)
+        controller.ponderer.max_depth = 2
+        controller.game = Game("Player1", "Player2")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            controller.show_hint()
+        controller.ponderer.cancel()
+        self.assertIn("Hint: move your", output.getvalue())
+
+        controller = Controller()
+        self.assertIsNone(controller.ponderer)  # Only the CLI enables hints
+        controller.game = Game("Player1", "Player2")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            controller.show_hint()
+        self.assertIn("disabled", output.getvalue())
+
+    def test_search_survives_until_position_changes(self):
+        """Test only an applied move stops the search of the position"""
+        controller = Controller(hint_budget=0.5)
+        controller.ponderer.max_depth = 2
+        controller.game = Game("Player1", "Player2")
+        board = controller.game.board
+        controller.ponderer.start(board, 0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(controller.take_turn("A3 to A5"))
+            self.assertTrue(controller.ponderer.is_searching(board, 0))
+            self.assertFalse(controller.take_turn("A3 to A4"))
+        self.assertFalse(controller.ponderer.is_searching(board, 0))
+        self.assertIsNone(controller.ponderer.best(wait=0))
+
+
+class TestProofNumberSolver(unittest.TestCase):
+    """Test the df-pn solver behind the solve command"""
+
+    def test_proves_den_entry(self):
+        """Test a move into the opponent's den is proven in one move"""
+        board, side = Board.from_fen("7/3R3/7/7/7/7/7/7/3l3 1")
+        result = ProofNumberSolver().solve(board, side)
+        self.assertEqual(result.status, PROVEN)
+        self.assertEqual(result.line, [((3, 7), (3, 8))])
+
+    def test_proves_lion_against_cat(self):
+        """Test a long forced win is proven with a line ending in the den"""
+        board, side = Board.from_fen("7/7/c6/7/7/7/7/3L3/7 1")
+        fen = board.to_fen(side)
+        result = ProofNumberSolver(max_nodes=100_000).solve(board, side)
+        self.assertEqual(result.status, PROVEN)
+        self.assertEqual(len(result.line) % 2, 1)
+        self.assertEqual(result.line[-1][1], rules.opponent_den(side))
+        self.assertEqual(board.to_fen(side), fen)
+        self.assertGreater(result.nodes_per_second, 0)
+
+    def test_depth_limit_is_not_a_disproof(self):
+        """Test a win longer than the depth limit is left open, not disproven"""
+        board, side = Board.from_fen("7/7/c6/7/7/7/7/3L3/7 1")
+        result = ProofNumberSolver(max_nodes=100_000, max_depth=5).solve(board, side)
+        self.assertEqual(result.status, UNKNOWN)
+        self.assertTrue(result.bounded)
+
+    def test_disproves_lost_dog(self):
+        """Test a dog whose every move loses it has no forced win"""
+        board, side = Board.from_fen("7/7/7/7/7/7/1D1t3/p6/7 1")
+        result = ProofNumberSolver(max_nodes=100_000).solve(board, side)
+        self.assertEqual(result.status, DISPROVEN)
+        self.assertFalse(result.bounded)
+        self.assertEqual(result.line, [])
+
+    def test_lost_rat_is_left_open(self):
+        """Test a failure resting on repetitions is not reported as a disproof"""
+        board, side = Board.from_fen("7/7/7/7/7/7/2R4/7/e6 1")
+        result = ProofNumberSolver(max_nodes=100_000).solve(board, side)
+        self.assertEqual(result.status, UNKNOWN)
+        self.assertTrue(result.bounded)
+        self.assertEqual(result.line, [])
+
+    def test_mirror_positions_do_not_share_entries(self):
+        """Test a symmetric position is not proven from its mirror image"""
+        # Mirroring swaps the sides, so the attacker's depth-limit failures
+        # would otherwise be read as the defender's
+        board, side = Board.from_fen("7/7/7/7/1t3T1/7/7/7/7 1")
+        result = ProofNumberSolver(max_depth=9).solve(board, side)
+        self.assertEqual(result.status, UNKNOWN)
+        self.assertTrue(result.bounded)
+
+    def test_small_table_evicts(self):
+        """Test a bounded table evicts entries and still proves the win"""
+        board, side = Board.from_fen("7/7/c6/7/7/7/7/3L3/7 1")
+        result = ProofNumberSolver(max_nodes=100_000, table_size=64).solve(board, side)
+        self.assertEqual(result.status, PROVEN)
+        self.assertGreater(result.evictions, 0)
+        self.assertLessEqual(result.table_entries, 64)
+
+    def test_node_budget(self):
+        """Test the solver gives up when its node budget runs out"""
+        result = ProofNumberSolver(max_nodes=500).solve(Board(), 0)
+        self.assertEqual(result.status, UNKNOWN)
+        self.assertEqual(result.nodes, 501)
+
+
+class TestEngineProtocol(unittest.TestCase):
+    """Test the engine protocol, its built-in engine and engine players"""
+
+    def run_server(self, commands):
+        """Feed commands to the built-in engine and return its output lines"""
+        output = io.StringIO()
+        EngineServer(io.StringIO("\n".join(commands) + "\n"), output).run()
+        return output.getvalue().splitlines()
+
+    def test_move_notation(self):
+        """Test protocol moves convert to and from coordinates"""
+        self.assertEqual(move_to_text(((0, 2), (0, 3))), "a3a4")
+        self.assertEqual(text_to_move("G7G6"), ((6, 6), (6, 5)))
+        with self.assertRaises(ValueError):
+            text_to_move("h1h2")
+
+    def test_server_handshake_and_bestmove(self):
+        """Test the built-in engine identifies itself and finds a den entry"""
+        lines = self.run_server(
+            ["uci", "isready", "position fen 7/3R3/7/7/7/7/7/7/3l3 1", "go depth 2"]
+        )
+        self.assertEqual(lines[:3], ["id name JungleQuest", "uciok", "readyok"])
+        self.assertEqual(lines[-1], "bestmove d8d9")
+
+    def test_server_rejects_illegal_moves(self):
+        """Test an illegal move in a position command leaves the position alone"""
+        lines = self.run_server(["position startpos moves a3a5", "go depth 1"])
+        self.assertTrue(lines[0].startswith("info string invalid position"))
+        move = text_to_move(lines[-1].split()[1])
+        self.assertTrue(rules.is_legal_move(Board(), 0, *move))
+
+    def test_controller_engine_player(self):
+        """Test an engine subprocess plays for a player through the Controller"""
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Engine", "Player2")
+        controller.recording_enabled = False
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            controller.load_fen("7/3R3/7/7/7/7/7/7/3l3 1")
+            with EngineClient(builtin_command(depth=2)) as engine:
+                engine.handshake()
+                controller.attach_engine(0, engine, movetime=500)
+                controller.play_game()
+        self.assertIn("Engine plays D8 to D9", output.getvalue())
+        self.assertEqual(controller.result, {"winner": 0, "reason": "den"})
+
+    def test_clocks_need_side_to_move(self):
+        """Test go waits on the mover's clock, so it needs the side to move"""
+        with EngineClient(builtin_command(depth=1)) as engine:
+            engine.handshake()
+            with self.assertRaises(ValueError):
+                engine.go(clocks=(60_000, 1))
+            engine.set_position("7/3R3/7/7/7/7/7/7/3l3 1", [])
+            move = engine.go(clocks=(60_000, 1), side=0)
+        self.assertEqual(move, ((3, 7), (3, 8)))
+
+    def test_headless_match(self):
+        """Test a match between two engines swaps sides and keeps score"""
+        command = builtin_command(depth=1)
+        match = play_match(
+            [command, command],
+            2,
+            TimeControl(movetime_ms=50),
+            start_fen="7/3R3/7/7/7/7/7/7/3l3 1",
+            max_moves=10,
+        )
+        self.assertEqual(match["wins"], [1, 1])
+        self.assertEqual(
+            [game["engine_sides"] for game in match["games"]], [[0, 1], [1, 0]]
+        )
+        self.assertEqual(match["games"][0]["moves"], ["d8d9"])
+        self.assertEqual(match["games"][0]["reason"], "den")
+
+    def test_time_control_validation(self):
+        """Test a time control needs exactly one of a clock and a move time"""
+        with self.assertRaises(ValueError):
+            TimeControl()
+        with self.assertRaises(ValueError):
+            TimeControl(1000, movetime_ms=100)
+        self.assertEqual(TimeControl(60_000, 1000).describe(), "60s + 1s per move")
+
+
+class TestVariationTree(unittest.TestCase):
+    """Test the variation tree and analysis mode"""
+
+    def make_controller(self):
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Player1", "Player2")
+        controller.analysis_mode = True
+        return controller
+
+    def play(self, controller, *moves):
+        for move in moves:
+            self.assertFalse(controller.take_turn(move))
+            controller.game.switch_turn()
+
+    def test_tree_keeps_variations(self):
+        """Test moves taken back stay in the tree and replayed moves are reused"""
+        tree = VariationTree()
+        first = tree.play((0, 2), (0, 3), 0)
+        tree.play((0, 6), (0, 5), 1)
+        tree.back()
+        tree.play((6, 6), (6, 5), 1)
+        self.assertEqual(len(tree), 3)
+        self.assertEqual(len(first.children), 2)
+        self.assertEqual(len(tree.lines()), 2)
+        tree.back()
+        self.assertIs(tree.play((0, 6), (0, 5), 1), first.children[0])
+        back, forward = tree.route(tree.lines()[1])
+        self.assertEqual(back, [first.children[0]])
+        self.assertEqual(forward, [first.children[1]])
+
+    def test_tree_serialization(self):
+        """Test a tree survives to_dict/from_dict with its current node"""
+        tree = VariationTree()
+        tree.play((0, 2), (0, 3), 0)
+        tree.play((0, 6), (0, 5), 1, "Rat")
+        tree.back()
+        tree.play((6, 6), (6, 5), 1)
+        data = json.loads(json.dumps(tree.to_dict()))
+        loaded = VariationTree.from_dict(data)
+        self.assertEqual(loaded.to_dict(), tree.to_dict())
+        self.assertEqual(loaded.current.to_position, (6, 5))
+        self.assertEqual(loaded.root.children[0].children[0].captured, "Rat")
+
+    def test_take_back_without_limit(self):
+        """Test analysis mode takes back more moves than the undo limit"""
+        controller = self.make_controller()
+        start = controller.game.board.to_fen(0)
+        self.play(controller, "A3 to A4", "G7 to G6", "A4 to A5", "G6 to G5")
+        for _ in range(4):
+            self.assertTrue(controller.take_back())
+        self.assertFalse(controller.take_back())
+        self.assertEqual(controller.game.board.to_fen(0), start)
+        self.assertEqual(controller.game.current_turn, 0)
+        self.assertEqual(len(controller.move_record), 0)
+        self.assertEqual(len(controller.move_history), 0)
+
+    def test_switch_between_lines(self):
+        """Test trying an alternative line and switching back"""
+        controller = self.make_controller()
+        self.play(controller, "A3 to A4", "G7 to G6", "A4 to A5")
+        main_line = controller.game.board.to_fen(controller.game.current_turn)
+        controller.take_back()
+        controller.take_back()
+        self.play(controller, "A7 to A6")
+        side_line = controller.game.board.to_fen(controller.game.current_turn)
+
+        self.assertTrue(controller.switch_line(1))
+        self.assertEqual(
+            controller.game.board.to_fen(controller.game.current_turn), main_line
+        )
+        self.assertEqual(len(controller.move_record), 3)
+        self.assertTrue(controller.switch_line(2))
+        self.assertEqual(
+            controller.game.board.to_fen(controller.game.current_turn), side_line
+        )
+        self.assertEqual(
+            [move["to"] for move in controller.record_entries()], ["A4", "A6"]
+        )
+
+    def test_forward_replays_capture(self):
+        """Test taking back a capture restores the piece and forward replays it"""
+        controller = self.make_controller()
+        controller.load_fen("3l3/7/7/7/7/7/7/r6/R6 1")
+        self.play(controller, "A1 to A2")
+        controller.take_back()
+        self.assertEqual(controller.game.board.count_pieces(1), 2)
+        self.assertTrue(controller.replay_forward())
+        self.assertEqual(controller.game.board.count_pieces(1), 1)
+        self.assertEqual(controller.record_entries()[0]["captured"], "Rat")
+        self.assertFalse(controller.replay_forward())
+
+    def test_branches_survive_save_and_load(self):
+        """Test every line and the current position survive save/load"""
+        controller = self.make_controller()
+        self.play(controller, "A3 to A4", "G7 to G6")
+        controller.take_back()
+        self.play(controller, "A7 to A6")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "analysis.jungle")
+            controller._save_game(path)
+            loaded = Controller(hint_budget=0)
+            loaded._load_game(path)
+        self.assertTrue(loaded.analysis_mode)
+        self.assertEqual(len(loaded.variations.lines()), 2)
+        self.assertEqual(loaded.game.board.to_fen(1), controller.game.board.to_fen(1))
+        self.assertTrue(loaded.switch_line(1))
+        self.assertIsNotNone(loaded.game.board.get_piece((6, 5)))
+
+    def test_undo_keeps_undone_move_as_variation(self):
+        """Test a normal undo leaves the undone move in the tree"""
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Player1", "Player2")
+        self.play(controller, "A3 to A4")
+        controller.undo_move()
+        self.assertTrue(controller.variations.current.is_root)
+        self.assertEqual(len(controller.variations), 1)
+
+    def test_take_back_reopens_finished_game(self):
+        """Test taking back the winning move clears the result"""
+        controller = self.make_controller()
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.load_fen("7/3R3/7/7/7/7/7/7/3l3 1")
+            self.assertTrue(controller.take_turn("D8 to D9"))
+        self.assertEqual(controller.result, {"winner": 0, "reason": "den"})
+        controller.take_back()
+        self.assertIsNone(controller.result)
+
+    def test_lines_mark_current_position(self):
+        """Test lines marks only the lines through the current position"""
+        controller = self.make_controller()
+        self.play(controller, "A3 to A4", "G7 to G6")
+        controller.take_back()
+        self.play(controller, "A7 to A6")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            controller.show_lines()
+            controller.switch_line(1)
+            controller.take_back()
+            controller.take_back()
+            controller.show_lines()
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [
+                "  1) A3 to A4, G7 to G6",
+                "* 2) A3 to A4, A7 to A6",
+                "  1) A3 to A4, G7 to G6",
+                "  2) A3 to A4, A7 to A6",
+            ],
+        )
+
+
+class TestDenDistance(unittest.TestCase):
+    """Test the precomputed distance-to-den tables"""
+
+    def test_walker_distances(self):
+        """Test land pieces walk around water and never enter their own den"""
+        table = den_distance.distance_table("Cat", 0)
+        self.assertEqual(table[3 + 8 * 7], 0)  # D9, the opponent's den
+        self.assertEqual(table[2 + 8 * 7], 1)  # C9
+        self.assertEqual(table[2 + 2 * 7], 7)  # C3
+        self.assertEqual(table[3], den_distance.UNREACHABLE)  # D1, own den
+        self.assertEqual(table[1 + 3 * 7], den_distance.UNREACHABLE)  # B4, water
+
+    def test_rat_swims_and_jumpers_jump(self):
+        """Test rats cross the river and lions/tigers jump it"""
+        rat = den_distance.distance_table("Rat", 0)
+        lion = den_distance.distance_table("Lion", 0)
+        self.assertEqual(rat[1 + 3 * 7], 7)  # B4, in the water
+        self.assertEqual(lion[2 + 2 * 7], 4)  # C3 jumps to C7
+        self.assertIs(den_distance.distance_table("Tiger", 0), lion)
+
+    def test_rat_in_river_blocks_jump(self):
+        """Test occupied water squares use the blocking variant"""
+        board = Board.empty()
+        lion = Piece("Lion", Piece.PLAYER_1)
+        board.place_piece(lion, (2, 2))
+        self.assertEqual(den_distance.den_distance(board, lion, (2, 2)), 4)
+        board.place_piece(Piece("Rat", Piece.PLAYER_2), (2, 4))
+        self.assertEqual(den_distance.den_distance(board, lion, (2, 2)), 6)
+
+    def test_players_are_symmetric(self):
+        """Test player 2 tables are player 1 tables rotated 180 degrees"""
+        for name in ("Cat", "Rat", "Lion"):
+            player_1 = den_distance.distance_table(name, 0)
+            player_2 = den_distance.distance_table(name, 1)
+            self.assertEqual(bytes(reversed(player_2)), player_1)
+
+    def test_den_threat_warning(self):
+        """Test the view warns about opponent pieces near the player's den"""
+        board, _ = Board.from_fen("3l3/7/7/7/7/7/7/3r3/7 1")
+        threats = den_distance.den_threats(board, 0)
+        self.assertEqual([(p.name, d) for p, _, d in threats], [("Rat", 1)])
+        self.assertEqual(den_distance.den_threats(board, 1), [])
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            View().display_den_threats(board, 0)
+        self.assertIn("Rat on D2 is 1 move from your den", output.getvalue())
+
+
+class EventLog(BoardListener):
+    """Board listener keeping every event it receives"""
+
+    def __init__(self):
+        self.events = []
+
+    def piece_placed(self, piece, square):
+        self.events.append(("placed", piece.name, square))
+
+    def piece_removed(self, piece, square):
+        self.events.append(("removed", piece.name, square))
+
+    def piece_moved(self, piece, from_square, to_square, captured):
+        self.events.append(
+            ("moved", piece.name, from_square, to_square, captured and captured.name)
+        )
+
+    def piece_captured(self, piece, square, capturer):
+        self.events.append(("captured", piece.name, square, capturer.name))
+
+    def board_cleared(self):
+        self.events.append(("cleared",))
+
+
+class TestBoardEvents(unittest.TestCase):
+    """Test board events and the listeners built on them"""
+
+    def test_move_and_capture_events(self):
+        """Test a capture sends removals, a placement, then capture and move"""
+        board, _ = Board.from_fen("7/7/7/7/7/7/7/Rc5/7 1")
+        log = EventLog()
+        board.subscribe(log)
+        board.subscribe(log)
+        board.move_piece((0, 1), (1, 1))
+        self.assertEqual(
+            log.events,
+            [
+                ("removed", "Cat", 8),
+                ("removed", "Rat", 7),
+                ("placed", "Rat", 8),
+                ("captured", "Cat", 8, "Rat"),
+                ("moved", "Rat", 7, 8, "Cat"),
+            ],
+        )
+        board.unsubscribe(log)
+        board.clear()
+        self.assertEqual(len(log.events), 5)
+
+    def test_clear_and_clone(self):
+        """Test clearing sends one event and copies start without listeners"""
+        board = Board()
+        log = EventLog()
+        board.subscribe(log)
+        board.clone().move_piece((0, 2), (0, 3))
+        self.assertEqual(log.events, [])
+        board.reset()
+        self.assertEqual(log.events[0], ("cleared",))
+        self.assertEqual(len(log.events), 17)
+
+    def test_renderer_follows_board(self):
+        """Test the cached rendering matches the board after changes"""
+        board = Board()
+        view = View()
+        renderer = BoardRenderer(board, view._format_square)
+        board.move_piece((0, 2), (0, 3))
+        self.assertEqual(renderer.cells[14], view._format_square(None, TERRAIN[0][2]))
+        self.assertEqual(renderer.cells[21].strip(), "rat1")
+        self.assertTrue(renderer.row(3).startswith(" rat1 |"))
+        board.clear()
+        self.assertNotIn("rat1", renderer.row(3))
+        renderer.close()
+        self.assertNotIn(renderer, board.listeners)
+
+    def test_recorder_follows_game_board(self):
+        """Test moves are recorded from board events, except take backs"""
+        controller = Controller(hint_budget=0)
+        controller.game = Game("Player1", "Player2")
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.take_turn("A3 to A4")
+            controller.game.switch_turn()
+            controller.toggle_analysis_mode()
+            controller.take_turn("G7 to G6")
+            controller.game.switch_turn()
+            controller.take_back()
+        self.assertEqual(len(controller.move_record), 1)
+        entry = controller.record_entries()[0]
+        self.assertEqual(entry["move_string"], "A3 to A4")
+        self.assertEqual(entry["player_index"], 0)
+
+        old_board = controller.game.board
+        controller.game = Game("Player1", "Player2")
+        self.assertNotIn(controller.recorder, old_board.listeners)
+        self.assertIn(controller.recorder, controller.game.board.listeners)
+
+
+class TestSymmetry(unittest.TestCase):
+    """Test canonical keys shared by a position and its rotated image"""
+
+    def test_start_position_is_symmetric(self):
+        """Test the start has the same canonical key with either side to move"""
+        board = Board()
+        self.assertEqual(board.canonical_key(0), board.canonical_key(1))
+        self.assertNotEqual(board.position_key(0), board.position_key(1))
+        self.assertEqual(symmetry.canonical_fen(board, 1), STARTING_FEN)
+
+    def test_canonical_key_matches_rotated_board(self):
+        """Test the incremental canonical key is the rotated board's key"""
+        board = Board()
+        rng = random.Random(7)
+        side = 0
+        for _ in range(30):
+            moves = [
+                (start, target)
+                for start, targets in rules.legal_moves(board, side).items()
+                for target in targets
+            ]
+            board.move_piece(*rng.choice(moves))
+            side = 1 - side
+            canonical = symmetry.canonical_board(board, side)
+            self.assertEqual(canonical.position_key(0), board.canonical_key(side))
+            self.assertEqual(
+                board.clone().canonical_key(side), board.canonical_key(side)
+            )
+
+    def test_move_transform_round_trip(self):
+        """Test legal moves map onto the canonical position's legal moves"""
+        board, side = Board.from_fen("7/3R3/7/7/7/7/7/7/3l3 2")
+        canonical = symmetry.canonical_board(board, side)
+        for start, targets in rules.legal_moves(board, side).items():
+            for target in targets:
+                move = symmetry.canonical_move((start, target), side)
+                self.assertTrue(rules.is_legal_move(canonical, 0, *move))
+                self.assertEqual(symmetry.restore_move(move, side), (start, target))
+        self.assertEqual(symmetry.rotate_move(((0, 0), (0, 1))), ((6, 8), (6, 7)))
+        self.assertEqual(symmetry.restore_move(((0, 0), (0, 1)), 0), ((0, 0), (0, 1)))
+
+
+def _flip_side_in_batch(args):
+    """Pool worker: attach to a batch and hand one position to the opponent."""
+    descriptor, index = args
+    with PositionBatch.attach(*descriptor) as batch:
+        board, side = batch.read(index)
+        batch.write(index, board, 1 - side)
+        return board.to_fen(side)
+
+
+class TestPositionBatch(unittest.TestCase):
+    """Test fixed-width positions shared between processes"""
+
+    def test_pack_round_trip(self):
+        """Test a packed position unpacks to the same board and side"""
+        board, side = Board.from_fen("7/3R3/7/7/7/7/7/7/3l3 2")
+        packed = pack_board(board, side)
+        self.assertEqual(len(packed), 64)
+        restored, restored_side = unpack_board(packed)
+        self.assertEqual(restored.to_fen(restored_side), board.to_fen(side))
+        self.assertEqual(restored.zobrist_key, board.zobrist_key)
+
+    def test_invalid_code_rejected(self):
+        """Test bytes outside the piece codes are reported"""
+        packed = bytearray(pack_board(Board(), 0))
+        packed[10] = 200
+        with self.assertRaises(ValueError):
+            unpack_board(packed)
+
+    def test_invalid_side_and_duplicates_rejected(self):
+        """Test a bad side to move and a repeated piece are reported"""
+        packed = bytearray(pack_board(Board(), 0))
+        packed[-1] = 2
+        with self.assertRaises(ValueError):
+            unpack_board(packed)
+        packed = bytearray(pack_board(Board(), 0))
+        packed[30] = packed[0]  # A second Lion of the same player
+        with self.assertRaises(ValueError):
+            unpack_board(packed)
+
+    def test_workers_share_positions(self):
+        """Test worker processes read and write the parent's batch in place"""
+        with PositionBatch.create(2) as batch:
+            batch.write(0, Board(), 0)
+            batch.write(1, Board.from_fen("7/3R3/7/7/7/7/7/7/3l3 1")[0], 1)
+            jobs = [(batch.descriptor, index) for index in range(2)]
+            with multiprocessing.Pool(2) as pool:
+                fens = pool.map(_flip_side_in_batch, jobs)
+            self.assertEqual(fens[0], STARTING_FEN)
+            self.assertEqual(batch.read(0)[1], 1)
+            self.assertEqual(batch.read(1)[0].to_fen(0), fens[1][:-1] + "1")
+            with self.assertRaises(IndexError):
+                batch.read(2)
+        # The creator frees the block on leaving the with block
+        with self.assertRaises(FileNotFoundError):
+            PositionBatch.attach(*batch.descriptor)
+
+
+class TestAttackMap(unittest.TestCase):
+    """Test the incrementally maintained attack and threat maps"""
+
+    def assert_matches_rebuilt(self, board):
+        rebuilt = AttackMap(board)
+        self.assertEqual(board.attack_map.reach, rebuilt.reach)
+        self.assertEqual(board.attack_map.attackers, rebuilt.attackers)
+
+    def test_incremental_matches_rebuilt(self):
+        """Test the map stays equal to a fresh one over random play and undo"""
+        rng = random.Random(7)
+        board = Board()
+        board.track_attacks()
+        side = 0
+        for ply in range(300):
+            moves = rules.legal_moves(board, side)
+            if not moves or not board.count_pieces(1 - side):
+                break
+            from_position = rng.choice(sorted(moves))
+            board.move_piece(from_position, rng.choice(moves[from_position]))
+            self.assert_matches_rebuilt(board)
+            side = 1 - side
+            if ply % 50 == 49:
+                board.load_snapshot(Board().snapshot())
+                self.assert_matches_rebuilt(board)
+
+    def test_threatened_pieces(self):
+        """Test en prise pieces follow the capture rules"""
+        board, _ = Board.from_fen("3l3/7/Cd5/7/7/7/7/7/7 1")
+        attacks = board.track_attacks()
+        cat, dog = board.get_piece((0, 6)), board.get_piece((1, 6))
+        self.assertEqual(attacks.threatened_pieces(0), [(cat, (0, 6))])
+        self.assertEqual(attacks.threatened_pieces(1), [])
+        self.assertEqual(attacks.capturers_of(cat), [dog])
+        self.assertTrue(attacks.is_attacked((0, 6), 1))
+        self.assertIn((1, 7), attacks.attacked_squares(1))
+        self.assertNotIn((1, 5), attacks.attacked_squares(1))  # Water
+
+    def test_rat_in_river_blocks_jump_attacks(self):
+        """Test a rat entering the water removes the jump it blocks"""
+        board, _ = Board.from_fen("3l3/7/7/7/7/7/R1L4/7/7 1")
+        attacks = board.track_attacks()
+        lion = board.get_piece((2, 2))
+        self.assertIn(2 + 6 * 7, attacks.reach[lion])  # Jump to C7
+        board.move_piece((0, 2), (0, 3))
+        board.move_piece((0, 3), (1, 3))
+        self.assertNotIn(lion, attacks.attackers[1 + 3 * 7])
+        board.move_piece((1, 3), (2, 3))
+        self.assertNotIn(lion, attacks.attackers[2 + 6 * 7])
+        self.assert_matches_rebuilt(board)
+
+    def test_copies_do_not_track_attacks(self):
+        """Test boards only pay for attack tracking when asked to"""
+        board = Board()
+        self.assertIsNone(board.attack_map)
+        board.track_attacks()
+        self.assertIsNone(board.clone().attack_map)
+
+    def test_threat_overlay(self):
+        """Test the view marks threatened pieces"""
+        board, _ = Board.from_fen("3l3/7/Cd5/7/7/7/7/7/7 1")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            View().display_board(board, {(0, 6)})
+        self.assertIn("cat1!", output.getvalue())
+        self.assertNotIn("dog2!", output.getvalue())
+
+
+class TestDifferentialRules(unittest.TestCase):
+    """Test the random-playout differential rules tester"""
+
+    def test_implementations_agree(self):
+        """Test every check passes in random games on worker processes"""
+        report = differential.run_differential(
+            games=4, workers=2, seed=11, max_plies=40, checks=list(differential.CHECKS)
+        )
+        self.assertEqual(report["games"], 4)
+        self.assertGreater(report["positions"], 4)
+        self.assertEqual(report["failures"], [])
+        self.assertIn("Every implementation agrees", differential.format_report(report))
+
+    def test_expensive_checks_are_opt_in_and_sampled(self):
+        """Test expensive checks only run when named, on sampled plies"""
+        self.assertEqual(
+            differential.default_checks(), ["kernel", "search", "incremental"]
+        )
+        sampled = []
+
+        @differential.check("count_plies", expensive=True)
+        def count_plies(board, side):
+            sampled.append(side)
+            return None
+
+        self.addCleanup(differential.EXPENSIVE_CHECKS.pop, "count_plies")
+        self.addCleanup(differential.CHECKS.pop, "count_plies")
+        self.assertNotIn("count_plies", differential.default_checks())
+        plies, _ = differential.play_random_game(
+            5, max_plies=40, checks=["count_plies"]
+        )
+        interval = differential.EXPENSIVE_CHECK_INTERVAL
+        self.assertEqual(len(sampled), -(-plies // interval))
+
+    def test_reference_rules(self):
+        """Test the reference allows river jumps and forbids blocked ones"""
+        board, _ = Board.from_fen("7/7/7/7/7/7/2L4/7/3l3 1")
+        self.assertIn(((2, 2), (2, 6)), differential.reference_legal_moves(board, 0))
+        board.place_piece(Piece("Rat", 1), (2, 4))
+        moves = differential.reference_legal_moves(board, 0)
+        self.assertNotIn(((2, 2), (2, 6)), moves)
+        self.assertIsNone(differential.run_checks(board, 0))
+        self.assertIsNone(differential.run_checks(board, 1))
+
+    def test_disagreement_is_shrunk(self):
+        """Test a failing position is reduced to the pieces that matter"""
+
+        @differential.check("player1_elephant")
+        def fails_with_elephant(board, side):
+            if any(
+                piece.name == "Elephant"
+                for piece in board.piece_locations[Piece.PLAYER_1]
+            ):
+                return "Player 1 has an Elephant"
+            return None
+
+        self.addCleanup(differential.CHECKS.pop, "player1_elephant")
+        _, failure = differential.play_random_game(3, checks=["player1_elephant"])
+        self.assertEqual(failure.check, "player1_elephant")
+        self.assertEqual(failure.fen, STARTING_FEN)
+        shrunk = differential.shrink(failure)
+        board, _ = Board.from_fen(shrunk.fen)
+        self.assertEqual(board.piece_counts, [1, 0])
+        self.assertEqual(shrunk.moves, ())
+
+
 if __name__ == "__main__":
     unittest.main()
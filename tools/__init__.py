@@ -0,0 +1,5 @@
+"""Tools package for JungleQuest game."""
+
+from .dataset_export import export_dataset
+
+__all__ = ["export_dataset"]
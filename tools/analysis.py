@@ -0,0 +1,266 @@
+"""
+Analysis Module
+
+Post-game analysis of .record files. Every position of every game is
+scored by a fixed-depth search, and each move is annotated with the
+evaluation before it, the engine's preferred move, the evaluation lost
+by playing it (the swing) and a mistake or blunder tag.
+
+Positions are deduplicated by canonical position key across all games
+and plies, so openings shared by a tournament's games, and positions
+mirroring each other (see the symmetry module), are searched once. The unique
+positions are scored in worker processes one chunk at a time and the
+scores are then reassembled in game and move order.
+"""
+
+import json
+import os
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+from engine.search import Search
+from model import rules
+from model.board import Board
+from model.symmetry import canonical_fen, restore_move
+
+from .dataset_export import find_record_files, replay_record
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+DEFAULT_DEPTH = 3
+
+# Scores are clamped to this range so a won or lost position counts as a
+# large but finite swing
+DECISIVE_SCORE = 10_000
+
+# Evaluation lost by a move, in piece-value units: a blunder gives away at
+# least a Cat's worth (200), a mistake a ten-move walk towards the den
+MISTAKE_SWING = 80
+BLUNDER_SWING = 200
+
+MISTAKE = "mistake"
+BLUNDER = "blunder"
+
+
+def _notation(position: Position) -> str:
+    col, row = position
+    return f"{chr(ord('A') + col)}{row + 1}"
+
+
+def _clamp(score: int) -> int:
+    return max(-DECISIVE_SCORE, min(DECISIVE_SCORE, score))
+
+
+def classify_swing(swing: int) -> Optional[str]:
+    """
+    Tag a move by the evaluation it gave away.
+
+    Args:
+        swing: Evaluation lost by the move, from the mover's point of view
+
+    Returns:
+        BLUNDER, MISTAKE or None
+    """
+    if swing >= BLUNDER_SWING:
+        return BLUNDER
+    if swing >= MISTAKE_SWING:
+        return MISTAKE
+    return None
+
+
+def score_position(fen: str, depth: int) -> Tuple[int, Optional[Move]]:
+    """
+    Score a position with a fixed-depth search.
+
+    Args:
+        fen: The position in FEN notation
+        depth: Search depth, in plies
+
+    Returns:
+        Tuple of (clamped score for the side to move, best move or None
+        if the side to move cannot move)
+    """
+    board, side = Board.from_fen(fen)
+    result = Search(board, side).best_move(max_depth=depth)
+    if result is None or result.move is None:
+        return -DECISIVE_SCORE, None
+    return _clamp(result.score), result.move
+
+
+def _score_chunk(args: Tuple[List[Tuple[int, str]], int]):
+    """Worker entry point: score every position of one chunk."""
+    positions, depth = args
+    return [(key, *score_position(fen, depth)) for key, fen in positions]
+
+
+def _replay_game(record_data: Dict, positions: Dict[int, str]) -> List:
+    """
+    Replay a game, collecting the canonical key of every position reached.
+
+    Positions not seen before are added to positions, in canonical form.
+    The last entry is None when the final move won the game (nothing left
+    to score).
+
+    Returns:
+        One position key per move, plus the key after the last move
+    """
+    keys = []
+    board = side = last_to = None
+    for board, side, from_position, to_position in replay_record(
+        record_data["moves"], record_data.get("start_fen")
+    ):
+        key = board.canonical_key(side)
+        if key not in positions:
+            positions[key] = canonical_fen(board, side)
+        keys.append(key)
+        last_to = to_position
+    if board is None:
+        return keys
+
+    # replay_record applies the last move after its final yield
+    if last_to == rules.opponent_den(side) or not board.piece_counts[1 - side]:
+        keys.append(None)
+    else:
+        key = board.canonical_key(1 - side)
+        if key not in positions:
+            positions[key] = canonical_fen(board, 1 - side)
+        keys.append(key)
+    return keys
+
+
+def annotate_moves(
+    moves: List[Dict], keys: List, scores: Dict[int, Tuple[int, Optional[Move]]]
+) -> None:
+    """
+    Add an "analysis" entry to every move of a game.
+
+    Args:
+        moves: The "moves" list of a .record file (updated in place)
+        keys: Position keys from _replay_game
+        scores: (score, best move in the canonical position) by position key
+    """
+    for index, move_data in enumerate(moves):
+        before, best = scores[keys[index]]
+        best = restore_move(best, move_data["player_index"])
+        if best is not None:
+            best = f"{_notation(best[0])} to {_notation(best[1])}"
+        after_key = keys[index + 1]
+        # The next position is scored for the opponent
+        after = DECISIVE_SCORE if after_key is None else -scores[after_key][0]
+        swing = max(0, before - after)
+        played = f"{move_data['from']} to {move_data['to']}".upper()
+        move_data["analysis"] = {
+            "eval": before,
+            "best": best,
+            "swing": swing,
+            "tag": classify_swing(swing) if played != best else None,
+        }
+
+
+def analyze_records(
+    source: str,
+    depth: int = DEFAULT_DEPTH,
+    workers: Optional[int] = None,
+    chunk_size: int = 256,
+    output_dir: Optional[str] = None,
+) -> Dict:
+    """
+    Analyze every move of one or more .record files.
+
+    Args:
+        source: A .record file or a directory of them
+        depth: Search depth per position, in plies
+        workers: Worker process count (None uses every CPU, 1 runs inline)
+        chunk_size: Number of positions handed to a worker at a time
+        output_dir: If given, write each annotated record there under its
+            original file name
+
+    Returns:
+        Summary with "games" (path, moves with their "analysis" entries),
+        "positions", "unique_positions" and "errors"
+    """
+    if depth <= 0:
+        raise ValueError("Analysis depth must be positive.")
+    positions: Dict[int, str] = {}
+    games = []
+    errors: List[str] = []
+    for path in find_record_files(source):
+        try:
+            with open(path, "r") as f:
+                record_data = json.load(f)
+            keys = _replay_game(record_data, positions)
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+            continue
+        games.append((path, record_data, keys))
+
+    items = list(positions.items())
+    chunks = [
+        (items[i : i + chunk_size], depth) for i in range(0, len(items), chunk_size)
+    ]
+    scores: Dict[int, Tuple[int, Optional[Move]]] = {}
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in map(_score_chunk, chunks):
+            scores.update((key, (score, best)) for key, score, best in chunk)
+    else:
+        with Pool(workers) as pool:
+            for chunk in pool.imap_unordered(_score_chunk, chunks):
+                scores.update((key, (score, best)) for key, score, best in chunk)
+
+    summary_games = []
+    total = 0
+    for path, record_data, keys in games:
+        annotate_moves(record_data["moves"], keys, scores)
+        total += sum(key is not None for key in keys)
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, os.path.basename(path)), "w") as f:
+                json.dump(record_data, f, indent=2)
+        summary_games.append({"path": path, "moves": record_data["moves"]})
+
+    return {
+        "games": summary_games,
+        "positions": total,
+        "unique_positions": len(positions),
+        "errors": errors,
+    }
+
+
+def format_report(summary: Dict) -> str:
+    """
+    Format an analysis summary as text.
+
+    Args:
+        summary: Result of analyze_records()
+
+    Returns:
+        Per-game mistake and blunder counts and the tagged moves
+    """
+    lines = []
+    for game in summary["games"]:
+        counts = [{MISTAKE: 0, BLUNDER: 0} for _ in range(2)]
+        tagged = []
+        for move_data in game["moves"]:
+            analysis = move_data["analysis"]
+            if analysis["tag"] is None:
+                continue
+            counts[move_data["player_index"]][analysis["tag"]] += 1
+            tagged.append(
+                f"  {move_data['move_number']:>3}. Player "
+                f"{move_data['player_index'] + 1} {move_data['from']} to "
+                f"{move_data['to']}: {analysis['tag']} (-{analysis['swing']}), "
+                f"best {analysis['best']}"
+            )
+        lines.append(f"{game['path']} ({len(game['moves'])} moves)")
+        for player, player_counts in enumerate(counts):
+            lines.append(
+                f"  Player {player + 1}: {player_counts[BLUNDER]} blunder(s), "
+                f"{player_counts[MISTAKE]} mistake(s)"
+            )
+        lines.extend(tagged)
+    lines.append(
+        f"{summary['positions']} positions, {summary['unique_positions']} "
+        f"searched after removing duplicates"
+    )
+    return "\n".join(lines)
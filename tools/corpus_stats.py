@@ -0,0 +1,368 @@
+"""
+Corpus Statistics Module
+
+Aggregate statistics over a corpus of .record files: results by side and
+by how games ended, the distribution of game lengths, captures by
+(attacker, victim) pair and how often each square is occupied by each
+side.
+
+Every statistic is a fixed-size NumPy counter, so a CorpusStats takes
+the same memory for ten games or ten million. Worker processes each fill
+one for a chunk of files and the parent merges them in as they arrive.
+"""
+
+import json
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for corpus statistics
+    np = None
+
+from model.board import Board
+from model.draw_rules import NO_CAPTURE, REPETITION
+from model.move import apply_move, from_square, to_square
+from model.piece import Piece
+from model.terrain import MAX_COLUMNS, MAX_ROWS, NUM_SQUARES, SQUARE_POSITIONS
+
+from controller.move_recorder import record_moves
+from controller.record_archive import ARCHIVE_EXTENSION, RecordArchive
+
+from .dataset_export import find_record_files, game_winner
+
+# How a game ended; "unfinished" records stop without a result
+DEN = "den"
+CAPTURE_ALL = "capture_all"
+UNFINISHED = "unfinished"
+REASONS = (DEN, CAPTURE_ALL, REPETITION, NO_CAPTURE, UNFINISHED)
+
+# Rows of the outcome table: the winner, or NO_WINNER
+NO_WINNER = 2
+
+# Game lengths of MAX_LENGTH plies or more share the last bin
+MAX_LENGTH = 1000
+
+PIECE_NAMES: List[str] = sorted(Piece.RANKS, key=Piece.RANKS.get)
+
+STATS_VERSION = "1.0"
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Corpus statistics require NumPy (pip install numpy).")
+
+
+class CorpusStats:
+    """
+    Statistics of a set of games, in fixed-size counters.
+
+    Attributes:
+        games: Number of games counted
+        outcomes: Games by (winner or NO_WINNER, index in REASONS)
+        lengths: Games by length in plies (the last bin holds longer ones)
+        captures: Captures by (attacker rank - 1, victim rank - 1)
+        occupancy: Positions with a piece of each side on each square,
+            shaped (2, rows, columns)
+        positions: Positions counted in occupancy
+        errors: Files that could not be read, with the reason
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        _require_numpy()
+        self.games = 0
+        self.outcomes = np.zeros((3, len(REASONS)), dtype=np.int64)
+        self.lengths = np.zeros(MAX_LENGTH + 1, dtype=np.int64)
+        self.captures = np.zeros((len(PIECE_NAMES), len(PIECE_NAMES)), dtype=np.int64)
+        self.occupancy = np.zeros((2, MAX_ROWS, MAX_COLUMNS), dtype=np.int64)
+        self.positions = 0
+        self.errors: List[str] = []
+
+    def add_game(self, record_data: Dict) -> None:
+        """
+        Count one game.
+
+        Args:
+            record_data: Contents of a .record file
+
+        Raises:
+            ValueError: If a move starts on an empty tile
+        """
+        start_fen = record_data.get("start_fen")
+        board = Board.from_fen(start_fen)[0] if start_fen else Board()
+        moves = record_moves(record_data["moves"])
+
+        # Owner of each square (0 empty, 1 or 2 for a player), one row per
+        # position, appended as the game is replayed
+        state = bytearray(NUM_SQUARES)
+        for square, piece in enumerate(board.squares):
+            if piece is not None:
+                state[square] = piece.owner + 1
+        history = bytearray(state)
+        attackers, victims = [], []
+        mover = to = None
+        for number, move in enumerate(moves, start=1):
+            piece = board.squares[from_square(move)]
+            if piece is None:
+                raise ValueError(f"Move {number} starts on an empty tile")
+            captured = apply_move(board, move)
+            if captured is not None:
+                attackers.append(piece.rank - 1)
+                victims.append(captured.rank - 1)
+            mover, to = piece.owner, to_square(move)
+            state[from_square(move)] = 0
+            state[to] = mover + 1
+            history += state
+
+        owners = np.frombuffer(history, dtype=np.uint8).reshape(
+            -1, MAX_ROWS, MAX_COLUMNS
+        )
+        self.occupancy[0] += (owners == 1).sum(axis=0)
+        self.occupancy[1] += (owners == 2).sum(axis=0)
+        self.positions += len(owners)
+        if attackers:
+            np.add.at(self.captures, (attackers, victims), 1)
+        self.lengths[min(len(moves), MAX_LENGTH)] += 1
+        winner, reason = game_outcome(record_data, board, mover, to)
+        self.outcomes[
+            NO_WINNER if winner is None else winner, REASONS.index(reason)
+        ] += 1
+        self.games += 1
+
+    def merge(self, other: "CorpusStats") -> None:
+        """Add the counts of another CorpusStats to these."""
+        self.games += other.games
+        self.outcomes += other.outcomes
+        self.lengths += other.lengths
+        self.captures += other.captures
+        self.occupancy += other.occupancy
+        self.positions += other.positions
+        self.errors.extend(other.errors)
+
+    def length_percentile(self, percent: float) -> int:
+        """
+        Nearest-rank percentile of game lengths, from the histogram.
+
+        Args:
+            percent: Percentile from 0 to 100
+
+        Returns:
+            Length in plies (0 without games)
+        """
+        if not self.games:
+            return 0
+        rank = max(1, -(-self.games * percent // 100))
+        return int(np.searchsorted(np.cumsum(self.lengths), rank))
+
+    def to_dict(self) -> Dict:
+        """Describe the statistics as JSON-compatible data."""
+        plies = np.arange(MAX_LENGTH + 1)
+        wins = self.outcomes[:2].sum(axis=1)
+        return {
+            "version": STATS_VERSION,
+            "games": self.games,
+            "results": {
+                "player1_wins": int(wins[0]),
+                "player2_wins": int(wins[1]),
+                "no_winner": int(self.outcomes[NO_WINNER].sum()),
+                "player1_win_rate": _rate(wins[0], self.games),
+                "player2_win_rate": _rate(wins[1], self.games),
+            },
+            "outcomes": {
+                row: dict(zip(REASONS, map(int, self.outcomes[index])))
+                for index, row in enumerate(("player1", "player2", "no_winner"))
+            },
+            "lengths": {
+                "mean": _rate((plies * self.lengths).sum(), self.games),
+                "min": int(plies[self.lengths > 0].min()) if self.games else 0,
+                "p10": self.length_percentile(10),
+                "median": self.length_percentile(50),
+                "p90": self.length_percentile(90),
+                "max": int(plies[self.lengths > 0].max()) if self.games else 0,
+                "histogram": {
+                    str(length): int(count)
+                    for length, count in enumerate(self.lengths)
+                    if count
+                },
+            },
+            "captures": [
+                {
+                    "attacker": PIECE_NAMES[attacker],
+                    "victim": PIECE_NAMES[victim],
+                    "count": int(self.captures[attacker, victim]),
+                }
+                for attacker, victim in zip(*np.nonzero(self.captures))
+            ],
+            "positions": self.positions,
+            "occupancy": {
+                f"player{side + 1}": self.occupancy[side].tolist() for side in (0, 1)
+            },
+            "errors": self.errors,
+        }
+
+
+def _rate(count, total: int) -> float:
+    return float(count) / total if total else 0.0
+
+
+def game_outcome(
+    record_data: Dict,
+    board: Board,
+    last_mover: Optional[int],
+    last_to: Optional[int],
+) -> Tuple[Optional[int], str]:
+    """
+    Tell who won a recorded game and how.
+
+    Records saved with a "result" are trusted; older ones are judged from
+    the final position.
+
+    Args:
+        record_data: Contents of the .record file
+        board: Board after the last move
+        last_mover: Player who made the last move (None without moves)
+        last_to: Target square of the last move
+
+    Returns:
+        Tuple of (winner or None, one of REASONS)
+    """
+    result = record_data.get("result")
+    if result is not None:
+        reason = result.get("reason")
+        return result.get("winner"), reason if reason in REASONS else UNFINISHED
+    if last_mover is None:
+        return None, UNFINISHED
+    winner = game_winner(board, last_mover, SQUARE_POSITIONS[last_to])
+    if winner is None:
+        return None, UNFINISHED
+    # Entering the den captures nothing, so the loser kept pieces
+    return winner, DEN if board.count_pieces(1 - winner) else CAPTURE_ALL
+
+
+def _count_chunk(paths: Sequence[str]) -> CorpusStats:
+    """Worker entry point: count every record file of one chunk."""
+    stats = CorpusStats()
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                stats.add_game(json.load(f))
+        except Exception as e:
+            stats.errors.append(f"{path}: {e}")
+    return stats
+
+
+def _count_archive_chunk(args: Tuple[str, int, int]) -> CorpusStats:
+    """Worker entry point: count a range of games of an archive."""
+    path, start, end = args
+    stats = CorpusStats()
+    with RecordArchive(path) as archive:
+        for number in range(start, end):
+            try:
+                stats.add_game(archive[number])
+            except Exception as e:
+                stats.errors.append(f"{path} game {number}: {e}")
+    return stats
+
+
+def corpus_stats(
+    source: str, workers: Optional[int] = None, chunk_size: int = 256
+) -> CorpusStats:
+    """
+    Count the statistics of every game of .record files or an archive.
+
+    Args:
+        source: A .record file, a directory of them or a game archive
+            (see the record_archive module)
+        workers: Worker process count (None uses every CPU, 1 runs inline)
+        chunk_size: Number of games handed to a worker at a time
+
+    Returns:
+        The merged statistics
+
+    Raises:
+        ValueError: If the chunk size is not positive or an archive is
+            unreadable
+    """
+    _require_numpy()
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive.")
+    if source.endswith(ARCHIVE_EXTENSION):
+        with RecordArchive(source) as archive:
+            games = len(archive)
+        count = _count_archive_chunk
+        chunks = [
+            (source, i, min(i + chunk_size, games)) for i in range(0, games, chunk_size)
+        ]
+    else:
+        paths = find_record_files(source)
+        count = _count_chunk
+        chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    total = CorpusStats()
+    if workers == 1 or len(chunks) <= 1:
+        for stats in map(count, chunks):
+            total.merge(stats)
+    else:
+        with Pool(workers) as pool:
+            for stats in pool.imap_unordered(count, chunks):
+                total.merge(stats)
+    return total
+
+
+def format_report(summary: Dict, top_captures: int = 10) -> str:
+    """
+    Format corpus statistics as text.
+
+    Args:
+        summary: Result of CorpusStats.to_dict()
+        top_captures: Number of (attacker, victim) pairs listed
+
+    Returns:
+        Results, lengths, the most frequent captures and occupancy maps
+    """
+    games = summary["games"]
+    results = summary["results"]
+    outcomes = summary["outcomes"]
+    lengths = summary["lengths"]
+    lines = [f"{games} games"]
+    for side in (1, 2):
+        won = outcomes[f"player{side}"]
+        lines.append(
+            f"  Player {side} wins: {results[f'player{side}_wins']} "
+            f"({results[f'player{side}_win_rate']:.1%}); "
+            f"{won[DEN]} by den entry, {won[CAPTURE_ALL]} by capturing all"
+        )
+    undecided = outcomes["no_winner"]
+    lines.append(
+        f"  No winner: {results['no_winner']} "
+        f"({undecided[REPETITION]} repetition, {undecided[NO_CAPTURE]} no capture, "
+        f"{undecided[UNFINISHED]} unfinished)"
+    )
+    lines.append(
+        f"Length (plies): mean {lengths['mean']:.1f}, min {lengths['min']}, "
+        f"p10 {lengths['p10']}, median {lengths['median']}, "
+        f"p90 {lengths['p90']}, max {lengths['max']}"
+    )
+
+    captures = sorted(summary["captures"], key=lambda c: c["count"], reverse=True)
+    total = sum(capture["count"] for capture in captures)
+    lines.append(f"Captures: {total}")
+    for capture in captures[:top_captures]:
+        lines.append(
+            f"  {capture['attacker']:<8} takes {capture['victim']:<8} "
+            f"{capture['count']:>8} ({_rate(capture['count'], total):.1%})"
+        )
+
+    positions = summary["positions"]
+    for side in (1, 2):
+        grid = summary["occupancy"][f"player{side}"]
+        lines.append(f"Player {side} occupancy (% of {positions} positions):")
+        for row in range(MAX_ROWS - 1, -1, -1):
+            cells = " ".join(
+                f"{100 * _rate(count, positions):>4.0f}" for count in grid[row]
+            )
+            lines.append(f"  {row + 1} {cells}")
+        lines.append(
+            "    " + " ".join(f"{chr(ord('A') + col):>4}" for col in range(MAX_COLUMNS))
+        )
+    return "\n".join(lines)
@@ -0,0 +1,343 @@
+"""
+Dataset Export Module
+
+Replays .record files and streams training samples into fixed-size,
+memory-mapped .npy shards for offline evaluation-model training.
+
+Each sample holds the position tensor before a move, the side to move,
+the move that was played and the final result from the mover's point of
+view. Games are replayed in worker processes one chunk of files at a
+time, so memory use depends on the chunk size, never on the corpus size.
+"""
+
+import json
+import os
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from numpy.lib.format import open_memmap
+except ImportError:  # NumPy is only needed for dataset export
+    np = None
+    open_memmap = None
+
+from model.board import Board
+from model.piece import Piece
+from model.terrain import square_index
+
+# Piece planes: one per (owner, kind), kinds ordered by rank (Rat .. Elephant)
+PIECE_KINDS: List[str] = sorted(Piece.RANKS, key=Piece.RANKS.get)
+NUM_PLANES = 2 * len(PIECE_KINDS)
+
+# Final result from the point of view of the side to move
+RESULT_WIN = 1
+RESULT_LOSS = -1
+RESULT_UNDECIDED = 0
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = "1.0"
+
+
+def sample_dtype():
+    """
+    Build the structured NumPy dtype of one training sample.
+
+    Fields:
+        position: uint8 planes (NUM_PLANES, rows, cols), 1 where a piece sits
+        side: side to move (0 or 1)
+        move: (from_square, to_square) with square = row * 7 + col
+        result: final result for the side to move (1, 0 or -1)
+    """
+    _require_numpy()
+    return np.dtype(
+        [
+            ("position", np.uint8, (NUM_PLANES, Board.MAX_ROWS, Board.MAX_COLUMNS)),
+            ("side", np.uint8),
+            ("move", np.uint8, (2,)),
+            ("result", np.int8),
+        ]
+    )
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Dataset export requires NumPy (pip install numpy).")
+
+
+def _notation_to_coords(notation: str) -> Tuple[int, int]:
+    return ord(notation[0].upper()) - ord("A"), int(notation[1]) - 1
+
+
+def replay_record(
+    moves: Sequence[Dict], start_fen: Optional[str] = None
+) -> Iterator[Tuple[Board, int, Tuple, Tuple]]:
+    """
+    Replay recorded moves, yielding the position before each one.
+
+    The yielded board is mutated as soon as the iterator advances, so
+    consumers must encode it before asking for the next move.
+
+    Args:
+        moves: The "moves" list of a .record file
+        start_fen: Starting position notation (default: standard start)
+
+    Yields:
+        (board, side_to_move, from_position, to_position) for each move
+    """
+    board = Board.from_fen(start_fen)[0] if start_fen else Board()
+    for move_data in moves:
+        from_pos = _notation_to_coords(move_data["from"])
+        to_pos = _notation_to_coords(move_data["to"])
+        if board.get_piece(from_pos) is None:
+            raise ValueError(
+                f"Move {move_data.get('move_number')} starts on an empty tile"
+            )
+        yield board, move_data["player_index"], from_pos, to_pos
+        board.move_piece(from_pos, to_pos)
+
+
+def game_winner(
+    board: Board, last_mover: int, last_to: Tuple[int, int]
+) -> Optional[int]:
+    """
+    Determine the winner from the final position of a replayed game.
+
+    Args:
+        board: Board after the last move
+        last_mover: Index of the player who made the last move
+        last_to: Target position of the last move
+
+    Returns:
+        Winning player index, or None if the record ends undecided
+    """
+    opponent_den = (
+        Board.PLAYER_2_DEN_POSITION if last_mover == 0 else Board.PLAYER_1_DEN_POSITION
+    )
+    if last_to == opponent_den:
+        return last_mover
+    return None if board.count_pieces(1 - last_mover) else last_mover
+
+
+def encode_game(
+    moves: Sequence[Dict], augment: bool = False, start_fen: Optional[str] = None
+):
+    """
+    Encode one recorded game as an array of training samples.
+
+    Args:
+        moves: The "moves" list of a .record file
+        augment: Also emit the left-right mirrored copy of every sample
+        start_fen: Starting position notation (default: standard start)
+
+    Returns:
+        Structured array with sample_dtype() entries
+    """
+    dtype = sample_dtype()
+    samples = np.zeros(len(moves) * (2 if augment else 1), dtype=dtype)
+    plane_of = {
+        (owner, name): owner * len(PIECE_KINDS) + index
+        for owner in (Piece.PLAYER_1, Piece.PLAYER_2)
+        for index, name in enumerate(PIECE_KINDS)
+    }
+
+    positions = samples["position"]
+    board = None
+    side = last_to = None
+    for index, (board, side, from_pos, to_pos) in enumerate(
+        replay_record(moves, start_fen)
+    ):
+        for locations in board.piece_locations:
+            for piece, (col, row) in locations.items():
+                positions[index, plane_of[(piece.owner, piece.name)], row, col] = 1
+        samples["side"][index] = side
+        samples["move"][index] = (square_index(from_pos), square_index(to_pos))
+        last_to = to_pos
+
+    count = len(moves)
+    if count:
+        winner = game_winner(board, side, last_to)
+        if winner is not None:
+            sides = samples["side"][:count]
+            samples["result"][:count] = np.where(
+                sides == winner, RESULT_WIN, RESULT_LOSS
+            )
+
+    if augment:
+        mirrored = samples[count:]
+        mirrored["position"] = samples["position"][:count, :, :, ::-1]
+        mirrored["side"] = samples["side"][:count]
+        mirrored["result"] = samples["result"][:count]
+        rows, cols = np.divmod(samples["move"][:count], Board.MAX_COLUMNS)
+        mirrored["move"] = rows * Board.MAX_COLUMNS + (Board.MAX_COLUMNS - 1 - cols)
+
+    return samples
+
+
+def _encode_chunk(args: Tuple[List[str], bool]):
+    """Worker entry point: encode every record file of one chunk."""
+    paths, augment = args
+    parts = []
+    errors = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                record_data = json.load(f)
+            parts.append(
+                encode_game(record_data["moves"], augment, record_data.get("start_fen"))
+            )
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+    samples = np.concatenate(parts) if parts else np.zeros(0, dtype=sample_dtype())
+    return samples, len(parts), errors
+
+
+def find_record_files(source: str) -> List[str]:
+    """
+    Collect .record files from a file or directory path.
+
+    Args:
+        source: A .record file or a directory searched recursively
+
+    Returns:
+        Sorted list of .record file paths
+    """
+    if os.path.isfile(source):
+        return [source]
+    found = []
+    for root, _, files in os.walk(source):
+        found.extend(
+            os.path.join(root, name) for name in files if name.endswith(".record")
+        )
+    return sorted(found)
+
+
+class ShardWriter:
+    """
+    Writes samples into preallocated, memory-mapped .npy shards.
+
+    Every shard is allocated at full size up front; the manifest records
+    how many leading samples of each shard are valid.
+    """
+
+    def __init__(self, output_dir: str, shard_size: int) -> None:
+        """
+        Initialize the writer.
+
+        Args:
+            output_dir: Directory receiving the shards and manifest
+            shard_size: Number of samples per shard
+        """
+        if shard_size <= 0:
+            raise ValueError("Shard size must be positive.")
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.shard_size = shard_size
+        self.dtype = sample_dtype()
+        self.shards: List[Dict] = []
+        self._current = None
+        self._filled = 0
+
+    def write(self, samples) -> None:
+        """Append samples, rolling over to new shards as they fill up."""
+        offset = 0
+        while offset < len(samples):
+            if self._current is None or self._filled == self.shard_size:
+                self._open_next_shard()
+            take = min(self.shard_size - self._filled, len(samples) - offset)
+            self._current[self._filled : self._filled + take] = samples[
+                offset : offset + take
+            ]
+            self._filled += take
+            self.shards[-1]["samples"] = self._filled
+            offset += take
+
+    def close(self) -> None:
+        """Flush and release the shard currently being written."""
+        if self._current is not None:
+            self._current.flush()
+            self._current = None
+
+    def _open_next_shard(self) -> None:
+        self.close()
+        filename = f"shard_{len(self.shards):05d}.npy"
+        self._current = open_memmap(
+            os.path.join(self.output_dir, filename),
+            mode="w+",
+            dtype=self.dtype,
+            shape=(self.shard_size,),
+        )
+        self._filled = 0
+        self.shards.append(
+            {"file": filename, "capacity": self.shard_size, "samples": 0}
+        )
+
+    @property
+    def total_samples(self) -> int:
+        """Total number of valid samples written so far."""
+        return sum(shard["samples"] for shard in self.shards)
+
+
+def export_dataset(
+    source: str,
+    output_dir: str,
+    shard_size: int = 65536,
+    chunk_size: int = 64,
+    workers: Optional[int] = None,
+    augment: bool = False,
+) -> Dict:
+    """
+    Export training samples from .record files into .npy shards.
+
+    Args:
+        source: A .record file or a directory of them
+        output_dir: Directory receiving the shards and manifest.json
+        shard_size: Number of samples per shard
+        chunk_size: Number of record files handed to a worker at a time
+        workers: Worker process count (None uses every CPU, 1 runs inline)
+        augment: Add left-right mirrored copies of every sample
+
+    Returns:
+        The manifest dictionary that was written to disk
+    """
+    _require_numpy()
+    paths = find_record_files(source)
+    chunks = [
+        (paths[i : i + chunk_size], augment) for i in range(0, len(paths), chunk_size)
+    ]
+    writer = ShardWriter(output_dir, shard_size)
+    games = 0
+    errors: List[str] = []
+
+    def consume(results):
+        nonlocal games
+        for samples, chunk_games, chunk_errors in results:
+            writer.write(samples)
+            games += chunk_games
+            errors.extend(chunk_errors)
+
+    try:
+        if workers == 1 or len(chunks) <= 1:
+            consume(map(_encode_chunk, chunks))
+        else:
+            with Pool(workers) as pool:
+                consume(pool.imap(_encode_chunk, chunks))
+    finally:
+        writer.close()
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "source": os.path.abspath(source),
+        "games": games,
+        "samples": writer.total_samples,
+        "augmented": augment,
+        "piece_planes": [
+            f"P{owner + 1} {name}" for owner in (0, 1) for name in PIECE_KINDS
+        ],
+        "dtype": [list(field) for field in sample_dtype().descr],
+        "shards": writer.shards,
+        "errors": errors,
+    }
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
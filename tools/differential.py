@@ -0,0 +1,684 @@
+"""
+Differential Rules Module
+
+Random playouts that check every implementation of the rules against the
+others. The rules kernel, the engine's move generator, the validators,
+the incremental board state (hash keys, piece tables, attack map) and
+the packed encodings (packed moves, packed positions, FEN, undo) are all
+compared with a deliberately naive reference written straight from the
+rules of the game.
+
+Every check is a function of (board, side_to_move) returning None when
+everything agrees, or a message describing the disagreement; new
+optimized representations add theirs with the @check decorator. Cheap
+checks run at every ply by default. Expensive ones (every validator on
+every candidate move, every legal move played and taken back, ...) only
+run when named, and then only at one ply in EXPENSIVE_CHECK_INTERVAL.
+
+A disagreement is shrunk to a minimal reproducer: the position it first
+appeared in, with pieces removed one at a time for as long as the same
+check still fails. Checks that only fail after a particular history
+(e.g. an incrementally updated key) keep the moves leading to the
+position instead.
+
+Games are spread over worker processes; every game has its own seed, so
+any failure can be replayed with play_random_game().
+"""
+
+import os
+import random
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from controller.controller import Controller
+from controller.move_validator import MoveValidator
+from engine.search import Search
+from model import rules
+from model.attack_map import AttackMap
+from model.board import STARTING_FEN, Board
+from model.game import Game
+from model.move import (
+    apply_move,
+    captured_rank,
+    encode_positions,
+    move_notation,
+    move_positions,
+    revert_move,
+    with_capture,
+)
+from model.piece import Piece
+from model.symmetry import ROTATED_POSITIONS
+from model.terrain import MAX_COLUMNS, MAX_ROWS, SQUARE_POSITIONS, TERRAIN
+from model.tile import Tile
+from model.zobrist import hash_snapshot
+
+from .position_batch import pack_board, unpack_board
+
+Position = Tuple[int, int]
+Move = Tuple[Position, Position]
+
+# A check: (board, side_to_move) -> None, or a description of what disagrees
+Check = Callable[[Board, int], Optional[str]]
+
+CHECKS: Dict[str, Check] = {}
+
+# Plies between two runs of an expensive check, by name
+EXPENSIVE_CHECKS: Dict[str, int] = {}
+EXPENSIVE_CHECK_INTERVAL = 8
+
+DEFAULT_GAMES = 1000
+DEFAULT_MAX_PLIES = 200  # Moves after which a game is abandoned
+DEFAULT_CHUNK_SIZE = 50  # Games handed to a worker at a time
+DEFAULT_MAX_FAILURES = 10  # Disagreements after which a run stops
+
+_DEN_TYPES = (Tile.PLAYER_1_DEN, Tile.PLAYER_2_DEN)
+
+
+class Disagreement(NamedTuple):
+    """
+    A check that failed, with a reproducer.
+
+    Attributes:
+        check: Name of the failing check
+        message: What disagreed
+        seed: Seed of the game it was found in
+        start_fen: Position the reproducer starts from
+        moves: Moves from start_fen to the failing position, in notation
+            (empty once shrunk to a position)
+        fen: The failing position, with the side to move
+    """
+
+    check: str
+    message: str
+    seed: int
+    start_fen: str
+    moves: Tuple[str, ...]
+    fen: str
+
+
+def check(name: str, expensive: bool = False) -> Callable[[Check], Check]:
+    """
+    Register a check under a name.
+
+    Args:
+        name: Name of the check, as given on the command line
+        expensive: Only run the check when it is named, and then only at
+            one ply in EXPENSIVE_CHECK_INTERVAL
+
+    Returns:
+        Decorator registering the function
+    """
+
+    def register(func: Check) -> Check:
+        CHECKS[name] = func
+        if expensive:
+            EXPENSIVE_CHECKS[name] = EXPENSIVE_CHECK_INTERVAL
+        return func
+
+    return register
+
+
+def default_checks() -> List[str]:
+    """Names of the checks run when none are named: the cheap ones."""
+    return [name for name in CHECKS if name not in EXPENSIVE_CHECKS]
+
+
+# Reference rules: naive, written from the rules of the game only
+
+
+def _in_water(position: Position) -> bool:
+    col, row = position
+    return TERRAIN[col][row].tile_type == Tile.WATER
+
+
+def reference_target(
+    board: Board, piece: Piece, position: Position, direction: Position
+) -> Optional[Position]:
+    """
+    Square a piece would reach moving one way, ignoring what stands there.
+
+    Args:
+        board: The board
+        piece: The moving piece
+        position: Its position as (col, row)
+        direction: (d_col, d_row) step
+
+    Returns:
+        The target, or None if the piece cannot move that way
+    """
+    col, row = position[0] + direction[0], position[1] + direction[1]
+    if not (0 <= col < MAX_COLUMNS and 0 <= row < MAX_ROWS):
+        return None
+    if _in_water((col, row)):
+        if piece.name == "Rat":
+            return col, row
+        if piece.name not in ("Lion", "Tiger"):
+            return None
+        # Jump the river, unless a piece swims in the way
+        while _in_water((col, row)):
+            if board.get_piece((col, row)) is not None:
+                return None
+            col, row = col + direction[0], row + direction[1]
+        return col, row
+    if TERRAIN[col][row].tile_type == _DEN_TYPES[piece.owner]:
+        return None
+    return col, row
+
+
+def reference_can_capture(
+    attacker: Piece, from_position: Position, victim: Piece, to_position: Position
+) -> bool:
+    """
+    Whether a piece may capture another, by the rules of the game.
+
+    Args:
+        attacker: The moving piece
+        from_position: Its position
+        victim: The opponent piece
+        to_position: Position of the opponent piece
+
+    Returns:
+        True if the capture is allowed
+    """
+    col, row = to_position
+    trap = TERRAIN[col][row]
+    if trap.tile_type == Tile.TRAP and trap.owner == attacker.owner:
+        return True
+    if _in_water(from_position) != _in_water(to_position):
+        return False
+    if attacker.name == "Rat" and victim.name == "Elephant":
+        return True
+    if attacker.name == "Elephant" and victim.name == "Rat":
+        return False
+    return attacker.rank >= victim.rank
+
+
+def reference_legal_moves(board: Board, side: int) -> Set[Move]:
+    """
+    Every legal move of a side, found by scanning the board square by square.
+
+    Args:
+        board: The board
+        side: Player index (0 or 1)
+
+    Returns:
+        Legal moves as (from_position, to_position)
+    """
+    moves = set()
+    for square, piece in enumerate(board.squares):
+        if piece is None or piece.owner != side:
+            continue
+        position = SQUARE_POSITIONS[square]
+        for direction in rules.DIRECTIONS:
+            target = reference_target(board, piece, position, direction)
+            if target is None:
+                continue
+            occupant = board.get_piece(target)
+            if occupant is None or (
+                occupant.owner != side
+                and reference_can_capture(piece, position, occupant, target)
+            ):
+                moves.add((position, target))
+    return moves
+
+
+def _candidate_moves(board: Board) -> Set[Move]:
+    """Steps and jumps of every piece of both sides, legal or not."""
+    candidates = set()
+    for square, piece in enumerate(board.squares):
+        if piece is None:
+            continue
+        col, row = SQUARE_POSITIONS[square]
+        for d_col, d_row in rules.DIRECTIONS:
+            to_col, to_row = col + d_col, row + d_row
+            while 0 <= to_col < MAX_COLUMNS and 0 <= to_row < MAX_ROWS:
+                candidates.add(((col, row), (to_col, to_row)))
+                if not _in_water((to_col, to_row)):
+                    break
+                to_col, to_row = to_col + d_col, to_row + d_row
+    return candidates
+
+
+def _notation(position: Position) -> str:
+    col, row = position
+    return f"{chr(ord('A') + col)}{row + 1}"
+
+
+def _describe(moves: Set[Move]) -> str:
+    return ", ".join(f"{_notation(a)} to {_notation(b)}" for a, b in sorted(moves))
+
+
+def _compare_moves(label: str, found: Set[Move], expected: Set[Move]) -> Optional[str]:
+    if found == expected:
+        return None
+    parts = []
+    if expected - found:
+        parts.append(f"misses {_describe(expected - found)}")
+    if found - expected:
+        parts.append(f"allows {_describe(found - expected)}")
+    return f"{label} {'; '.join(parts)}"
+
+
+def _flatten(legal: rules.LegalMoves) -> Set[Move]:
+    return {(start, target) for start, targets in legal.items() for target in targets}
+
+
+# Checks
+
+
+@check("kernel")
+def check_kernel(board: Board, side: int) -> Optional[str]:
+    """The cached and uncached rules kernel against the reference."""
+    expected = reference_legal_moves(board, side)
+    return _compare_moves(
+        "rules.legal_moves", _flatten(rules.legal_moves(board, side)), expected
+    ) or _compare_moves(
+        "rules.generate_legal_moves",
+        _flatten(rules.generate_legal_moves(board, side)),
+        expected,
+    )
+
+
+_controller: Optional[Controller] = None
+
+
+def _controller_on(board: Board, side: int) -> Controller:
+    """A Controller showing a board (it only reads the game's board and turn)."""
+    global _controller
+    if _controller is None:
+        _controller = Controller(hint_budget=0)
+        _controller.game = Game("Player 1", "Player 2")
+    _controller.game.board = board
+    _controller.game.current_turn = side
+    return _controller
+
+
+@check("validators", expensive=True)
+def check_validators(board: Board, side: int) -> Optional[str]:
+    """Every validation entry point, on legal and illegal moves of both sides."""
+    expected = reference_legal_moves(board, side)
+    validator = MoveValidator(board)
+    controller = _controller_on(board, side)
+    for move in sorted(_candidate_moves(board)):
+        legal = move in expected
+        answers = {
+            "rules.is_legal_move": rules.is_legal_move(board, side, *move),
+            "MoveValidator.is_valid_move": validator.is_valid_move(*move, side),
+            "MoveValidator.is_legal": validator.is_legal(encode_positions(*move), side),
+            "Controller.is_valid_move": controller.is_valid_move(*move),
+            "rules.explain_illegal_move": (
+                rules.explain_illegal_move(board, side, *move) is None
+            ),
+        }
+        for name, answer in answers.items():
+            if answer != legal:
+                verdict = "accepts" if answer else "rejects"
+                return f"{name} {verdict} {_describe({move})}"
+    return None
+
+
+@check("search")
+def check_search(board: Board, side: int) -> Optional[str]:
+    """The engine's move generator against the reference."""
+    return _compare_moves(
+        "Search._ordered_moves",
+        set(Search(board, side)._ordered_moves(side)),
+        reference_legal_moves(board, side),
+    )
+
+
+@check("attacks", expensive=True)
+def check_attacks(board: Board, side: int) -> Optional[str]:
+    """The board's attack map (or a fresh one) against the reference."""
+    attack_map = board.attack_map or AttackMap(board)
+    for player in (Piece.PLAYER_1, Piece.PLAYER_2):
+        expected = set()
+        for square, piece in enumerate(board.squares):
+            if piece is not None and piece.owner == player:
+                for direction in rules.DIRECTIONS:
+                    target = reference_target(
+                        board, piece, SQUARE_POSITIONS[square], direction
+                    )
+                    if target is not None:
+                        expected.add(target)
+        found = attack_map.attacked_squares(player)
+        if found != expected:
+            return (
+                f"AttackMap.attacked_squares({player}) differs on "
+                f"{', '.join(sorted(map(_notation, found ^ expected)))}"
+            )
+
+        captures = {
+            target
+            for _, target in reference_legal_moves(board, 1 - player)
+            if board.get_piece(target) is not None
+        }
+        threatened = {position for _, position in attack_map.threatened_pieces(player)}
+        if threatened != captures:
+            return (
+                f"AttackMap.threatened_pieces({player}) differs on "
+                f"{', '.join(sorted(map(_notation, threatened ^ captures)))}"
+            )
+    return None
+
+
+@check("incremental")
+def check_incremental(board: Board, side: int) -> Optional[str]:
+    """Hash keys and piece tables kept up to date move by move."""
+    snapshot = board.snapshot()
+    if board.position_key(side) != hash_snapshot(snapshot, side):
+        return "Board.position_key differs from hashing the snapshot"
+    rotated = {
+        ROTATED_POSITIONS[position]: {
+            "name": info["name"],
+            "owner": 1 - info["owner"],
+        }
+        for position, info in snapshot.items()
+    }
+    if board.rotated_key != hash_snapshot(rotated, 0):
+        return "Board.rotated_key differs from hashing the rotated snapshot"
+
+    for player in (Piece.PLAYER_1, Piece.PLAYER_2):
+        scanned = {
+            piece: SQUARE_POSITIONS[square]
+            for square, piece in enumerate(board.squares)
+            if piece is not None and piece.owner == player
+        }
+        if board.piece_locations[player] != scanned:
+            return f"Board.piece_locations[{player}] differs from the squares"
+        if board.piece_counts[player] != len(scanned):
+            return (
+                f"Board.piece_counts[{player}] is {board.piece_counts[player]}, "
+                f"{len(scanned)} pieces are on the board"
+            )
+    return None
+
+
+@check("encodings", expensive=True)
+def check_encodings(board: Board, side: int) -> Optional[str]:
+    """FEN and packed-position round trips."""
+    fen = board.to_fen(side)
+    loaded, loaded_side = Board.from_fen(fen)
+    if loaded.to_fen(loaded_side) != fen:
+        return f"FEN round trip changes {fen}"
+    unpacked, unpacked_side = unpack_board(pack_board(board, side))
+    if unpacked.to_fen(unpacked_side) != fen:
+        return f"pack_board/unpack_board round trip changes {fen}"
+    if unpacked.position_key(unpacked_side) != board.position_key(side):
+        return "Unpacked position has another position key"
+    return None
+
+
+def _occupancy(board: Board) -> List[Optional[Tuple[str, int]]]:
+    return [piece and (piece.name, piece.owner) for piece in board.squares]
+
+
+@check("undo", expensive=True)
+def check_undo(board: Board, side: int) -> Optional[str]:
+    """Packed moves played and taken back, for every legal move."""
+    occupancy = _occupancy(board)
+    key = board.position_key(side)
+    played = board.clone()  # Back in the same position after each move
+    for from_position, to_position in sorted(reference_legal_moves(board, side)):
+        move = encode_positions(from_position, to_position)
+        captured = apply_move(played, move)
+        move = with_capture(move, captured)
+        if move_positions(move) != (from_position, to_position) or captured_rank(
+            move
+        ) != (captured.rank if captured is not None else 0):
+            return f"Packed move {move_notation(move)} does not round trip"
+        if revert_move(played, move) != side:
+            return f"revert_move of {move_notation(move)} reports the wrong mover"
+        if _occupancy(played) != occupancy or played.position_key(side) != key:
+            return f"revert_move of {move_notation(move)} restores another position"
+    return None
+
+
+def run_checks(
+    board: Board,
+    side: int,
+    names: Optional[Sequence[str]] = None,
+    ply: Optional[int] = None,
+) -> Optional[Tuple[str, str]]:
+    """
+    Run checks on a position.
+
+    Args:
+        board: The board
+        side: Player to move
+        names: Checks to run (default: all)
+        ply: Ply of the position in a game, to skip expensive checks on
+            plies they do not sample (default: run every check)
+
+    Returns:
+        (check name, message) of the first failing check, or None
+    """
+    for name in names or CHECKS:
+        if ply is not None and ply % EXPENSIVE_CHECKS.get(name, 1):
+            continue
+        message = CHECKS[name](board, side)
+        if message is not None:
+            return name, message
+    return None
+
+
+# Playouts
+
+
+def play_random_game(
+    seed: int,
+    max_plies: int = DEFAULT_MAX_PLIES,
+    checks: Optional[Sequence[str]] = None,
+    start_fen: str = STARTING_FEN,
+) -> Tuple[int, Optional[Disagreement]]:
+    """
+    Play a random game, checking its positions.
+
+    Moves are drawn from the reference rules, so a move the optimized code
+    wrongly rejects is still played.
+
+    Args:
+        seed: Seed of the game
+        max_plies: Moves after which the game is abandoned
+        checks: Checks to run (default: the cheap ones)
+        start_fen: Starting position
+
+    Returns:
+        Tuple of (positions checked, first Disagreement or None)
+    """
+    checks = checks or default_checks()
+    rng = random.Random(seed)
+    board, side = Board.from_fen(start_fen)
+    board.track_attacks()
+    moves: List[str] = []
+    for ply in range(max_plies):
+        failure = run_checks(board, side, checks, ply)
+        if failure is not None:
+            return ply + 1, Disagreement(
+                *failure, seed, start_fen, tuple(moves), board.to_fen(side)
+            )
+        legal = sorted(reference_legal_moves(board, side))
+        if not legal:
+            break
+        from_position, to_position = rng.choice(legal)
+        move = encode_positions(from_position, to_position)
+        apply_move(board, move)
+        moves.append(move_notation(move))
+        if to_position == rules.opponent_den(side) or not board.count_pieces(1 - side):
+            return ply + 1, None
+        side = 1 - side
+    return max_plies, None
+
+
+def shrink(failure: Disagreement) -> Disagreement:
+    """
+    Reduce a disagreement to a minimal reproducer.
+
+    The failing position is loaded afresh; if the check still fails there,
+    pieces are removed one at a time for as long as it keeps failing.
+    Otherwise the failure depends on the moves played, which are kept.
+
+    Args:
+        failure: A disagreement found by play_random_game()
+
+    Returns:
+        The smallest reproducer found
+    """
+
+    def fails(fen: str) -> Optional[str]:
+        board, side = Board.from_fen(fen)
+        board.track_attacks()
+        return CHECKS[failure.check](board, side)
+
+    message = fails(failure.fen)
+    if message is None:
+        return failure
+    fen = failure.fen
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        board, side = Board.from_fen(fen)
+        for position in sorted(board.snapshot()):
+            candidate = board.clone()
+            candidate.remove_piece(position)
+            candidate_fen = candidate.to_fen(side)
+            candidate_message = fails(candidate_fen)
+            if candidate_message is not None:
+                fen, message, shrunk = candidate_fen, candidate_message, True
+                break
+    return failure._replace(message=message, start_fen=fen, moves=(), fen=fen)
+
+
+def _run_games(job: Dict) -> Dict:
+    """
+    Play a range of games in this process (a worker's task).
+
+    Args:
+        job: {"seeds": first and end game seeds, "max_plies", "checks",
+            "max_failures"}
+
+    Returns:
+        {"games", "positions", "failures": shrunk Disagreements}
+    """
+    games = positions = 0
+    failures = []
+    for seed in range(*job["seeds"]):
+        checked, failure = play_random_game(seed, job["max_plies"], job["checks"])
+        games += 1
+        positions += checked
+        if failure is not None:
+            failures.append(shrink(failure))
+            if len(failures) >= job["max_failures"]:
+                break
+    return {
+        "games": games,
+        "positions": positions,
+        "failures": failures,
+    }
+
+
+def run_differential(
+    games: int = DEFAULT_GAMES,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    max_plies: int = DEFAULT_MAX_PLIES,
+    checks: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_failures: int = DEFAULT_MAX_FAILURES,
+) -> Dict:
+    """
+    Play random games in parallel, checking their positions.
+
+    Args:
+        games: Number of games
+        workers: Worker processes (default: CPU count; 1 runs inline)
+        seed: First game seed; game i is played with seed + i
+        max_plies: Moves after which a game is abandoned
+        checks: Checks to run (default: the cheap ones)
+        chunk_size: Most games handed to a worker at a time
+        max_failures: Disagreements after which the run stops early
+
+    Returns:
+        Report with "games", "positions", "elapsed_seconds",
+        "positions_per_second", "checks" and shrunk "failures"
+
+    Raises:
+        ValueError: If a check name is unknown
+    """
+    checks = list(checks or default_checks())
+    unknown = [name for name in checks if name not in CHECKS]
+    if unknown:
+        raise ValueError(
+            f"Unknown check(s) {', '.join(unknown)}; "
+            f"choose from {', '.join(CHECKS)}."
+        )
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+    # Small runs are split evenly so every worker gets games
+    chunk_size = max(1, min(chunk_size, -(-games // workers)))
+    jobs = [
+        {
+            "seeds": (seed + start, seed + min(start + chunk_size, games)),
+            "max_plies": max_plies,
+            "checks": checks,
+            "max_failures": max_failures,
+        }
+        for start in range(0, games, chunk_size)
+    ]
+
+    report = {"games": 0, "positions": 0, "failures": []}
+
+    def consume(results) -> None:
+        for result in results:
+            report["games"] += result["games"]
+            report["positions"] += result["positions"]
+            report["failures"].extend(result["failures"])
+            if len(report["failures"]) >= max_failures:
+                break
+
+    start_time = time.perf_counter()
+    if workers == 1:
+        consume(map(_run_games, jobs))
+    else:
+        with Pool(workers) as pool:
+            consume(pool.imap_unordered(_run_games, jobs))
+    elapsed = time.perf_counter() - start_time
+
+    report["failures"] = sorted(report["failures"], key=lambda f: f.seed)[:max_failures]
+    report.update(
+        checks=checks,
+        workers=workers,
+        elapsed_seconds=elapsed,
+        positions_per_second=report["positions"] / elapsed if elapsed > 0 else 0.0,
+    )
+    return report
+
+
+def format_report(report: Dict) -> str:
+    """
+    Format a differential run as text.
+
+    Args:
+        report: Result of run_differential()
+
+    Returns:
+        A summary line and every reproducer found
+    """
+    lines = [
+        f"Played {report['games']} games, checked {report['positions']} positions "
+        f"in {report['elapsed_seconds']:.2f}s "
+        f"({report['positions_per_second']:,.0f} positions/s) "
+        f"on {report['workers']} worker(s)",
+        f"Checks: {', '.join(report['checks'])}",
+    ]
+    for failure in report["failures"]:
+        lines.append(
+            f"✗ [{failure.check}] {failure.message} (game seed {failure.seed})"
+        )
+        lines.append(f"    start: {failure.start_fen}")
+        if failure.moves:
+            lines.append(f"    moves: {', '.join(failure.moves)}")
+        lines.append(f"    fails: {failure.fen}")
+    if not report["failures"]:
+        lines.append("✓ Every implementation agrees.")
+    return "\n".join(lines)
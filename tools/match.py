@@ -0,0 +1,209 @@
+"""
+Match Module
+
+Headless matches between two engines speaking the engine protocol (see
+engine.protocol). Games are played on a bare Board with the rules module
+and a DrawTracker; nothing is rendered, and the match runner keeps each
+engine's clock, so a slow engine loses on time.
+
+Engines swap sides after every game, so each plays Player 1 as often as
+Player 2 over an even number of games.
+"""
+
+import time
+from typing import Dict, List, Optional, Sequence
+
+from engine.protocol import EngineClient, EngineError, Move, move_to_text
+from model import rules
+from model.board import Board
+from model.draw_rules import DrawRules, DrawTracker
+
+# How games end besides the usual "den", "capture_all" and draw reasons
+TIME_FORFEIT = "time"
+NO_MOVE = "no_move"
+ILLEGAL_MOVE = "illegal_move"
+ENGINE_FAILURE = "engine_failure"
+MOVE_LIMIT = "move_limit"
+
+
+class TimeControl:
+    """
+    Thinking time of each engine.
+
+    Attributes:
+        base_ms: Starting clock of each side, in ms (None for movetime)
+        increment_ms: Time added after each move, in ms
+        movetime_ms: Fixed time per move, in ms (None for a clock)
+    """
+
+    def __init__(
+        self,
+        base_ms: Optional[int] = None,
+        increment_ms: int = 0,
+        movetime_ms: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize a time control: either a clock or a fixed time per move.
+
+        Args:
+            base_ms: Starting clock of each side, in ms
+            increment_ms: Time added after each move, in ms
+            movetime_ms: Fixed time per move, in ms
+
+        Raises:
+            ValueError: If neither or both of base_ms and movetime_ms are set
+        """
+        if (base_ms is None) == (movetime_ms is None):
+            raise ValueError("Use either a clock or a fixed time per move.")
+        if (base_ms or movetime_ms) <= 0 or increment_ms < 0:
+            raise ValueError("Times must be positive.")
+        self.base_ms = base_ms
+        self.increment_ms = increment_ms
+        self.movetime_ms = movetime_ms
+
+    def describe(self) -> str:
+        """Describe the time control for humans."""
+        if self.movetime_ms is not None:
+            return f"{self.movetime_ms} ms per move"
+        return f"{self.base_ms / 1000:g}s + {self.increment_ms / 1000:g}s per move"
+
+
+def play_game(
+    engines: Sequence[EngineClient],
+    time_control: TimeControl,
+    draw_rules: Optional[DrawRules] = None,
+    start_fen: Optional[str] = None,
+    max_moves: int = 500,
+) -> Dict:
+    """
+    Play one game between two engines.
+
+    Args:
+        engines: The engines of Player 1 and Player 2
+        time_control: Thinking time of each engine
+        draw_rules: Draw rules of the game (default: none)
+        start_fen: Starting position in FEN notation (default: standard)
+        max_moves: Moves after which the game is drawn
+
+    Returns:
+        {"winner": player index or None, "reason", "moves": moves played
+        as protocol text}
+    """
+    board, side = Board.from_fen(start_fen) if start_fen else (Board(), 0)
+    tracker = DrawTracker(draw_rules or DrawRules(), board.position_key(side))
+    moves: List[Move] = []
+    clocks = [time_control.base_ms] * 2
+
+    def result(winner: Optional[int], reason: str) -> Dict:
+        return {
+            "winner": winner,
+            "reason": reason,
+            "moves": [move_to_text(move) for move in moves],
+        }
+
+    for engine in engines:
+        engine.send("isready")
+        engine.expect("readyok", 10.0)
+
+    while len(moves) < max_moves:
+        engine = engines[side]
+        started = time.perf_counter()
+        try:
+            engine.set_position(start_fen, moves)
+            move = engine.go(
+                movetime=time_control.movetime_ms,
+                clocks=clocks,
+                increments=(time_control.increment_ms,) * 2,
+                side=side,
+            )
+        except EngineError:
+            return result(1 - side, ENGINE_FAILURE)
+        spent = int((time.perf_counter() - started) * 1000)
+
+        if clocks[side] is not None:
+            clocks[side] -= spent
+            if clocks[side] < 0:
+                return result(1 - side, TIME_FORFEIT)
+            clocks[side] += time_control.increment_ms
+        if move is None:
+            # A side that cannot move loses
+            has_moves = any(rules.legal_moves(board, side).values())
+            return result(1 - side, ILLEGAL_MOVE if has_moves else NO_MOVE)
+        if not rules.is_legal_move(board, side, *move):
+            return result(1 - side, ILLEGAL_MOVE)
+
+        captured = board.move_piece(*move)
+        moves.append(move)
+        if move[1] == rules.opponent_den(side):
+            return result(side, "den")
+        if not board.piece_counts[1 - side]:
+            return result(side, "capture_all")
+        draw_reason = tracker.push(board.position_key(1 - side), captured is not None)
+        if draw_reason is not None:
+            return result(None, draw_reason)
+        side = 1 - side
+    return result(None, MOVE_LIMIT)
+
+
+def play_match(
+    commands: Sequence[Sequence[str]],
+    games: int,
+    time_control: TimeControl,
+    draw_rules: Optional[DrawRules] = None,
+    start_fen: Optional[str] = None,
+    max_moves: int = 500,
+    on_game=None,
+) -> Dict:
+    """
+    Play a match between two engine programs.
+
+    Args:
+        commands: Program and arguments of each engine
+        games: Number of games; the engines swap sides after each one
+        time_control: Thinking time of each engine
+        draw_rules: Draw rules of every game (default: none)
+        start_fen: Starting position in FEN notation (default: standard)
+        max_moves: Moves after which a game is drawn
+        on_game: Called with (game number, game result) after each game
+
+    Returns:
+        {"engines": names, "score": points of each engine (a draw is worth
+        half a point), "wins", "draws", "games": game results, each with
+        "engine_sides" giving the engine index of Player 1 and Player 2}
+    """
+    clients = []
+    try:
+        for command in commands:
+            clients.append(EngineClient(command))
+            clients[-1].handshake()
+
+        wins = [0, 0]
+        draws = 0
+        results = []
+        for number in range(games):
+            order = (0, 1) if number % 2 == 0 else (1, 0)
+            game = play_game(
+                [clients[index] for index in order],
+                time_control,
+                draw_rules,
+                start_fen,
+                max_moves,
+            )
+            game["engine_sides"] = list(order)
+            if game["winner"] is None:
+                draws += 1
+            else:
+                wins[order[game["winner"]]] += 1
+            results.append(game)
+            if on_game is not None:
+                on_game(number + 1, game)
+        return {
+            "engines": [client.name for client in clients],
+            "score": [wins[index] + draws / 2 for index in (0, 1)],
+            "wins": wins,
+            "draws": draws,
+            "games": results,
+        }
+    finally:
+        for client in clients:
+            client.quit()
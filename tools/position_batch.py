@@ -0,0 +1,224 @@
+"""
+Position Batch Module
+
+Fixed-width binary positions in shared memory, for handing boards to
+worker processes without pickling Board/Piece object graphs.
+
+Every position takes POSITION_BYTES bytes: one byte per square (0 for an
+empty square, otherwise 1 + owner * 8 + rank - 1) followed by the side to
+move. A PositionBatch lays positions out back to back in a block of
+multiprocessing.shared_memory; workers attach to the block by name and
+read or write positions in place, so only the name and indexes travel
+between processes.
+"""
+
+import sys
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Tuple
+
+from model.board import Board
+from model.piece import Piece
+from model.terrain import NUM_SQUARES, SQUARE_POSITIONS
+
+# 63 squares and the side to move
+POSITION_BYTES = NUM_SQUARES + 1
+SIDE_OFFSET = NUM_SQUARES
+
+EMPTY = 0
+
+# Piece names by rank (index 0 unused)
+_NAMES = [None] + sorted(Piece.RANKS, key=Piece.RANKS.get)
+
+# Byte of each (owner, rank) and (name, owner) of each byte
+_DECODE = [None] + [(_NAMES[rank], owner) for owner in (0, 1) for rank in range(1, 9)]
+
+
+def _code(piece: Piece) -> int:
+    return 1 + piece.owner * 8 + piece.rank - 1
+
+
+def pack_board(
+    board: Board, side_to_move: int, buffer=None, offset: int = 0
+) -> Optional[bytes]:
+    """
+    Write a position in the fixed-width layout.
+
+    Args:
+        board: The board
+        side_to_move: Player to move (0 or 1)
+        buffer: Writable buffer to pack into (default: return new bytes)
+        offset: Byte offset of the position in buffer
+
+    Returns:
+        The packed position when no buffer is given, else None
+    """
+    packed = bytearray(POSITION_BYTES)
+    for square, piece in enumerate(board.squares):
+        if piece is not None:
+            packed[square] = _code(piece)
+    packed[SIDE_OFFSET] = side_to_move
+    if buffer is None:
+        return bytes(packed)
+    buffer[offset : offset + POSITION_BYTES] = packed
+    return None
+
+
+def unpack_board(buffer, offset: int = 0) -> Tuple[Board, int]:
+    """
+    Read a position written by pack_board.
+
+    Args:
+        buffer: Buffer holding the position
+        offset: Byte offset of the position in buffer
+
+    Returns:
+        Tuple of (board, side_to_move)
+
+    Raises:
+        ValueError: If a byte is not a valid piece code or side to move, or
+            a player has two pieces of the same rank
+    """
+    data = bytes(buffer[offset : offset + POSITION_BYTES])
+    side_to_move = data[SIDE_OFFSET]
+    if side_to_move not in (0, 1):
+        raise ValueError(f"Invalid side to move {side_to_move}")
+    board = Board.empty()
+    seen = set()
+    for square in range(NUM_SQUARES):
+        code = data[square]
+        if code == EMPTY:
+            continue
+        if code >= len(_DECODE):
+            raise ValueError(f"Invalid piece code {code} on square {square}")
+        if code in seen:
+            raise ValueError(f"Duplicate piece code {code} on square {square}")
+        seen.add(code)
+        name, owner = _DECODE[code]
+        board.place_piece(Piece(name, owner), SQUARE_POSITIONS[square])
+    return board, side_to_move
+
+
+class PositionBatch:
+    """
+    Positions stored back to back in a shared memory block.
+
+    Create the batch in the parent process, pass descriptor to workers
+    and attach there. Only the creator should call unlink(); leaving a
+    with block does so for the creator, and only closes attached batches.
+
+    Attributes:
+        capacity: Number of positions the batch holds
+        buffer: The shared bytes (a memoryview)
+    """
+
+    def __init__(
+        self, memory: shared_memory.SharedMemory, capacity: int, owner: bool = False
+    ) -> None:
+        """Wrap a shared memory block (use create() or attach())."""
+        self._memory = memory
+        self._owner = owner  # Created the block, so frees it on exit
+        self.capacity = capacity
+        self.buffer = memory.buf
+
+    @classmethod
+    def create(cls, capacity: int) -> "PositionBatch":
+        """
+        Allocate a zeroed batch (every position empty, Player 1 to move).
+
+        Args:
+            capacity: Number of positions
+
+        Returns:
+            The new batch
+        """
+        if capacity <= 0:
+            raise ValueError("Batch capacity must be positive.")
+        memory = shared_memory.SharedMemory(create=True, size=capacity * POSITION_BYTES)
+        memory.buf[: capacity * POSITION_BYTES] = bytes(capacity * POSITION_BYTES)
+        return cls(memory, capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, capacity: int) -> "PositionBatch":
+        """
+        Open a batch created by another process.
+
+        Args:
+            name: Name of the shared memory block (see descriptor)
+            capacity: Number of positions
+
+        Returns:
+            The batch, sharing memory with its creator
+        """
+        memory = shared_memory.SharedMemory(name=name)
+        if sys.version_info < (3, 13):
+            # Before 3.13 attaching registers the block for cleanup as if
+            # this process owned it; only the creator unlinks it
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return cls(memory, capacity)
+
+    @property
+    def descriptor(self) -> Tuple[str, int]:
+        """(name, capacity) for attach() in another process."""
+        return self._memory.name, self.capacity
+
+    def _offset(self, index: int) -> int:
+        if not 0 <= index < self.capacity:
+            raise IndexError(f"Position {index} out of range")
+        return index * POSITION_BYTES
+
+    def write(self, index: int, board: Board, side_to_move: int) -> None:
+        """
+        Store a position.
+
+        Args:
+            index: Slot of the position
+            board: The board
+            side_to_move: Player to move (0 or 1)
+        """
+        pack_board(board, side_to_move, self.buffer, self._offset(index))
+
+    def read(self, index: int) -> Tuple[Board, int]:
+        """
+        Load a position into a new Board.
+
+        Args:
+            index: Slot of the position
+
+        Returns:
+            Tuple of (board, side_to_move)
+        """
+        return unpack_board(self.buffer, self._offset(index))
+
+    def raw(self, index: int) -> memoryview:
+        """
+        Get the bytes of one position, without copying.
+
+        Args:
+            index: Slot of the position
+
+        Returns:
+            A writable view of POSITION_BYTES bytes
+        """
+        offset = self._offset(index)
+        return self.buffer[offset : offset + POSITION_BYTES]
+
+    def __len__(self) -> int:
+        return self.capacity
+
+    def close(self) -> None:
+        """Detach from the shared memory (views from raw() must be released)."""
+        self.buffer = None
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it."""
+        self._memory.unlink()
+        self._owner = False
+
+    def __enter__(self) -> "PositionBatch":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
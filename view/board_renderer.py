@@ -0,0 +1,87 @@
+"""
+Board Renderer Module
+
+This module contains the BoardRenderer class which keeps the text of
+every board cell and row ready for display. It subscribes to a Board's
+events, so a move re-formats only the cells and rows it changed instead
+of the whole board.
+"""
+
+from typing import Callable, List, Optional
+
+from model.board import Board
+from model.board_events import BoardListener
+from model.piece import Piece
+from model.terrain import MAX_COLUMNS, MAX_ROWS, NUM_SQUARES, TERRAIN_SQUARES
+from model.tile import Tile
+
+# Formats a square from its piece (or None) and terrain, 6 characters wide
+SquareFormatter = Callable[[Optional[Piece], Tile], str]
+
+
+class BoardRenderer(BoardListener):
+    """
+    Cached display text of a board.
+
+    Attributes:
+        board: The board rendered
+        cells: Text of each square, indexed by square index
+    """
+
+    def __init__(self, board: Board, format_square: SquareFormatter) -> None:
+        """
+        Render a board and subscribe to its changes.
+
+        Args:
+            board: The board to render
+            format_square: Formats one square (see View._format_square)
+        """
+        self.board = board
+        self.format_square = format_square
+        self._terrain = [
+            format_square(None, TERRAIN_SQUARES[square])
+            for square in range(NUM_SQUARES)
+        ]
+        self.cells: List[str] = list(self._terrain)
+        self._rows: List[Optional[str]] = [None] * MAX_ROWS
+        for square, piece in enumerate(board.squares):
+            if piece is not None:
+                self.piece_placed(piece, square)
+        board.subscribe(self)
+
+    def close(self) -> None:
+        """Stop following the board."""
+        self.board.unsubscribe(self)
+
+    def piece_placed(self, piece: Piece, square: int) -> None:
+        """Re-format the square a piece was placed on."""
+        self.cells[square] = self.format_square(piece, TERRAIN_SQUARES[square])
+        self._rows[square // MAX_COLUMNS] = None
+
+    def piece_removed(self, piece: Piece, square: int) -> None:
+        """Show the terrain of the square a piece left."""
+        self.cells[square] = self._terrain[square]
+        self._rows[square // MAX_COLUMNS] = None
+
+    def board_cleared(self) -> None:
+        """Show the bare terrain."""
+        self.cells = list(self._terrain)
+        self._rows = [None] * MAX_ROWS
+
+    def row(self, row: int) -> str:
+        """
+        Get the text of a row: every cell followed by "|".
+
+        Args:
+            row: Row index (0 for row 1)
+
+        Returns:
+            The row's cells, re-joined only if one of them changed
+        """
+        text = self._rows[row]
+        if text is None:
+            start = row * MAX_COLUMNS
+            text = self._rows[row] = "".join(
+                f"{cell}|" for cell in self.cells[start : start + MAX_COLUMNS]
+            )
+        return text
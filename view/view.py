@@ -5,9 +5,11 @@ This module contains the View class responsible for all display
 and user input operations.
 """
 
-from typing import Dict
+from typing import Dict, Optional, Set, Tuple
 from model.board import Board
+from model.den_distance import den_threats
 from model.tile import Tile
+from .board_renderer import BoardRenderer
 
 
 class View:
@@ -40,15 +42,31 @@ class View:
         "W": "~~",
     }
 
-    def display_board(self, board: Board) -> None:
+    def __init__(self) -> None:
+        """Initialize the view; boards are rendered on first display."""
+        self._renderer: Optional[BoardRenderer] = None
+
+    def _renderer_for(self, board: Board) -> BoardRenderer:
+        """Get the cached rendering of a board, following a new board if needed."""
+        if self._renderer is None or self._renderer.board is not board:
+            if self._renderer is not None:
+                self._renderer.close()
+            self._renderer = BoardRenderer(board, self._format_square)
+        return self._renderer
+
+    def display_board(
+        self, board: Board, marked: Optional[Set[Tuple[int, int]]] = None
+    ) -> None:
         """
         Display the current state of the game board.
 
         Shows a formatted grid with column labels (A-G), row numbers (1-9),
-        pieces with their owners, and special tiles.
+        pieces with their owners, and special tiles. Cells are kept up to
+        date from the board's events, so only changed rows are re-formatted.
 
         Args:
             board: The Board object to display
+            marked: Positions of pieces to flag with "!" (e.g. threatened ones)
         """
         print("\n" + "=" * 60)
         print(" " * 20 + "JUNGLE QUEST")
@@ -57,11 +75,19 @@ class View:
         self._print_column_headers()
         print("   +" + "------+" * 7)
 
+        renderer = self._renderer_for(board)
         for i in range(board.MAX_ROWS):
-            print(f" {i + 1} |", end="")
-            for j in range(board.MAX_COLUMNS):
-                print(f"{self._format_tile(board.grid[j][i])}|", end="")
-            print(f" {i + 1}")
+            if marked and any(row == i for _, row in marked):
+                cells = []
+                for j in range(board.MAX_COLUMNS):
+                    cell = renderer.cells[i * board.MAX_COLUMNS + j]
+                    if (j, i) in marked:
+                        cell = f"{cell.strip() + '!':^6}"
+                    cells.append(f"{cell}|")
+                row_text = "".join(cells)
+            else:
+                row_text = renderer.row(i)
+            print(f" {i + 1} |{row_text} {i + 1}")
             print("   +" + "------+" * 7)
 
         self._print_column_headers()
@@ -84,12 +110,24 @@ class View:
         Returns:
             Formatted string for display (6 characters wide)
         """
-        if not tile.is_empty():
-            piece = tile.piece
+        return self._format_square(tile.piece, tile)
+
+    def _format_square(self, piece, terrain: Tile) -> str:
+        """
+        Format a square's piece, or its terrain if empty, for display.
+
+        Args:
+            piece: The Piece on the square, or None
+            terrain: The square's terrain Tile
+
+        Returns:
+            Formatted string for display (6 characters wide)
+        """
+        if piece is not None:
             abbr = self.PIECE_ABBREV.get(piece.name, piece.name[0])
             piece_str = f"{abbr}{piece.owner + 1}"
             return f"{piece_str:^6}"
-        return f"{self.TILE_SYMBOLS.get(tile.tile_type, tile.tile_type):^6}"
+        return f"{self.TILE_SYMBOLS.get(terrain.tile_type, terrain.tile_type):^6}"
 
     def display_turn(self, player_name: str) -> None:
         """
@@ -102,6 +140,21 @@ class View:
         print("Pieces: R=rat, C=cat, D=dog, W=wlf, P=lpd, T=tgr, L=lio, E=elp")
         print("Tiles: D1/D2=Dens, TR=Trap, ~~=Water | Number indicates player (1 or 2)")
 
+    def display_den_threats(self, board: Board, player: int) -> None:
+        """
+        Warn a player about opponent pieces within two moves of their den.
+
+        Args:
+            board: The Board object to inspect
+            player: Index of the player to warn (0 or 1)
+        """
+        for piece, (col, row), distance in den_threats(board, player):
+            moves = "1 move" if distance == 1 else f"{distance} moves"
+            print(
+                f"⚠ Den threat: opponent's {piece.name} on "
+                f"{chr(ord('A') + col)}{row + 1} is {moves} from your den!"
+            )
+
     def get_user_input(self) -> str:
         """
         Get move input from the user.
@@ -110,7 +163,8 @@ class View:
             User input string (stripped of whitespace)
         """
         return input(
-            "\nEnter move (e.g: A1 to A2, B4 to C4), 'save', 'record', 'undo', or 'quit': "
+            "\nEnter move (e.g: A1 to A2, B4 to C4), 'moves <square>', 'hint', "
+            "'help', 'save', 'record', 'undo', or 'quit': "
         )
 
     def display_message(self, message: str) -> None: